@@ -0,0 +1,57 @@
+"""
+Gunicorn settings for serving tandikan_python; picked up automatically when
+``gunicorn`` runs from this directory:
+
+    TANDIKAN_INTERFACE=wsgi gunicorn    # threaded sync workers (default)
+    TANDIKAN_INTERFACE=asgi gunicorn    # uvicorn workers, async student views
+
+Both listen on TANDIKAN_BIND (default 127.0.0.1:8000) with TANDIKAN_WORKERS
+processes: one unless TANDIKAN_CACHE is redis or file. Needs gunicorn, plus
+uvicorn for ASGI. ``manage.py student_load_test`` compares the two.
+"""
+
+import multiprocessing
+import os
+
+# WSGI stays the default: on SQLite, ASGI pays a thread hop for every
+# sync middleware and ORM call and a new connection per request, and
+# student_load_test measured it slower. Try it where WSGI runs out of
+# threads before CPU: PostgreSQL with its pool and slow queries.
+interface = os.environ.get('TANDIKAN_INTERFACE', 'wsgi')
+
+bind = os.environ.get('TANDIKAN_BIND', '127.0.0.1:8000')
+
+# Every worker is a process. With the default locmem cache
+# (TANDIKAN_CACHE, see settings.py) each one would keep its own sessions,
+# auth cache, admission and dashboard counters, prerequisite graphs and
+# template fragments, so a single worker (with its threads) serves unless
+# the cache is shared, and more are refused.
+cache_profile = os.environ.get('TANDIKAN_CACHE', 'locmem')
+if cache_profile in ('redis', 'file'):
+    workers = int(os.environ.get('TANDIKAN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+else:
+    workers = int(os.environ.get('TANDIKAN_WORKERS', 1))
+# settings.SERVER_WORKERS reads the same variable.
+os.environ['TANDIKAN_WORKERS'] = str(workers)
+# Room for a registration-day burst of connections before accept() catches up.
+backlog = 4096
+keepalive = 5
+timeout = 60
+
+if interface == 'asgi':
+    wsgi_app = 'tandikan_python.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'tandikan_python.wsgi:application'
+    worker_class = 'gthread'
+    # One request per thread; each thread holds a database connection.
+    threads = int(os.environ.get('TANDIKAN_THREADS', 32))
+
+
+def on_starting(server):
+    # Also catches a worker count given on the command line (-w).
+    if cache_profile not in ('redis', 'file') and server.cfg.workers > 1:
+        raise RuntimeError(
+            f"{server.cfg.workers} workers need a shared cache; set TANDIKAN_CACHE=redis or file, "
+            "or run one worker."
+        )
@@ -3,6 +3,11 @@ ASGI config for tandikan_python project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn workers, e.g. ``TANDIKAN_INTERFACE=asgi gunicorn``
+(see gunicorn.conf.py) or ``uvicorn tandikan_python.asgi:application``.
+The student read endpoints under ``/async/`` are async views; everything
+else runs in threads as under WSGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +17,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tandikan_python.settings')
+# Read by settings: no persistent database connections under ASGI.
+os.environ.setdefault('TANDIKAN_ASGI', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -28,6 +29,7 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 AUTH_USER_MODEL = "tandikan_website.User"
+LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'admin_dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
@@ -44,12 +46,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tandikan_website.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'tandikan_website.middleware.StaticAssetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'tandikan_website.middleware.AdmissionControlMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -59,12 +64,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'tandikan_website.context_processors.layout',
+            ],
+            # Parse each template once per process. runserver's autoreloader
+            # still clears them when a template file changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
@@ -76,12 +89,92 @@ WSGI_APPLICATION = 'tandikan_python.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# TANDIKAN_DB_PROFILE picks the backend:
+#   sqlite        SQLite tuned for concurrent web traffic (default); the
+#                 PRAGMAs in SQLITE_PRAGMAS are applied to every connection
+#                 by tandikan_website.db
+#   sqlite-plain  stock Django SQLite, kept for benchmarking
+#   postgresql    PostgreSQL with a psycopg connection pool, or persistent
+#                 connections when TANDIKAN_DB_POOL=0 (needs psycopg[pool])
+DB_PROFILE = os.environ.get('TANDIKAN_DB_PROFILE', 'sqlite')
+
+if DB_PROFILE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('TANDIKAN_DB_NAME', 'tandikan'),
+            'USER': os.environ.get('TANDIKAN_DB_USER', 'tandikan'),
+            'PASSWORD': os.environ.get('TANDIKAN_DB_PASSWORD', ''),
+            'HOST': os.environ.get('TANDIKAN_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('TANDIKAN_DB_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+    if os.environ.get('TANDIKAN_DB_POOL', '1') == '1':
+        # The pool owns the connections, so Django must not keep its own.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('TANDIKAN_DB_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('TANDIKAN_DB_POOL_MAX', 20)),
+                'timeout': 10,
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('TANDIKAN_DB_CONN_MAX_AGE', 600))
+
+    # Dashboard and report reads go to the replica when one is configured;
+    # see tandikan_website.routers.
+    if os.environ.get('TANDIKAN_DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.environ['TANDIKAN_DB_REPLICA_HOST'],
+            'PORT': os.environ.get('TANDIKAN_DB_REPLICA_PORT', DATABASES['default']['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['tandikan_website.routers.ReplicaRouter']
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('TANDIKAN_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            # A file-backed test database gives threaded tests real SQLite
+            # locking; the shared in-memory default fails with "table is locked".
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+    if DB_PROFILE == 'sqlite':
+        DATABASES['default']['OPTIONS'] = {
+            # Take the write lock when a transaction starts. A deferred
+            # transaction that reads first fails with "database is locked"
+            # when it later tries to write while another writer is active.
+            'transaction_mode': 'IMMEDIATE',
+        }
+        DATABASES['default']['CONN_MAX_AGE'] = 600
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Under ASGI the ORM calls of each request run on a thread of their own, so
+# a persistent connection is never reused, only left open; asgi.py sets
+# TANDIKAN_ASGI. PostgreSQL keeps its pool.
+if os.environ.get('TANDIKAN_ASGI') == '1':
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 0
+
+SQLITE_PRAGMAS = {
+    # Readers no longer block the writer, and the writer no longer blocks readers.
+    'journal_mode': 'WAL',
+    # Safe with WAL; only a power loss can drop the last commits.
+    'synchronous': 'NORMAL',
+    # Milliseconds to wait for the write lock before "database is locked".
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative values are KiB: a 64 MiB page cache per connection.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+} if DB_PROFILE == 'sqlite' else {}
 
 
 # Password validation
@@ -103,6 +196,93 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Cache shared by sessions, the auth cache, dashboard counters and admission
+# control. TANDIKAN_CACHE picks the backend:
+#   locmem  per-process memory (default); one server process only, see
+#           SERVER_WORKERS below
+#   file    files under TANDIKAN_CACHE_DIR, shared by every process on one
+#           machine (no atomic counters, so not for admission control)
+#   redis   Redis at TANDIKAN_REDIS_URL, shared by every machine (needs redis)
+CACHE_PROFILE = os.environ.get('TANDIKAN_CACHE', 'locmem')
+
+if CACHE_PROFILE == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('TANDIKAN_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif CACHE_PROFILE == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('TANDIKAN_CACHE_DIR', BASE_DIR / 'cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sessions are read from the cache and written through to the database
+# (TANDIKAN_SESSIONS=cached_db, the default), kept in the cache only
+# (cache: lost when it is cleared) or kept in the database only (db).
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.environ.get('TANDIKAN_SESSIONS', 'cached_db')
+
+# The session's user and its permissions come from the cache as well; see
+# tandikan_website.backends. AUTH_CACHE_TIMEOUT is in seconds.
+AUTHENTICATION_BACKENDS = ['tandikan_website.backends.CachedModelBackend']
+AUTH_CACHE_TIMEOUT = 300
+
+# Server processes running this configuration (TANDIKAN_WORKERS, which
+# gunicorn.conf.py reads too). A locmem cache is private to each process:
+# a logout, password change, deactivation or role edit would only be
+# dropped from the cache of the process that handled it. With more than
+# one process and no shared cache, sessions and users come from the
+# database on every request instead.
+SERVER_WORKERS = int(os.environ.get('TANDIKAN_WORKERS', 1))
+
+if CACHE_PROFILE == 'locmem' and SERVER_WORKERS > 1:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+
+# Password hashing. New passwords use TANDIKAN_PASSWORD_HASHER: 'scrypt'
+# (default) or 'argon2' (needs argon2-cffi). Hashes made by any hasher
+# listed here, including the PBKDF2 hashes of older accounts, keep working
+# and are rehashed with the preferred hasher and parameters at the next
+# successful login. Measure a setting with `manage.py benchmark_logins`.
+PASSWORD_HASHER = os.environ.get('TANDIKAN_PASSWORD_HASHER', 'scrypt')
+
+_PREFERRED_HASHERS = {
+    'scrypt': 'tandikan_website.hashers.TunedScryptPasswordHasher',
+    'argon2': 'tandikan_website.hashers.TunedArgon2PasswordHasher',
+}
+
+PASSWORD_HASHERS = [
+    _PREFERRED_HASHERS[PASSWORD_HASHER],
+    *[path for name, path in _PREFERRED_HASHERS.items() if name != PASSWORD_HASHER],
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+# Cost of one hash; every login pays it once. Raising scrypt's work_factor
+# or argon2's memory_cost costs memory as well as time per login.
+PASSWORD_HASHER_PARAMS = {
+    'scrypt': {
+        'work_factor': int(os.environ.get('TANDIKAN_SCRYPT_WORK_FACTOR', 2 ** 15)),
+        'block_size': 8,
+        'parallelism': 1,
+        'maxmem': 64 * 1024 * 1024,
+    },
+    'argon2': {
+        'time_cost': int(os.environ.get('TANDIKAN_ARGON2_TIME_COST', 2)),
+        'memory_cost': int(os.environ.get('TANDIKAN_ARGON2_MEMORY_COST', 19 * 1024)),
+        'parallelism': 1,
+    },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -124,7 +304,108 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic copies only what the templates reference (see
+# tandikan_website.assets), plus the bundles below, and writes
+# fingerprinted, gzip/brotli-compressed copies with a manifest.
+STATICFILES_FINDERS = [
+    'tandikan_website.assets.ReferencedFilesFinder',
+    'tandikan_website.assets.BundleFinder',
+    'tandikan_website.assets.DistinctAppDirectoriesFinder',
+]
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'tandikan_website.assets.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Bundles served as static/bundles/<name> by {% bundle %}, concatenated in
+# order. With ASSET_BUNDLING off the tag links the source files instead,
+# which is easier to debug.
+ASSET_BUNDLES = {
+    'mantis.css': [
+        'src/assets/fonts/tabler-icons.min.css',
+        'src/assets/fonts/feather.css',
+        'src/assets/fonts/fontawesome.css',
+        'src/assets/fonts/material.css',
+        'src/assets/css/style.css',
+        'src/assets/css/style-preset.css',
+    ],
+    'charts.js': [
+        'src/assets/js/plugins/apexcharts.min.js',
+        'src/assets/js/pages/dashboard-default.js',
+    ],
+    'mantis.js': [
+        'src/assets/js/plugins/popper.min.js',
+        'src/assets/js/plugins/simplebar.min.js',
+        'src/assets/js/plugins/bootstrap.min.js',
+        'src/assets/js/fonts/custom-font.js',
+        'src/assets/js/pcoded.js',
+        'src/assets/js/plugins/feather.min.js',
+    ],
+    'landing.css': [
+        'css/bootstrap-5.0.0-beta2.min.css',
+        'css/LineIcons.2.0.css',
+        'css/tiny-slider.css',
+        'css/animate.css',
+        'css/main.css',
+    ],
+    'landing.js': [
+        'js/bootstrap-5.0.0-beta2.min.js',
+        'js/tiny-slider.js',
+        'js/wow.min.js',
+        'js/polyfill.js',
+        'js/main.js',
+    ],
+}
+ASSET_BUNDLING = not DEBUG
+ASSET_BUILD_DIR = BASE_DIR / "assets_build"
+
+# Fingerprinted files never change under their name; StaticAssetMiddleware
+# lets browsers keep them for a year. Other static files get STATIC_MAX_AGE.
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+STATIC_MAX_AGE = 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Seconds the dashboard layout keeps its {% cache %} fragments: the
+# navigation per role and the header per user. Saving a user drops theirs.
+TEMPLATE_FRAGMENT_TIMEOUT = 600
+
+# Seconds the cached dashboard counters live before being recomputed.
+# Signal handlers keep them current in between.
+DASHBOARD_STATS_TIMEOUT = 300
+
+# Admission control on registration day (see AcademicTerm.admission_limit).
+# The waiting line lives in the cache, so deployments with more than one
+# worker process need a shared cache backend such as Redis or Memcached.
+# Seconds an admitted student may keep using the enrollment pages before
+# having to line up again.
+ADMISSION_WINDOW = 600
+
+# Opt-in request profiling (tandikan_website.middleware.RequestProfilingMiddleware).
+# Disabled, the middleware removes itself at startup. TRACE_MEMORY reports
+# peak memory through tracemalloc, which slows every request noticeably.
+# A CPROFILE_SAMPLE_RATE share of requests run under cProfile; those slower
+# than CPROFILE_THRESHOLD_MS are dumped to CPROFILE_DIR.
+REQUEST_PROFILING = {
+    'ENABLED': os.environ.get('TANDIKAN_PROFILING') == '1',
+    'HISTORY': 1000,
+    'TRACE_MEMORY': False,
+    'CPROFILE_SAMPLE_RATE': float(os.environ.get('TANDIKAN_PROFILING_SAMPLE_RATE', 0)),
+    'CPROFILE_THRESHOLD_MS': 200,
+    'CPROFILE_DIR': BASE_DIR / 'profiles',
+}
+
+# Background jobs (tandikan_website.services.jobs), run by `manage.py run_jobs`.
+# A failed job is retried after JOB_RETRY_DELAY seconds, doubled on every
+# attempt; one still running after JOB_TIMEOUT seconds is presumed lost.
+# Files produced by jobs, such as exported reports, go to JOB_OUTPUT_DIR.
+JOB_RETRY_DELAY = 30
+JOB_TIMEOUT = 3600
+JOB_OUTPUT_DIR = BASE_DIR / 'job_output'
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
 from .models import (
     User,
     College,
@@ -14,8 +16,12 @@ from .models import (
     Fee,
     Assessment,
     Payment,
-    ReportLog
+    ReportLog,
+    WaitlistEntry,
+    Job,
 )
+from .mixins import CsvImportMixin, IndexedSearchMixin, LargeChangelistMixin, RelatedChoicesMixin
+from .services.conflicts import Slot, sweep_conflicts
 
 # --------------------------------------------------------
 # USER
@@ -26,6 +32,7 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ("username", "email", "role", "is_active", "is_staff")
     list_filter = ("role", "is_staff", "is_active")
     search_fields = ("username", "email")
+    ordering = ("username",)
 
 
 # --------------------------------------------------------
@@ -36,6 +43,7 @@ class UserAdmin(admin.ModelAdmin):
 class CollegeAdmin(admin.ModelAdmin):
     list_display = ("college_id", "college_name")
     search_fields = ("college_name",)
+    ordering = ("college_name",)
 
 
 @admin.register(Program)
@@ -43,6 +51,8 @@ class ProgramAdmin(admin.ModelAdmin):
     list_display = ("program_id", "program_code", "program_name", "college")
     search_fields = ("program_code", "program_name")
     list_filter = ("college",)
+    list_select_related = ("college",)
+    ordering = ("program_code",)
 
 
 # --------------------------------------------------------
@@ -50,17 +60,25 @@ class ProgramAdmin(admin.ModelAdmin):
 # --------------------------------------------------------
 
 @admin.register(Faculty)
-class FacultyAdmin(admin.ModelAdmin):
+class FacultyAdmin(CsvImportMixin, IndexedSearchMixin, admin.ModelAdmin):
+    import_kind = "faculty"
     list_display = ("faculty_id", "last_name", "first_name", "college", "email")
     search_fields = ("last_name", "first_name", "email")
+    search_kind = "faculty"
     list_filter = ("college", "gender")
+    list_select_related = ("college",)
+    ordering = ("last_name", "first_name")
 
 
 @admin.register(StudentInfo)
-class StudentInfoAdmin(admin.ModelAdmin):
+class StudentInfoAdmin(CsvImportMixin, IndexedSearchMixin, admin.ModelAdmin):
+    import_kind = "students"
     list_display = ("student_id", "full_name", "college", "program", "year_level")
     search_fields = ("student_id", "user__last_name", "user__first_name")
+    search_kind = "student"
     list_filter = ("college", "program", "year_level")
+    list_select_related = ("user", "college", "program")
+    ordering = ("student_id",)
 
     def full_name(self, obj):
         return f"{obj.user.last_name}, {obj.user.first_name}"
@@ -72,8 +90,9 @@ class StudentInfoAdmin(admin.ModelAdmin):
 
 @admin.register(AcademicTerm)
 class AcademicTermAdmin(admin.ModelAdmin):
-    list_display = ("term_id", "academic_year", "semester")
-    list_filter = ("academic_year", "semester")
+    list_display = ("term_id", "academic_year", "semester", "enrollment_open", "admission_limit", "admission_batch_size")
+    list_filter = ("academic_year", "semester", "enrollment_open")
+    ordering = ("-academic_year", "-semester")
 
 
 # --------------------------------------------------------
@@ -86,10 +105,14 @@ class SubjectPrerequisiteInline(admin.TabularInline):
     extra = 1
 
 @admin.register(Subject)
-class SubjectAdmin(admin.ModelAdmin):
+class SubjectAdmin(CsvImportMixin, IndexedSearchMixin, admin.ModelAdmin):
+    import_kind = "subjects"
     list_display = ("subject_code", "subject_name", "units", "year_level", "semester", "college", "program")
     search_fields = ("subject_code", "subject_name")
+    search_kind = "subject"
     list_filter = ("college", "program", "year_level", "semester")
+    list_select_related = ("college", "program")
+    ordering = ("subject_code",)
     inlines = [SubjectPrerequisiteInline]
 
 
@@ -97,6 +120,8 @@ class SubjectAdmin(admin.ModelAdmin):
 class SubjectPrerequisiteAdmin(admin.ModelAdmin):
     list_display = ("subject", "prerequisite")
     search_fields = ("subject__subject_code", "prerequisite__subject_code")
+    list_select_related = ("subject", "prerequisite")
+    ordering = ("subject__subject_code", "prerequisite__subject_code")
 
 
 # --------------------------------------------------------
@@ -104,7 +129,8 @@ class SubjectPrerequisiteAdmin(admin.ModelAdmin):
 # --------------------------------------------------------
 
 @admin.register(ClassSchedule)
-class ClassScheduleAdmin(admin.ModelAdmin):
+class ClassScheduleAdmin(CsvImportMixin, admin.ModelAdmin):
+    import_kind = "schedules"
     list_display = (
         "schedule_id",
         "subject",
@@ -113,32 +139,75 @@ class ClassScheduleAdmin(admin.ModelAdmin):
         "start_time",
         "end_time",
         "room",
+        "capacity",
+        "seats_taken",
     )
     search_fields = ("subject__subject_code", "room", "instructor__last_name")
     list_filter = ("day", "room", "instructor")
+    list_select_related = ("subject", "instructor")
+    ordering = ("schedule_id",)
 
 
 # --------------------------------------------------------
 # ENROLLMENT SYSTEM
 # --------------------------------------------------------
 
-class EnrollmentSubjectInline(admin.TabularInline):
+class EnrollmentSubjectFormSet(BaseInlineFormSet):
+    # Each row is checked against the database in EnrollmentSubject.clean();
+    # this catches overlaps between rows added in the same submit.
+    def clean(self):
+        super().clean()
+        slots = [
+            Slot.from_schedule(form.cleaned_data["schedule"])
+            for form in self.forms
+            if form.cleaned_data.get("schedule") and not form.cleaned_data.get("DELETE")
+        ]
+        conflicts = sweep_conflicts("student", self.instance.student_id, slots)
+        if conflicts:
+            raise ValidationError([str(conflict) for conflict in conflicts])
+
+
+class EnrollmentSubjectInline(RelatedChoicesMixin, admin.TabularInline):
     model = EnrollmentSubject
+    formset = EnrollmentSubjectFormSet
     extra = 1
+    related_choices_select_related = {"schedule": ("subject",)}
 
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(LargeChangelistMixin, RelatedChoicesMixin, admin.ModelAdmin):
     list_display = ("enrollment_id", "student", "term", "date_enrolled")
     search_fields = ("student__student_id", "student__user__last_name")
     list_filter = ("term", "student__program")
+    list_select_related = ("student__user", "term")
+    ordering = ("-enrollment_id",)
+    related_choices_select_related = {"student": ("user",)}
     inlines = [EnrollmentSubjectInline]
 
 
 @admin.register(EnrollmentSubject)
-class EnrollmentSubjectAdmin(admin.ModelAdmin):
-    list_display = ("enrollment", "schedule")
+class EnrollmentSubjectAdmin(LargeChangelistMixin, RelatedChoicesMixin, admin.ModelAdmin):
+    list_display = ("enrollment", "schedule", "status")
+    list_filter = ("status",)
     search_fields = ("enrollment__student__student_id", "schedule__subject__subject_code")
+    list_select_related = ("enrollment__student", "enrollment__term", "schedule__subject")
+    ordering = ("-id",)
+    related_choices_select_related = {
+        "enrollment": ("student", "term"),
+        "schedule": ("subject",),
+    }
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(RelatedChoicesMixin, admin.ModelAdmin):
+    list_display = ("enrollment", "schedule", "requested_at")
+    search_fields = ("enrollment__student__student_id", "schedule__subject__subject_code")
+    list_select_related = ("enrollment__student", "enrollment__term", "schedule__subject")
+    ordering = ("schedule", "requested_at", "id")
+    related_choices_select_related = {
+        "enrollment": ("student", "term"),
+        "schedule": ("subject",),
+    }
 
 
 # --------------------------------------------------------
@@ -147,22 +216,45 @@ class EnrollmentSubjectAdmin(admin.ModelAdmin):
 
 @admin.register(Fee)
 class FeeAdmin(admin.ModelAdmin):
-    list_display = ("name", "amount")
+    list_display = ("name", "amount", "per_unit")
     search_fields = ("name",)
+    ordering = ("name",)
 
 
 @admin.register(Assessment)
-class AssessmentAdmin(admin.ModelAdmin):
-    list_display = ("assessment_id", "enrollment", "total_units", "total_amount", "date_generated")
+class AssessmentAdmin(RelatedChoicesMixin, admin.ModelAdmin):
+    list_display = (
+        "assessment_id",
+        "enrollment",
+        "total_units",
+        "total_amount",
+        "amount_paid",
+        "balance_due",
+        "date_generated",
+    )
     search_fields = ("enrollment__student__student_id",)
     list_filter = ("date_generated",)
+    list_select_related = ("enrollment__student", "enrollment__term")
+    ordering = ("-assessment_id",)
+    readonly_fields = ("amount_paid", "balance_due", "last_payment_date")
+    related_choices_select_related = {"enrollment": ("student", "term")}
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(LargeChangelistMixin, RelatedChoicesMixin, admin.ModelAdmin):
     list_display = ("payment_id", "assessment", "amount_paid", "date_paid", "cashier")
     search_fields = ("assessment__enrollment__student__student_id",)
     list_filter = ("date_paid", "cashier")
+    list_select_related = (
+        "assessment__enrollment__student",
+        "assessment__enrollment__term",
+        "cashier",
+    )
+    ordering = ("-date_paid", "-payment_id")
+    keyset_field = "date_paid"
+    related_choices_select_related = {
+        "assessment": ("enrollment__student", "enrollment__term"),
+    }
 
 
 # --------------------------------------------------------
@@ -170,7 +262,23 @@ class PaymentAdmin(admin.ModelAdmin):
 # --------------------------------------------------------
 
 @admin.register(ReportLog)
-class ReportLogAdmin(admin.ModelAdmin):
-    list_display = ("report_name", "generated_by", "timestamp")
-    list_filter = ("timestamp", "generated_by")
+class ReportLogAdmin(LargeChangelistMixin, admin.ModelAdmin):
+    list_display = ("report_name", "generated_by", "timestamp", "export_format", "row_count", "duration_ms")
+    list_filter = ("timestamp", "generated_by", "export_format")
     search_fields = ("report_name",)
+    list_select_related = ("generated_by",)
+    ordering = ("-timestamp", "-id")
+    keyset_field = "timestamp"
+
+
+# --------------------------------------------------------
+# BACKGROUND JOBS
+# --------------------------------------------------------
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "progress", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    list_select_related = ("created_by",)
+    ordering = ("-id",)
+    readonly_fields = ("progress", "message", "result", "error", "attempts", "started_at", "finished_at", "worker")
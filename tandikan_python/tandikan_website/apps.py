@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TandikanWebsiteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tandikan_website'
+
+    def ready(self):
+        from . import db, signals  # noqa: F401
@@ -0,0 +1,298 @@
+import gzip
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import AppDirectoriesFinder, BaseFinder, FileSystemFinder
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.template.autoreload import get_template_directories
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+BUNDLE_DIR = "bundles"
+
+STATIC_TAG = re.compile(r"""{%\s*static\s+["']([^"']+)["']""")
+BUNDLE_TAG = re.compile(r"""{%\s*bundle\s+["']([^"']+)["']""")
+CSS_REFERENCE = re.compile(
+    r"""(?P<import>@import\s+(?:url\(\s*)?)?"""
+    r"""(?(import)|url\(\s*)(?:"(?P<double>[^"]*)"|'(?P<single>[^']*)'|(?P<bare>[^"'\s);]*))\s*\)?"""
+    r"""(?(import)[^;]*;)"""
+)
+CSS_TOKEN = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/|\s*([{};,])\s*|\s+""", re.S
+)
+JS_SOURCE_MAP = re.compile(r"^//# sourceMappingURL=.*$", re.M)
+
+# Already compressed formats gain nothing from gzip or brotli.
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".xml", ".eot", ".ttf", ".otf", ".ico", ".html"}
+
+
+def _is_external(url):
+    return url.startswith(("data:", "http:", "https:", "//", "/", "#"))
+
+
+def _split_url(url):
+    """("fonts/a.eot", "?#iefix") for "fonts/a.eot?#iefix"."""
+    match = re.match(r"([^?#]*)(.*)", url)
+    return match.group(1), match.group(2)
+
+
+def _reference(match):
+    """(is an @import, url) of a CSS_REFERENCE match."""
+    url = next((value for value in match.group("double", "single", "bare") if value is not None), "")
+    return match.group("import") is not None, url
+
+
+def _resolve(base, url):
+    """Static path of ``url`` as written in the static file ``base``."""
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), url))
+
+
+def _read(path):
+    location = finders.find(path)
+    if location is None:
+        raise FileNotFoundError(f"Static file {path!r} not found.")
+    return Path(location).read_text(encoding="utf-8")
+
+
+def css_references(path, imports_only=False):
+    """Static paths of the files a stylesheet imports or points url() at."""
+    for match in CSS_REFERENCE.finditer(_read(path)):
+        is_import, url = _reference(match)
+        if imports_only and not is_import:
+            continue
+        if url and not _is_external(url):
+            yield _resolve(path, _split_url(url)[0])
+
+
+# --------------------------------------------------------
+# BUNDLES
+# --------------------------------------------------------
+
+def get_bundles():
+    return getattr(settings, "ASSET_BUNDLES", {})
+
+
+def bundle_path(name):
+    return f"{BUNDLE_DIR}/{name}"
+
+
+def minify_css(text):
+    """Drop comments (source maps included) and collapse whitespace."""
+    def token(match):
+        string, punctuation = match.groups()
+        if string:
+            return string
+        if punctuation:
+            return punctuation
+        return "" if match.group(0).startswith("/*") else " "
+
+    return CSS_TOKEN.sub(token, text).strip()
+
+
+def _bundle_css(path, seen, imports):
+    """
+    ``path`` with its local @imports inlined and every relative url()
+    rewritten to point from the bundle directory at the original file.
+    """
+    if path in seen:
+        return ""
+    seen.add(path)
+
+    def rewrite(match):
+        is_import, url = _reference(match)
+        if is_import:
+            if _is_external(url):
+                imports.append(match.group(0))
+                return ""
+            return _bundle_css(_resolve(path, _split_url(url)[0]), seen, imports)
+        if not url or _is_external(url):
+            return match.group(0)
+        name, suffix = _split_url(url)
+        target = posixpath.relpath(_resolve(path, name), BUNDLE_DIR)
+        return f'url("{target}{suffix}")'
+
+    return CSS_REFERENCE.sub(rewrite, re.sub(r"@charset[^;]*;", "", _read(path)))
+
+
+def build_bundle(name):
+    """Contents of the bundle ``name``, built from its source files in order."""
+    sources = get_bundles()[name]
+    if name.endswith(".css"):
+        seen, imports = set(), []
+        body = "\n".join(_bundle_css(path, seen, imports) for path in sources)
+        # @import is only honoured before every other rule.
+        return minify_css("\n".join(imports) + "\n" + body)
+    parts = []
+    for path in sources:
+        text = JS_SOURCE_MAP.sub("", _read(path))
+        parts.append(rjsmin.jsmin(text) if rjsmin is not None else text.strip())
+    # A file without a trailing semicolon must not run into the next one.
+    return "\n;".join(parts) + "\n"
+
+
+class BundleFinder(BaseFinder):
+    """
+    Finds the bundles of ``ASSET_BUNDLES`` under ``bundles/``, building each
+    into ``ASSET_BUILD_DIR`` when a source is newer than the last build.
+    ``collectstatic`` then fingerprints and compresses them like any file.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        location = getattr(settings, "ASSET_BUILD_DIR", settings.BASE_DIR / "assets_build")
+        self.storage = FileSystemStorage(location=location)
+
+    def build(self, name):
+        path = bundle_path(name)
+        sources = [finders.find(source) for source in get_bundles()[name]]
+        if self.storage.exists(path):
+            built = Path(self.storage.path(path)).stat().st_mtime
+            if all(source and Path(source).stat().st_mtime <= built for source in sources):
+                return self.storage.path(path)
+            self.storage.delete(path)
+        self.storage.save(path, ContentFile(build_bundle(name).encode("utf-8")))
+        return self.storage.path(path)
+
+    def find(self, path, find_all=False, **kwargs):
+        prefix = f"{BUNDLE_DIR}/"
+        name = path[len(prefix):] if path.startswith(prefix) else None
+        if name not in get_bundles():
+            # finders.find() takes anything but an empty list as a match.
+            return []
+        location = self.build(name)
+        return [location] if find_all else location
+
+    def list(self, ignore_patterns):
+        for name in get_bundles():
+            self.build(name)
+            yield bundle_path(name), self.storage
+
+
+# --------------------------------------------------------
+# COLLECTION
+# --------------------------------------------------------
+
+def referenced_assets():
+    """
+    Static paths the templates use: ``{% static %}`` and ``{% bundle %}``
+    arguments, bundle sources, and whatever their stylesheets import or
+    load through url(), followed recursively. Only files that exist.
+    """
+    pending = set(getattr(settings, "ASSET_EXTRA_FILES", ()))
+    bundles = get_bundles()
+    for directory in get_template_directories():
+        for template in Path(directory).rglob("*.html"):
+            text = template.read_text(encoding="utf-8")
+            pending.update(STATIC_TAG.findall(text))
+            for name in BUNDLE_TAG.findall(text):
+                pending.update(bundles.get(name, ()))
+
+    found = set()
+    while pending:
+        path = pending.pop()
+        if path in found or finders.find(path) is None:
+            continue
+        found.add(path)
+        if path.endswith(".css"):
+            pending.update(css_references(path))
+    return found
+
+
+class ReferencedFilesFinder(FileSystemFinder):
+    """
+    FileSystemFinder that only lists, and so only lets ``collectstatic``
+    copy, the files in ``referenced_assets()``. ``find()`` is unchanged, so
+    the development server still serves everything under STATICFILES_DIRS.
+    """
+
+    def list(self, ignore_patterns):
+        wanted = referenced_assets()
+        for path, storage in super().list(ignore_patterns):
+            prefix = getattr(storage, "prefix", None)
+            static_path = posixpath.join(prefix, path) if prefix else path
+            if static_path.replace("\\", "/") in wanted:
+                yield path, storage
+
+
+class DistinctAppDirectoriesFinder(AppDirectoriesFinder):
+    """
+    AppDirectoriesFinder that leaves out app ``static`` directories already
+    in STATICFILES_DIRS, which ``ReferencedFilesFinder`` has pruned.
+    """
+
+    def list(self, ignore_patterns):
+        covered = {
+            Path(root[1] if isinstance(root, (list, tuple)) else root).resolve()
+            for root in settings.STATICFILES_DIRS
+        }
+        for path, storage in super().list(ignore_patterns):
+            if Path(storage.location).resolve() not in covered:
+                yield path, storage
+
+
+# --------------------------------------------------------
+# STORAGE
+# --------------------------------------------------------
+
+def compressed_variants(path):
+    """Write ``path``.gz (and ``path``.br with brotli installed) when smaller."""
+    path = Path(path)
+    data = path.read_bytes()
+    encoders = [(".gz", lambda raw: gzip.compress(raw, 9, mtime=0))]
+    if brotli is not None:
+        encoders.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+    written = []
+    for suffix, encode in encoders:
+        target = path.with_name(path.name + suffix)
+        if target.exists():
+            continue
+        compressed = encode(data)
+        if len(compressed) < len(data) * 0.95:
+            target.write_bytes(compressed)
+            written.append(target)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes gzip/brotli copies of every
+    fingerprinted text file for ``StaticAssetMiddleware`` (or a front-end
+    server) to send as is.
+
+    Only url() and @import references are rewritten: the vendored scripts
+    and stylesheets point at source maps that are not shipped. Before
+    ``collectstatic`` has written a manifest (tests, a fresh checkout), URLs
+    keep the source file names instead of failing.
+    """
+
+    patterns = (("*.css", ManifestStaticFilesStorage.patterns[0][1][:2]),)
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Stylesheets come back once per pass; keep the last name of each.
+        hashed = {}
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if isinstance(hashed_name, str) and Path(hashed_name).suffix in COMPRESSIBLE:
+                hashed[name] = hashed_name
+            yield name, hashed_name, processed
+        if not dry_run:
+            for hashed_name in hashed.values():
+                compressed_variants(self.path(hashed_name))
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+CACHE_PREFIX = "auth:"
+
+
+def _timeout():
+    return getattr(settings, "AUTH_CACHE_TIMEOUT", 300)
+
+
+def _user_key(user_id):
+    return f"{CACHE_PREFIX}user:{user_id}"
+
+
+def _permissions_key(user_id, from_name):
+    # Group and Permission edits reach many users at once; they bump the
+    # generation instead of deleting every user's entry.
+    generation = cache.get_or_set(f"{CACHE_PREFIX}generation", 1, None)
+    return f"{CACHE_PREFIX}perms:{generation}:{from_name}:{user_id}"
+
+
+def invalidate_user(user_id):
+    cache.delete_many([
+        _user_key(user_id),
+        _permissions_key(user_id, "user"),
+        _permissions_key(user_id, "group"),
+    ])
+
+
+def invalidate_all_permissions():
+    try:
+        cache.incr(f"{CACHE_PREFIX}generation")
+    except ValueError:
+        cache.set(f"{CACHE_PREFIX}generation", 2, None)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps the session's user (with its ``role``) and the
+    user's permission sets in the cache, so an authenticated request does
+    not query ``tandikan_website_user`` or the groups/permissions tables
+    before the view runs. Signal handlers drop the entries when a user, its
+    ``groups``/``user_permissions`` or a Group or Permission changes.
+    """
+
+    def get_user(self, user_id):
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, _timeout())
+        return user
+
+    def _cached_permissions(self, user_obj, obj, from_name):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        # Per-request copy, as ModelBackend keeps it.
+        attr = f"_{from_name}_perm_cache"
+        if not hasattr(user_obj, attr):
+            key = _permissions_key(user_obj.pk, from_name)
+            perms = cache.get(key)
+            if perms is None:
+                perms = self._get_permissions(user_obj, obj, from_name)
+                cache.set(key, perms, _timeout())
+            setattr(user_obj, attr, perms)
+        return getattr(user_obj, attr)
+
+    def get_user_permissions(self, user_obj, obj=None):
+        return self._cached_permissions(user_obj, obj, "user")
+
+    def get_group_permissions(self, user_obj, obj=None):
+        return self._cached_permissions(user_obj, obj, "group")
@@ -0,0 +1,38 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+
+
+def time_call(func, repeat=5):
+    """Median wall time of ``func()`` over ``repeat`` runs, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+@contextmanager
+def scratch_database(verbosity=0):
+    """
+    Run a benchmark against a freshly migrated throwaway database (the test
+    database), so seeding never touches real data.
+    """
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+
+
+def benchmark_client(user=None):
+    """A test client that works outside the test runner, optionally logged in."""
+    # Outside the test runner "testserver" is not an allowed host.
+    client = Client(HTTP_HOST="localhost")
+    if user is not None:
+        client.force_login(user)
+    return client
@@ -0,0 +1,80 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from . import benchmark_client
+from ..assets import css_references
+from ..models import User
+
+
+DASHBOARDS = ("admin", "cashier", "registrar", "college", "faculty", "student")
+
+ASSET_URL = re.compile(r"""(?:href|src)=["']([^"']+)["']""")
+
+
+def page_assets(html):
+    """Static paths a page links to, in order, once each."""
+    prefix = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else f"/{settings.STATIC_URL}"
+    paths = []
+    for url in ASSET_URL.findall(html):
+        if url.startswith(prefix) and url[len(prefix):] not in paths:
+            paths.append(url[len(prefix):])
+    return paths
+
+
+def _with_imports(path):
+    """``path`` and the stylesheets it @imports, which the browser fetches too."""
+    paths = [path]
+    if path.endswith(".css"):
+        for imported in css_references(path, imports_only=True):
+            paths.extend(_with_imports(imported))
+    return paths
+
+
+def _render(url, user):
+    response = benchmark_client(user).get(url)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{url} answered HTTP {response.status_code}")
+    return response.content.decode()
+
+
+def measure_dashboards():
+    """
+    Requests and bytes each dashboard pulls from STATIC_URL on a cold
+    cache. "Before" links the source files one by one, uncompressed, as the
+    templates used to; "after" fetches the bundles and other collected
+    files through ``StaticAssetMiddleware`` accepting gzip and brotli.
+    Fonts that stylesheets load on demand are left out of both. Needs
+    ``collectstatic`` to have run, and a database the dashboards can read;
+    pages are fetched as a new admin account, the student one as a new
+    student account.
+    """
+    admin = User.objects.create(username="asset-report", password="!", role="admin")
+    student = User.objects.create(username="asset-report-student", password="!", role="student")
+    rows = []
+    for name in DASHBOARDS:
+        url = reverse(f"{name}_dashboard")
+        user = student if name == "student" else admin
+        with override_settings(DEBUG=True, ASSET_BUNDLING=False):
+            before = [path for linked in page_assets(_render(url, user)) for path in _with_imports(linked)]
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=["localhost"], ASSET_BUNDLING=True):
+            client = benchmark_client()
+            after_bytes = 0
+            after = page_assets(_render(url, user))
+            for path in after:
+                response = client.get(f"/{settings.STATIC_URL.lstrip('/')}{path}", HTTP_ACCEPT_ENCODING="gzip, br")
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} answered HTTP {response.status_code}; run collectstatic.")
+                after_bytes += sum(len(chunk) for chunk in response.streaming_content)
+        rows.append({
+            "dashboard": name,
+            "requests_before": len(before),
+            "bytes_before": sum(Path(finders.find(path)).stat().st_size for path in before),
+            "requests_after": len(after),
+            "bytes_after": after_bytes,
+        })
+    return rows
@@ -0,0 +1,100 @@
+import datetime
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Max, Sum
+
+from . import time_call
+from ..models import (
+    AcademicTerm,
+    Assessment,
+    ClassSchedule,
+    Enrollment,
+    Payment,
+    ReportLog,
+    StudentInfo,
+    User,
+)
+
+
+def benchmark_queries():
+    """
+    The hot filters behind the admin changelists, dashboards and cashier
+    screens, as (name, zero-argument function returning a queryset).
+    """
+    term = AcademicTerm.objects.order_by("-pk").first()
+    cashier = User.objects.filter(role="cashier").first()
+    latest = Payment.objects.aggregate(latest=Max("date_paid"))["latest"]
+    week_ago = latest - datetime.timedelta(days=7)
+    room, day = ClassSchedule.objects.values_list("room", "day").first()
+    last_name = StudentInfo.objects.values_list("last_name", flat=True).first()
+    assessment = Assessment.objects.order_by("?").values_list("pk", flat=True).first()
+
+    return [
+        ("payments in the last week", lambda: Payment.objects.filter(
+            date_paid__gte=week_ago).order_by("-date_paid", "-payment_id")[:100]),
+        ("payments by cashier and date", lambda: Payment.objects.filter(
+            cashier=cashier, date_paid__gte=week_ago).order_by("-date_paid")[:100]),
+        ("payment totals for an assessment", lambda: Payment.objects.filter(
+            assessment_id=assessment).values("assessment").annotate(total=Sum("amount_paid"), last=Max("date_paid"))),
+        ("latest enrollments of a term", lambda: Enrollment.objects.filter(
+            term=term).order_by("-date_enrolled")[:100]),
+        ("schedules in a room on a day", lambda: ClassSchedule.objects.filter(room=room, day=day)),
+        ("schedules of a day by start time", lambda: ClassSchedule.objects.filter(
+            day=day).order_by("start_time")[:100]),
+        ("students by last name", lambda: StudentInfo.objects.filter(
+            last_name=last_name).order_by("last_name", "first_name")[:100]),
+        ("report log for the last week", lambda: ReportLog.objects.filter(
+            timestamp__gte=week_ago).order_by("-timestamp", "-id")[:100]),
+        ("assessments generated since a date", lambda: Assessment.objects.filter(
+            date_generated__gte=week_ago).order_by("date_generated")[:100]),
+    ]
+
+
+def _measure(queries, repeat):
+    return {
+        name: {
+            "ms": round(time_call(lambda: list(make_queryset()), repeat), 3),
+            "plan": make_queryset().explain(),
+        }
+        for name, make_queryset in queries
+    }
+
+
+def app_indexes():
+    """(model, index) for every Meta.indexes entry of this app."""
+    return [
+        (model, index)
+        for model in apps.get_app_config("tandikan_website").get_models()
+        for index in model._meta.indexes
+    ]
+
+
+def compare_indexes(repeat=5):
+    """
+    Time and EXPLAIN every benchmark query inside a transaction that drops
+    the app's indexes and is rolled back, then again with them in place.
+    """
+    queries = benchmark_queries()
+
+    # The index-less run goes first: SQLite caches prepared statements, and
+    # running it second can reuse plans that were built with the indexes.
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for model, index in app_indexes():
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+        before = _measure(queries, repeat)
+        transaction.set_rollback(True)
+
+    after = _measure(queries, repeat)
+
+    return [
+        {
+            "query": name,
+            "before_ms": before[name]["ms"],
+            "after_ms": after[name]["ms"],
+            "before_plan": before[name]["plan"],
+            "after_plan": after[name]["plan"],
+        }
+        for name, _ in queries
+    ]
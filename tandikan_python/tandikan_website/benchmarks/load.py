@@ -0,0 +1,240 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from http.cookiejar import CookieJar
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from django.test import Client
+
+from ..models import User
+
+
+@dataclass
+class StudentVisit:
+    status: int = 0
+    queued: bool = False
+    peak_position: int = 0
+    polls: int = 0
+    admitted_after: float = 0.0
+    error: str = ""
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def _visit(base_url, path, status_path, deadline):
+    """One student: open the gated page, wait in line if told to, come back."""
+    visit = StudentVisit()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    opener.addheaders = [("Accept", "text/html")]
+    started = time.perf_counter()
+    try:
+        with opener.open(urljoin(base_url, path), timeout=60) as response:
+            visit.status = response.status
+            position = response.headers.get("X-Queue-Position")
+            retry_after = int(response.headers.get("Retry-After") or 1)
+        while position is not None and time.perf_counter() < deadline:
+            visit.queued = True
+            visit.peak_position = max(visit.peak_position, int(position))
+            time.sleep(retry_after)
+            with opener.open(urljoin(base_url, status_path), timeout=60) as response:
+                visit.polls += 1
+                status = json.load(response)
+            if status["admitted"]:
+                with opener.open(urljoin(base_url, path), timeout=60) as response:
+                    visit.status = response.status
+                    position = response.headers.get("X-Queue-Position")
+            else:
+                position = status["position"]
+        if position is not None:
+            visit.error = "still queued at deadline"
+    except (urllib.error.URLError, OSError, ValueError) as exc:
+        visit.error = type(exc).__name__
+    visit.admitted_after = time.perf_counter() - started
+    return visit
+
+
+def simulate_students(base_url, students=5000, path="/student-dashboard/",
+                      status_path="/enrollment/queue/", max_wait=600):
+    """
+    Fire ``students`` simultaneous visitors at a running server, one thread
+    and one cookie jar each, all released at the same instant. Returns a
+    summary of how the admission queue handled them.
+    """
+    # Thousands of threads only need small stacks for urllib.
+    threading.stack_size(256 * 1024)
+    visits = [None] * students
+    start = threading.Barrier(students + 1)
+    deadline = time.perf_counter() + max_wait
+
+    def run(n):
+        start.wait()
+        visits[n] = _visit(base_url, path, status_path, deadline)
+
+    threads = [threading.Thread(target=run, args=(n,), daemon=True) for n in range(students)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ok = [visit for visit in visits if not visit.error]
+    waits = [visit.admitted_after for visit in ok]
+    errors = {}
+    for visit in visits:
+        if visit.error:
+            errors[visit.error] = errors.get(visit.error, 0) + 1
+    return {
+        "students": students,
+        "served": len(ok),
+        "queued": sum(visit.queued for visit in visits),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 2),
+        "served_per_second": round(len(ok) / elapsed, 1) if elapsed else 0.0,
+        "wait_p50_seconds": round(_percentile(waits, 50), 3),
+        "wait_p95_seconds": round(_percentile(waits, 95), 3),
+        "wait_mean_seconds": round(statistics.fmean(waits), 3) if waits else 0.0,
+        "peak_position": max((visit.peak_position for visit in visits), default=0),
+        "polls": sum(visit.polls for visit in visits),
+    }
+
+
+# --------------------------------------------------------
+# STUDENT READ ENDPOINTS
+# --------------------------------------------------------
+
+# Endpoint -> (sync URL name, async URL name).
+STUDENT_ENDPOINTS = {
+    "dashboard": ("student_dashboard", "student_dashboard_async"),
+    "schedule": ("student_schedule", "student_schedule_async"),
+    "assessment": ("student_assessment", "student_assessment_async"),
+    "enrollment": ("student_enrollment_status", "student_enrollment_status_async"),
+}
+
+
+def student_sessions(count):
+    """Session cookies of up to ``count`` logged-in students, stored where the server reads them."""
+    cookies = []
+    for user in User.objects.filter(role="student", studentinfo__isnull=False).order_by("pk")[:count]:
+        client = Client()
+        client.force_login(user)
+        cookies.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+    return cookies
+
+
+@dataclass
+class ConnectionStats:
+    latencies: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+
+
+async def _read_response(reader):
+    """(status, keep the connection open) of one HTTP/1.1 response, body drained."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection", "").lower() != "close"
+
+
+async def _student_connection(host, port, paths, cookie, rounds, start, stats, timeout):
+    """One keep-alive connection requesting every path ``rounds`` times."""
+    await start.wait()
+    reader = writer = None
+    try:
+        for _ in range(rounds):
+            for path in paths:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+                request = (
+                    f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+                    f"Cookie: {settings.SESSION_COOKIE_NAME}={cookie}\r\n"
+                    "Accept: application/json\r\n\r\n"
+                )
+                started = time.perf_counter()
+                writer.write(request.encode("latin-1"))
+                status, keep_alive = await asyncio.wait_for(_read_response(reader), timeout)
+                stats.latencies.append(time.perf_counter() - started)
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+                if not keep_alive:
+                    writer.close()
+                    reader = writer = None
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+        stats.errors[type(exc).__name__] = stats.errors.get(type(exc).__name__, 0) + 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def _student_load(base_url, paths, cookies, connections, rounds, timeout):
+    url = urlsplit(base_url)
+    start = asyncio.Event()
+    stats = [ConnectionStats() for _ in range(connections)]
+    tasks = [
+        asyncio.create_task(_student_connection(
+            url.hostname, url.port or 80, paths, cookies[n % len(cookies)], rounds, start, stats[n], timeout
+        ))
+        for n in range(connections)
+    ]
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - started
+
+
+def load_student_endpoints(base_url, paths, cookies, connections=1000, rounds=5, timeout=60):
+    """
+    Open ``connections`` simultaneous keep-alive connections to a running
+    server, each logged in as one of ``cookies`` and requesting every path
+    ``rounds`` times, all released at the same instant. A single asyncio
+    client, so 1,000+ connections need no threads. Returns a summary.
+    """
+    stats, elapsed = asyncio.run(_student_load(base_url, paths, cookies, connections, rounds, timeout))
+
+    latencies = [latency for connection in stats for latency in connection.latencies]
+    statuses, errors = {}, {}
+    for connection in stats:
+        for status, count in connection.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+        for error, count in connection.errors.items():
+            errors[error] = errors.get(error, 0) + count
+    ok = statuses.get(200, 0)
+    return {
+        "url": base_url,
+        "connections": connections,
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 2),
+        "ok_per_second": round(ok / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "latency_p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+    }
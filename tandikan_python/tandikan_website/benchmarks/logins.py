@@ -0,0 +1,95 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher, get_hashers_by_algorithm
+
+from ..models import User
+
+
+BENCHMARK_PASSWORD = "correct-horse-battery-staple"
+
+
+def available_hashers():
+    """algorithm -> hasher, for configured hashers whose library is installed."""
+    hashers = {}
+    for algorithm, hasher in get_hashers_by_algorithm().items():
+        try:
+            if hasher.library:
+                hasher._load_library()
+        except ValueError:
+            continue
+        hashers[algorithm] = hasher
+    return hashers
+
+
+def _verify_loop(algorithm, seconds):
+    """(verifications, CPU seconds, wall seconds) of a ``seconds`` long loop."""
+    hasher = get_hashers_by_algorithm()[algorithm]
+    encoded = hasher.encode(BENCHMARK_PASSWORD, hasher.salt())
+    count = 0
+    cpu_started, started = time.process_time(), time.perf_counter()
+    while not count or time.perf_counter() - started < seconds:
+        hasher.verify(BENCHMARK_PASSWORD, encoded)
+        count += 1
+    return count, time.process_time() - cpu_started, time.perf_counter() - started
+
+
+def measure_hasher(algorithm, seconds=3.0, processes=1):
+    """
+    Password checks per second for one hasher: per core, from a loop in this
+    process, and with ``processes`` processes verifying at once.
+    """
+    count, cpu, _ = _verify_loop(algorithm, seconds)
+    row = {
+        "algorithm": algorithm,
+        "summary": get_hashers_by_algorithm()[algorithm].safe_summary(
+            get_hasher(algorithm).encode(BENCHMARK_PASSWORD, "benchmarksalt")
+        ),
+        "ms_per_check": round(cpu / count * 1000, 2),
+        "per_core_per_second": round(count / cpu, 1),
+    }
+    if processes > 1:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as pool:
+            runs = list(pool.map(_verify_loop, [algorithm] * processes, [seconds] * processes))
+        row["processes"] = processes
+        row["pool_per_second"] = round(sum(run[0] for run in runs) / max(run[2] for run in runs), 1)
+    return row
+
+
+def measure_logins(seconds=3.0):
+    """
+    Full ``authenticate()`` calls per second with the preferred hasher:
+    user lookup plus password check, as in ``login_view``. Also checks that
+    a legacy PBKDF2 hash is replaced by the preferred hasher on login.
+    Needs a database to write to; use a scratch one.
+    """
+    user = User.objects.create_user("benchmark-login", password=BENCHMARK_PASSWORD, role="student")
+    count = 0
+    cpu_started, started = time.process_time(), time.perf_counter()
+    while not count or time.perf_counter() - started < seconds:
+        if authenticate(username=user.username, password=BENCHMARK_PASSWORD) is None:
+            raise RuntimeError("Benchmark login failed.")
+        count += 1
+    cpu, elapsed = time.process_time() - cpu_started, time.perf_counter() - started
+
+    legacy = User.objects.create(
+        username="benchmark-legacy",
+        role="student",
+        password=PBKDF2PasswordHasher().encode(BENCHMARK_PASSWORD, PBKDF2PasswordHasher().salt()),
+    )
+    authenticate(username=legacy.username, password=BENCHMARK_PASSWORD)
+    legacy.refresh_from_db()
+    return {
+        "algorithm": get_hasher().algorithm,
+        "logins": count,
+        "per_second": round(count / elapsed, 1),
+        "per_core_per_second": round(count / cpu, 1),
+        "legacy_hash_upgraded_to": legacy.password.split("$", 1)[0],
+    }
@@ -0,0 +1,148 @@
+import itertools
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import benchmark_client
+from ..models import AcademicTerm, Assessment, Faculty, StudentInfo, User
+from ..services.assessment import generate_assessments
+
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def _percentile(samples, percent):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * percent / 100), len(samples) - 1)]
+
+
+def _measure(name, func, repeat):
+    """Run ``func`` ``repeat`` times, recording wall time and queries per call."""
+    timings, queries = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        status = getattr(response, "status_code", None)
+        if status is not None and status >= 400:
+            raise RuntimeError(f"{name} answered HTTP {status}")
+    return {
+        "name": name,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": statistics.median_low(queries),
+        "max_queries": max(queries),
+    }
+
+
+def hot_paths():
+    """
+    The requests and jobs that matter at peak, as (name, zero-argument
+    callable). Needs a seeded database.
+    """
+    admin_user, _ = User.objects.get_or_create(
+        username="benchmark-admin",
+        defaults={"role": "admin", "is_staff": True, "is_superuser": True},
+    )
+    admin_user.set_password(BENCHMARK_PASSWORD)
+    admin_user.save()
+    student = StudentInfo.objects.select_related("user").order_by("pk").first()
+    term = AcademicTerm.objects.order_by("-pk").first()
+    assessment_ids = list(Assessment.objects.filter(enrollment__term=term).values_list("pk", flat=True)[:1000])
+    staff = benchmark_client(admin_user)
+    student_client = benchmark_client(student.user)
+
+    def login():
+        response = benchmark_client().post(
+            reverse("login"), {"username": admin_user.username, "password": BENCHMARK_PASSWORD}
+        )
+        # A failed login answers 200 with the form again.
+        if response.status_code != 302:
+            raise RuntimeError(f"login failed (HTTP {response.status_code})")
+        return response
+
+    payments = itertools.count()
+
+    def post_payment():
+        now = timezone.localtime()
+        response = staff.post(reverse("admin:tandikan_website_payment_add"), {
+            "assessment": assessment_ids[next(payments) % len(assessment_ids)],
+            "amount_paid": "100.00",
+            "date_paid_0": now.strftime("%Y-%m-%d"),
+            "date_paid_1": now.strftime("%H:%M:%S"),
+            "cashier": admin_user.pk,
+        })
+        # The admin answers 200 with the form's errors when nothing was saved.
+        if response.status_code != 302:
+            raise RuntimeError(f"post payment saved nothing (HTTP {response.status_code})")
+        return response
+
+    cases = [("login", login)]
+    for name in ("admin", "cashier", "registrar", "college", "faculty"):
+        url = reverse(f"{name}_dashboard")
+        cases.append((f"{name} dashboard", lambda url=url: staff.get(url)))
+    url = reverse("student_dashboard")
+    cases.append(("student dashboard", lambda: student_client.get(url)))
+    schedule_url = reverse("student_schedule")
+    cases.append(("student schedule", lambda: student_client.get(schedule_url)))
+    instructor = Faculty.objects.select_related("user").order_by("pk").first()
+    rosters_url = reverse("instructor_rosters")
+    instructor_client = benchmark_client(instructor.user)
+    cases.append(("instructor rosters", lambda: instructor_client.get(rosters_url)))
+
+    for model in admin.site._registry:
+        opts = model._meta
+        if opts.app_label != "tandikan_website":
+            continue
+        url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+        cases.append((f"admin changelist: {opts.model_name}", lambda url=url: staff.get(url)))
+
+    cases.append(("generate assessments (one term)", lambda: generate_assessments(term)))
+    cases.append(("post payment", post_payment))
+    return cases
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(repeat=20):
+    return {
+        "revision": git_revision(),
+        "database": connection.vendor,
+        "repeat": repeat,
+        "results": [_measure(name, func, repeat) for name, func in hot_paths()],
+    }
+
+
+def compare_runs(previous, current):
+    """Per-case change in p50 latency and query count between two runs."""
+    before = {row["name"]: row for row in previous["results"]}
+    rows = []
+    for row in current["results"]:
+        old = before.get(row["name"])
+        if old is None:
+            continue
+        rows.append({
+            "name": row["name"],
+            "p50_ms": (old["p50_ms"], row["p50_ms"]),
+            "p50_change": round((row["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100, 1) if old["p50_ms"] else None,
+            "queries": (old["queries"], row["queries"]),
+        })
+    return rows
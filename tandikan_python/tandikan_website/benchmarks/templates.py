@@ -0,0 +1,79 @@
+from django.core.cache.utils import make_template_fragment_key
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import reverse
+
+from . import time_call
+from ..context_processors import fragment_cache, invalidate_user_fragments
+from ..models import User
+from ..services.dashboard import get_dashboard_stats
+
+
+# Role -> the template its dashboard view renders.
+DASHBOARD_TEMPLATES = {
+    "admin": "tandikan_website/admin/dashboard.html",
+    "cashier": "tandikan_website/cashier/dashboard.html",
+    "registrar": "tandikan_website/registrar/dashboard.html",
+    "college": "tandikan_website/college/dashboard.html",
+    "faculty": "tandikan_website/faculty/dashboard.html",
+    "student": "tandikan_website/student/dashboard.html",
+}
+
+
+def _cached_loaders():
+    return [
+        loader
+        for engine in engines.all()
+        for loader in getattr(getattr(engine, "engine", None), "template_loaders", ())
+        if hasattr(loader, "reset")
+    ]
+
+
+def measure_dashboard_rendering(repeat=20):
+    """
+    Median milliseconds to load and render each dashboard template:
+
+    - ``cold``: templates parsed from disk and every fragment rendered, as
+      the first request of a fresh process;
+    - ``parsed``: templates from the cached loader, fragments rendered;
+    - ``warm``: cached templates and cached navigation/header fragments,
+      as nearly every request in production.
+
+    Needs a database the dashboard counters can read; use a scratch one.
+    """
+    user = User.objects.create_user("benchmark-render", role="admin", first_name="Benchmark")
+    stats = get_dashboard_stats()
+    loaders = _cached_loaders()
+
+    def drop_fragments(role):
+        fragment_cache().delete(make_template_fragment_key("navigation", [role]))
+        invalidate_user_fragments(user.pk)
+
+    rows = []
+    for role, template_name in DASHBOARD_TEMPLATES.items():
+        request = RequestFactory().get(reverse(f"{role}_dashboard"))
+        request.user = user
+
+        def render():
+            return render_to_string(template_name, stats, request)
+
+        def cold():
+            for loader in loaders:
+                loader.reset()
+            drop_fragments(role)
+            render()
+
+        def parsed():
+            drop_fragments(role)
+            render()
+
+        render()
+        rows.append({
+            "dashboard": role,
+            "template": template_name,
+            "cold_ms": round(time_call(cold, repeat), 3),
+            "parsed_ms": round(time_call(parsed, repeat), 3),
+            "warm_ms": round(time_call(render, repeat), 3),
+        })
+    return rows
@@ -0,0 +1,101 @@
+import random
+import statistics
+import threading
+import time
+
+from django.db import DatabaseError, close_old_connections, connections
+from django.urls import reverse
+from django.utils import timezone
+
+from . import benchmark_client
+from ..models import AcademicTerm, Assessment, StudentInfo, User
+
+
+def _workload(rng, cashier):
+    """The URLs and write payloads a cashier/registrar crowd sends."""
+    students = list(StudentInfo.objects.values_list("student_id", flat=True)[:500])
+    term_ids = list(AcademicTerm.objects.values_list("pk", flat=True))
+    assessment_ids = list(Assessment.objects.values_list("pk", flat=True)[:500])
+    names = list(StudentInfo.objects.values_list("last_name", flat=True).distinct()[:50])
+    payments_url = reverse("admin:tandikan_website_payment_changelist")
+    add_payment_url = reverse("admin:tandikan_website_payment_add")
+
+    def balance(client):
+        return client.get(reverse("student_balance", args=[rng.choice(students), rng.choice(term_ids)]))
+
+    def search(client):
+        return client.get(reverse("search_typeahead"), {"q": rng.choice(names)})
+
+    def payments(client):
+        return client.get(payments_url)
+
+    def pay(client):
+        now = timezone.localtime()
+        return client.post(add_payment_url, {
+            "assessment": rng.choice(assessment_ids),
+            "amount_paid": "100.00",
+            "date_paid_0": now.strftime("%Y-%m-%d"),
+            "date_paid_1": now.strftime("%H:%M:%S"),
+            "cashier": cashier.pk,
+        })
+
+    # 80% reads, 20% writes
+    return [balance] * 4 + [search] * 2 + [payments] * 2 + [pay] * 2
+
+
+def measure_throughput(requests=600, threads=8, seed=0):
+    """
+    Push ``requests`` requests through the full Django stack from
+    ``threads`` threads at once and report requests per second and latency
+    percentiles. Connections are recycled after every request the way the
+    WSGI handler does, so CONN_MAX_AGE and per-connection setup count.
+    """
+    rng = random.Random(seed)
+    user, _ = User.objects.get_or_create(
+        username="benchmark", defaults={"role": "admin", "is_staff": True, "is_superuser": True}
+    )
+    workload = _workload(rng, user)
+    plan = [rng.choice(workload) for _ in range(requests)]
+    latencies, failures = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+
+    def run(chunk):
+        client = benchmark_client(user)
+        close_old_connections()
+        start.wait()
+        try:
+            for action in chunk:
+                started = time.perf_counter()
+                try:
+                    failure = action(client).status_code >= 400
+                except DatabaseError:
+                    # e.g. "database is locked" under write contention
+                    failure = True
+                close_old_connections()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    failures.append(failure)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=run, args=(plan[n::threads],)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "threads": threads,
+        "failures": sum(failures),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
@@ -0,0 +1,107 @@
+import math
+from collections import Counter
+
+from django.db import transaction
+
+from ..models import AcademicTerm, College, Faculty, Program, Subject, User
+from ..services.conflicts import audit_term
+from ..services.timetabling import DEFAULT_MAX_LOAD, default_slots, generate_timetable
+
+
+SIZES = (125, 250, 500, 1000, 2000)
+SECTIONS_PER_SUBJECT = 2
+SUBJECTS_PER_BLOCK = 8      # subjects a year level of a program takes in a semester
+YEAR_LEVELS = 4
+COLLEGES = 4
+ROOM_USE = 0.75             # share of room-slots and teaching loads the catalog fills
+
+
+def synthetic_catalog(sections):
+    """
+    Colleges, programs, first-semester subjects and faculty adding up to
+    about ``sections`` sections, plus just enough rooms and instructors to
+    hold them at ROOM_USE. Returns the term and the room names.
+    """
+    subjects = math.ceil(sections / SECTIONS_PER_SUBJECT)
+    programs = max(1, math.ceil(subjects / (SUBJECTS_PER_BLOCK * YEAR_LEVELS)))
+    rooms = math.ceil(sections / (len(default_slots()) * ROOM_USE))
+
+    College.objects.bulk_create([College(college_name=f"Catalog College {c + 1}") for c in range(COLLEGES)])
+    college_ids = list(College.objects.order_by("pk").values_list("pk", flat=True))[-COLLEGES:]
+    Program.objects.bulk_create([
+        Program(
+            program_code=f"C{sections}-{p:03}",
+            program_name=f"Catalog program {p}",
+            college_id=college_ids[p % COLLEGES],
+        )
+        for p in range(programs)
+    ])
+    program_rows = list(
+        Program.objects.filter(program_code__startswith=f"C{sections}-").values_list("pk", "college_id")
+    )
+    Subject.objects.bulk_create([
+        Subject(
+            subject_code=f"C{sections}-{n:05}",
+            subject_name=f"Catalog subject {n}",
+            units=3,
+            year_level=n // SUBJECTS_PER_BLOCK % YEAR_LEVELS + 1,
+            semester="1",
+            college_id=program_rows[n // (SUBJECTS_PER_BLOCK * YEAR_LEVELS)][1],
+            program_id=program_rows[n // (SUBJECTS_PER_BLOCK * YEAR_LEVELS)][0],
+        )
+        for n in range(subjects)
+    ])
+
+    # Each college gets the instructors its own sections need.
+    per_college = Counter(Subject.objects.filter(program__in=[pk for pk, _ in program_rows]).values_list(
+        "college_id", flat=True
+    ))
+    faculty_colleges = [
+        college_id
+        for college_id, count in sorted(per_college.items())
+        for _ in range(math.ceil(count * SECTIONS_PER_SUBJECT / (DEFAULT_MAX_LOAD * ROOM_USE)))
+    ]
+    User.objects.bulk_create([
+        User(username=f"catalog{sections}-{n}", password="!", role="instructor")
+        for n in range(len(faculty_colleges))
+    ])
+    Faculty.objects.bulk_create([
+        Faculty(
+            user_id=user_id,
+            college_id=faculty_colleges[n],
+            first_name="Catalog",
+            last_name=f"Instructor {n}",
+            gender="F",
+            email=f"catalog{n}@example.edu",
+        )
+        for n, user_id in enumerate(
+            User.objects.filter(username__startswith=f"catalog{sections}-").order_by("pk").values_list("pk", flat=True)
+        )
+    ])
+    term = AcademicTerm.objects.create(academic_year="2030-2031", semester="1")
+    return term, [f"Room {n + 1:03}" for n in range(rooms)]
+
+
+def measure_timetabling(sizes=SIZES, time_limit=10.0):
+    """
+    Generate and write the timetable of synthetic catalogs of increasing
+    size, each in a transaction that is rolled back afterwards, and audit
+    the written schedules for overlaps. Use a scratch database.
+    """
+    rows = []
+    for size in sizes:
+        with transaction.atomic():
+            term, rooms = synthetic_catalog(size)
+            result = generate_timetable(term, rooms=rooms, sections=SECTIONS_PER_SUBJECT, time_limit=time_limit)
+            rows.append({
+                "sections": result.sections,
+                "rooms": len(rooms),
+                "instructors": Faculty.objects.count(),
+                "placed": len(result.placed),
+                "repaired": result.repaired,
+                "unplaced": len(result.unplaced),
+                "conflicts": len(audit_term(term)),
+                "seconds": round(result.elapsed, 3),
+            })
+            transaction.set_rollback(True)
+    return rows
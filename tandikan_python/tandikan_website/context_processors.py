@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+
+
+def layout(request):
+    """Values the shared dashboard layout and its navigation fragments read."""
+    return {"fragment_timeout": getattr(settings, "TEMPLATE_FRAGMENT_TIMEOUT", 600)}
+
+
+def fragment_cache():
+    """The cache {% cache %} writes to: "template_fragments" when defined."""
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def invalidate_user_fragments(user_id):
+    """Drop the header fragment ``layouts/dashboard.html`` caches per user."""
+    fragment_cache().delete(make_template_fragment_key("header", [user_id]))
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+def _params(name):
+    return getattr(settings, "PASSWORD_HASHER_PARAMS", {}).get(name, {})
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt with its cost taken from ``PASSWORD_HASHER_PARAMS["scrypt"]``
+    (work_factor, block_size, parallelism, maxmem). Hashes made with other
+    parameters still verify and are redone on the next successful login.
+    """
+
+    def __init__(self):
+        for name, value in _params("scrypt").items():
+            setattr(self, name, value)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id tuned by ``PASSWORD_HASHER_PARAMS["argon2"]`` (time_cost,
+    memory_cost in KiB, parallelism). Needs the argon2-cffi package.
+    """
+
+    def __init__(self):
+        for name, value in _params("argon2").items():
+            setattr(self, name, value)
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tandikan_website.benchmarks.load import simulate_students
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a registration-day rush of concurrent students against a "
+        "running server and report how the admission queue held up. Point "
+        "it at a production-style server; runserver's small listen backlog "
+        "drops connections long before the queue is the bottleneck."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/", help="Base URL of the running server.")
+        parser.add_argument("--students", type=int, default=5000)
+        parser.add_argument("--path", default="/student-dashboard/", help="Gated page every student opens.")
+        parser.add_argument("--max-wait", type=int, default=600, help="Seconds before a waiting student gives up.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        results = simulate_students(
+            options["url"],
+            students=options["students"],
+            path=options["path"],
+            max_wait=options["max_wait"],
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for name, value in results.items():
+            self.stdout.write(f"{name}: {value}")
+        if results["errors"]:
+            self.stdout.write(self.style.WARNING("Some students never got in; see errors above."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Every student was served."))
@@ -0,0 +1,36 @@
+import json
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.benchmarks import scratch_database
+from tandikan_website.benchmarks.assets import measure_dashboards
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the static requests and bytes each dashboard costs a cold "
+        "browser cache: the separate source files against the fingerprinted, "
+        "compressed bundles. Run collectstatic first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        if not getattr(staticfiles_storage, "hashed_files", None):
+            raise CommandError("No staticfiles manifest; run collectstatic first.")
+        with scratch_database():
+            rows = measure_dashboards()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        self.stdout.write(f"{'dashboard':<12} {'before':>22} {'after':>22}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['dashboard']:<12} "
+                f"{row['requests_before']:>4} req {row['bytes_before'] / 1024:>10.1f} KiB "
+                f"{row['requests_after']:>4} req {row['bytes_after'] / 1024:>10.1f} KiB"
+            )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.models import AcademicTerm
+from tandikan_website.services.conflicts import audit_term
+
+
+class Command(BaseCommand):
+    help = "Report overlapping room, instructor and student schedules for an academic term."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", type=int, required=True, help="AcademicTerm term_id.")
+
+    def handle(self, *args, **options):
+        try:
+            term = AcademicTerm.objects.get(pk=options["term"])
+        except AcademicTerm.DoesNotExist:
+            raise CommandError(f"Academic term {options['term']} does not exist.")
+
+        started = time.perf_counter()
+        conflicts = audit_term(term)
+        elapsed = time.perf_counter() - started
+
+        for conflict in conflicts:
+            self.stdout.write(str(conflict))
+
+        style = self.style.WARNING if conflicts else self.style.SUCCESS
+        self.stdout.write(style(f"{len(conflicts)} conflicts found for {term} in {elapsed:.3f}s."))
@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.benchmarks.throughput import measure_throughput
+from tandikan_website.models import StudentInfo
+from tandikan_website.services.synthetic import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare request throughput of the database profiles on the same "
+        "seeded data. Each profile runs in its own process, configured "
+        "through TANDIKAN_DB_PROFILE; SQLite profiles get a fresh file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            default="sqlite-plain,sqlite",
+            help="Comma-separated profiles. postgresql uses the TANDIKAN_DB_* settings "
+                 "and must point at an empty database.",
+        )
+        parser.add_argument("--students", type=int, default=2000)
+        parser.add_argument("--requests", type=int, default=600)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+        parser.add_argument(
+            "--here", action="store_true",
+            help="Measure the currently configured database only (used by the profile runs).",
+        )
+
+    def handle(self, *args, **options):
+        if options["here"]:
+            self.stdout.write(json.dumps(self.measure_here(options)))
+            return
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in options["profiles"].split(","):
+                results[profile] = self.run_profile(profile, directory, options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for profile, row in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(profile))
+            self.stdout.write(
+                f"  {row['requests_per_second']} req/s, p50 {row['p50_ms']} ms, "
+                f"p95 {row['p95_ms']} ms, {row['failures']} failed"
+            )
+
+    def measure_here(self, options):
+        call_command("migrate", verbosity=0)
+        if not StudentInfo.objects.exists():
+            seed_dataset(students=options["students"], terms=2)
+        return measure_throughput(requests=options["requests"], threads=options["threads"])
+
+    def run_profile(self, profile, directory, options):
+        env = {
+            **os.environ,
+            "TANDIKAN_DB_PROFILE": profile,
+            "TANDIKAN_SQLITE_PATH": os.path.join(directory, f"{profile}.sqlite3"),
+        }
+        command = [
+            sys.executable, str(settings.BASE_DIR / "manage.py"), "benchmark_db_profiles", "--here",
+            "--students", str(options["students"]),
+            "--requests", str(options["requests"]),
+            "--threads", str(options["threads"]),
+        ]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f"Profile {profile} failed:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tandikan_website.benchmarks import scratch_database
+from tandikan_website.benchmarks.indexes import compare_indexes
+from tandikan_website.services.synthetic import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and compare query plans and latencies "
+        "with and without the app's indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=5000)
+        parser.add_argument("--terms", type=int, default=2)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seed_dataset(students=options["students"], terms=options["terms"])
+            results = compare_indexes(repeat=options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for row in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(row["query"]))
+            for label in ("before", "after"):
+                self.stdout.write(f"  {label}: {row[label + '_ms']:.3f} ms")
+                for line in row[label + "_plan"].splitlines():
+                    self.stdout.write(f"    {line}")
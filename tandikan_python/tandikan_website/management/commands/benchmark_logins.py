@@ -0,0 +1,62 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.benchmarks import scratch_database
+from tandikan_website.benchmarks.logins import available_hashers, measure_hasher, measure_logins
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password checks per second per core for each configured "
+        "hasher, and full logins per second with the preferred one. Use it "
+        "to pick PASSWORD_HASHER_PARAMS for the expected login rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each measurement.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Also measure this many processes checking at once.",
+        )
+        parser.add_argument("--hasher", action="append", help="Algorithm to measure; repeatable.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        hashers = available_hashers()
+        algorithms = options["hasher"] or list(hashers)
+        unknown = [algorithm for algorithm in algorithms if algorithm not in hashers]
+        if unknown:
+            raise CommandError(
+                f"Not configured or library missing: {', '.join(unknown)}. "
+                f"Available: {', '.join(hashers)}."
+            )
+
+        rows = [measure_hasher(algorithm, options["seconds"], options["processes"]) for algorithm in algorithms]
+        with scratch_database():
+            logins = measure_logins(options["seconds"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"hashers": rows, "logins": logins}, indent=2, default=str))
+            return
+
+        for row in rows:
+            line = (
+                f"{row['algorithm']:<16} {row['ms_per_check']:>8.2f} ms/check  "
+                f"{row['per_core_per_second']:>8.1f} /s per core"
+            )
+            if "pool_per_second" in row:
+                line += f"  {row['pool_per_second']:>8.1f} /s on {row['processes']} processes"
+            self.stdout.write(line)
+            params = ", ".join(
+                f"{name}={value}" for name, value in row["summary"].items() if name not in ("algorithm", "salt", "hash")
+            )
+            self.stdout.write(f"{'':<16} {params}")
+        self.stdout.write(self.style.SUCCESS(
+            f"authenticate() with {logins['algorithm']}: {logins['per_second']} logins/s, "
+            f"{logins['per_core_per_second']} per core. A legacy PBKDF2 hash was rehashed "
+            f"to {logins['legacy_hash_upgraded_to']} on login."
+        ))
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from tandikan_website.benchmarks import scratch_database
+from tandikan_website.benchmarks.suite import compare_runs, run_suite
+from tandikan_website.services.synthetic import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and time the hot paths (login, dashboards, "
+        "admin changelists, assessment generation, payment posting). Reports "
+        "p50/p95 latency and query counts; save with --output and pass the "
+        "file to --compare on a later commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=2000)
+        parser.add_argument("--terms", type=int, default=2)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", help="Earlier results file to compare against.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            dataset = seed_dataset(students=options["students"], terms=options["terms"])
+            results = run_suite(repeat=options["repeat"])
+        results["dataset"] = dataset
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for row in results["results"]:
+                self.stdout.write(
+                    f"{row['name']:<45} p50 {row['p50_ms']:>9.2f} ms  "
+                    f"p95 {row['p95_ms']:>9.2f} ms  {row['queries']:>4} queries"
+                )
+
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text())
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"Compared with {previous.get('revision') or options['compare']}"
+            ))
+            for row in compare_runs(previous, results):
+                (old_ms, new_ms), (old_q, new_q) = row["p50_ms"], row["queries"]
+                line = (
+                    f"{row['name']:<45} {old_ms:>9.2f} -> {new_ms:>9.2f} ms "
+                    f"({row['p50_change']:+.1f}%)  {old_q} -> {new_q} queries"
+                )
+                slower = (row["p50_change"] or 0) > 10 or new_q > old_q
+                self.stdout.write(self.style.WARNING(line) if slower else line)
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tandikan_website.benchmarks import scratch_database
+from tandikan_website.benchmarks.templates import measure_dashboard_rendering
+
+
+class Command(BaseCommand):
+    help = (
+        "Time loading and rendering each role dashboard template with cold "
+        "and warm template and fragment caches, in a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            rows = measure_dashboard_rendering(repeat=options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        self.stdout.write(f"{'dashboard':<12} {'cold':>10} {'parsed':>10} {'warm':>10}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['dashboard']:<12} {row['cold_ms']:>7.2f} ms {row['parsed_ms']:>7.2f} ms {row['warm_ms']:>7.2f} ms"
+            )
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tandikan_website.benchmarks import scratch_database
+from tandikan_website.benchmarks.timetabling import SIZES, measure_timetabling
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the timetable generator on synthetic catalogs of increasing "
+        "size, in a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Sections per catalog.")
+        parser.add_argument("--time-limit", type=float, default=10.0, help="Seconds of repair per catalog.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            rows = measure_timetabling(options["sizes"], time_limit=options["time_limit"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'sections':>8} {'rooms':>6} {'faculty':>8} {'placed':>7} {'repaired':>9} "
+            f"{'unplaced':>9} {'conflicts':>10} {'time':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['sections']:>8} {row['rooms']:>6} {row['instructors']:>8} {row['placed']:>7} "
+                f"{row['repaired']:>9} {row['unplaced']:>9} {row['conflicts']:>10} {row['seconds']:>8.3f}s"
+            )
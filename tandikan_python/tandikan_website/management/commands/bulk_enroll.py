@@ -0,0 +1,54 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.models import AcademicTerm
+from tandikan_website.services.enrollment import (
+    DEFAULT_BATCH_SIZE,
+    EnrollmentSelection,
+    bulk_enroll,
+)
+
+
+COLUMNS = ("student_id", "schedule_id")
+
+
+class Command(BaseCommand):
+    help = "Bulk-enroll students from a CSV file with student_id,schedule_id columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file")
+        parser.add_argument("--term", type=int, required=True, help="AcademicTerm term_id.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            term = AcademicTerm.objects.get(pk=options["term"])
+        except AcademicTerm.DoesNotExist:
+            raise CommandError(f"Academic term {options['term']} does not exist.")
+
+        selections = []
+        with open(options["csv_file"], newline="") as handle:
+            reader = csv.DictReader(handle)
+            missing = [column for column in COLUMNS if column not in (reader.fieldnames or ())]
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(missing)}.")
+            for line, row in enumerate(reader, start=2):
+                student_id, schedule_id = ((row[column] or "").strip() for column in COLUMNS)
+                if not student_id:
+                    raise CommandError(f"Line {line}: student_id is empty.")
+                try:
+                    schedule_id = int(schedule_id)
+                except ValueError:
+                    raise CommandError(f"Line {line}: schedule_id {schedule_id!r} is not a number.")
+                selections.append(EnrollmentSelection(student_id, [schedule_id]))
+
+        result = bulk_enroll(term, selections, batch_size=options["batch_size"])
+
+        for error in result.errors:
+            self.stderr.write(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result.enrollments_created} enrollments and "
+            f"{result.subjects_created} enrollment subjects in "
+            f"{result.elapsed:.3f}s ({result.rows_per_second:.0f} rows/s)."
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.models import AcademicTerm
+from tandikan_website.services.assessment import DEFAULT_BATCH_SIZE, generate_assessments
+
+
+class Command(BaseCommand):
+    help = "Compute Assessment rows for every enrollment in an academic term."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", type=int, required=True, help="AcademicTerm term_id.")
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only recompute enrollments whose subjects changed since their last assessment.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            term = AcademicTerm.objects.get(pk=options["term"])
+        except AcademicTerm.DoesNotExist:
+            raise CommandError(f"Academic term {options['term']} does not exist.")
+
+        result = generate_assessments(
+            term,
+            incremental=options["incremental"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Assessed {result.assessed} enrollments for {term} in "
+            f"{result.elapsed:.3f}s ({result.rows_per_second:.0f} rows/s)."
+        ))
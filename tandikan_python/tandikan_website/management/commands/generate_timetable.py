@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.models import AcademicTerm
+from tandikan_website.services.timetabling import DEFAULT_MAX_LOAD, DEFAULT_TIME_LIMIT, generate_timetable
+
+
+class Command(BaseCommand):
+    help = (
+        "Schedule the subjects of an academic term into rooms, time slots and "
+        "instructors of each subject's college without overlaps, and report "
+        "the sections that could not be placed. Schedules have no term, so "
+        "every schedule of a subject offered in the term's semester counts as "
+        "the term's, including those of the same semester of earlier years; "
+        "pass --ignore-existing when the schedules on file are all from an "
+        "earlier year."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", type=int, required=True, help="AcademicTerm term_id.")
+        parser.add_argument("--rooms", nargs="+", help="Room names; defaults to every room already in use.")
+        parser.add_argument("--sections", type=int, default=1, help="Sections per subject.")
+        parser.add_argument(
+            "--section-size",
+            type=int,
+            help="Students per section; the sections of a subject then follow its program and year level.",
+        )
+        parser.add_argument("--max-load", type=int, default=DEFAULT_MAX_LOAD, help="Sections per instructor.")
+        parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT, help="Seconds of repair.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--dry-run", action="store_true", help="Report the timetable without saving it.")
+        parser.add_argument(
+            "--ignore-existing",
+            action="store_true",
+            help="Schedule every section, treating existing schedules as another term's.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            term = AcademicTerm.objects.get(pk=options["term"])
+        except AcademicTerm.DoesNotExist:
+            raise CommandError(f"Academic term {options['term']} does not exist.")
+
+        try:
+            result = generate_timetable(
+                term,
+                rooms=options["rooms"],
+                sections=options["sections"],
+                section_size=options["section_size"],
+                max_load=options["max_load"],
+                time_limit=options["time_limit"],
+                seed=options["seed"],
+                dry_run=options["dry_run"],
+                ignore_existing=options["ignore_existing"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result.as_dict(), indent=2))
+            return
+
+        if options["dry_run"]:
+            for row in result.placed:
+                self.stdout.write(
+                    f"{row['subject_code']} section {row['section']}: {row['day']} "
+                    f"{row['start_time']}-{row['end_time']} {row['room']} (instructor {row['instructor_id']})"
+                )
+        for row in result.unplaced:
+            self.stderr.write(f"{row['subject_code']} section {row['section']}: {row['reason']}")
+
+        style = self.style.WARNING if result.unplaced else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Placed {len(result.placed)} of {result.sections} sections for {term} "
+            f"({result.repaired} by repair, {result.created} saved) in {result.elapsed:.3f}s; "
+            f"{len(result.unplaced)} could not be placed."
+        ))
@@ -0,0 +1,58 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tandikan_website.services.imports import CHUNK_SIZE, IMPORTERS, run_import, write_error_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import students, faculty, subjects or class schedules from a CSV "
+        "file with a header row. Account passwords are hashed in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="CSV file, or - for standard input.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Password hashing processes (default: one per core).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--errors", help="Write rejected rows to this CSV file.")
+
+    def handle(self, *args, **options):
+        try:
+            stream = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8-sig")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        def progress(lines, result):
+            self.stdout.write(f"  {lines} rows read, {result.created} created, {len(result.errors)} rejected")
+
+        with stream:
+            try:
+                result = run_import(
+                    options["kind"],
+                    stream,
+                    processes=options["processes"],
+                    chunk_size=options["chunk_size"],
+                    progress=progress,
+                )
+            except ValueError as exc:
+                raise CommandError(exc)
+
+        if options["errors"] and result.errors:
+            with open(options["errors"], "w", newline="", encoding="utf-8") as report:
+                write_error_report(result.errors, report)
+        else:
+            for error in result.errors[:20]:
+                self.stdout.write(f"  line {error.line}: {error.field}: {error.message}")
+
+        style = self.style.WARNING if result.errors else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Imported {result.created} {options['kind']} in {result.elapsed:.2f}s "
+            f"({result.rows_per_second:.0f} rows/s); {len(result.errors)} errors."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tandikan_website.services.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the search entries for students, faculty and subjects."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} entries."))
@@ -0,0 +1,31 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from tandikan_website.services.timetables import CHUNK_SIZE, rebuild_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every student timetable and class roster from the enrollment "
+        "and schedule tables, in parallel over chunks of students. Needed after "
+        "imports or SQL that bypass the signals keeping them current."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Chunks rebuilt at once, each in its own process (default: one per core).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rebuild_all(processes=options["processes"], chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {counts['timetables']} timetables and {counts['rosters']} rosters "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
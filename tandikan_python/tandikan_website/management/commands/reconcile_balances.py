@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from tandikan_website.services.ledger import find_balance_mismatches, recompute_balances
+
+
+class Command(BaseCommand):
+    help = "Check the running assessment balances against the raw Payment rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rebuild the totals of mismatched assessments from their payments.",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = find_balance_mismatches()
+        for mismatch in mismatches:
+            self.stdout.write(str(mismatch))
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("All balances match their payments."))
+        elif options["fix"]:
+            fixed = recompute_balances({m.assessment_id for m in mismatches})
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {fixed} balances."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{len(mismatches)} balances differ; run with --fix to rebuild them."
+            ))
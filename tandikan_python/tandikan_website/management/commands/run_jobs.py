@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tandikan_website.services.jobs import claim_jobs, fail_job, release_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (assessments, exports, imports) in a pool "
+        "of worker processes. Several workers, on one machine or many, can "
+        "share the same queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Jobs run at once, each in its own process (default: one per core).",
+        )
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds between queue checks.")
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        processes = options["processes"]
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Worker {worker} running {processes} processes.")
+
+        while True:
+            # Children are spawned, not forked, so none of them inherits an
+            # open database connection from this process.
+            pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+            running = {}
+            try:
+                if self.work(pool, running, worker, processes, options):
+                    break
+            except BrokenProcessPool:
+                # A child died mid-job (e.g. killed for memory); charge the
+                # attempt to every job that was in flight and start over.
+                for job_id in running.values():
+                    fail_job(job_id, "Worker process terminated abruptly.")
+                self.stderr.write("Worker pool broke; restarting it.")
+            except KeyboardInterrupt:
+                release_jobs(list(running.values()))
+                self.stdout.write(f"Stopped; {len(running)} unfinished jobs returned to the queue.")
+                break
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        connections.close_all()
+
+    def work(self, pool, running, worker, processes, options):
+        """Feed the pool until the queue runs dry in burst mode (returns True)."""
+        last_sweep = 0.0
+        while True:
+            if time.monotonic() - last_sweep > 60:
+                requeue_stale_jobs()
+                last_sweep = time.monotonic()
+
+            free = processes - len(running)
+            if free:
+                for job_id in claim_jobs(worker, free):
+                    running[pool.submit(run_job, job_id)] = job_id
+
+            if not running:
+                if options["burst"]:
+                    return True
+                time.sleep(options["poll"])
+                continue
+
+            done, _ = wait(running, timeout=options["poll"], return_when=FIRST_COMPLETED)
+            for future in done:
+                job_id = running[future]
+                try:
+                    status = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception:
+                    # run_job records its handler's errors itself; this one
+                    # happened around it, e.g. while saving the outcome.
+                    status = fail_job(job_id, traceback.format_exc())
+                del running[future]
+                self.stdout.write(f"Job {job_id}: {status}")
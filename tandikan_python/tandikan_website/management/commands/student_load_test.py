@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from tandikan_website.benchmarks.load import STUDENT_ENDPOINTS, load_student_endpoints, student_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Hit the student read endpoints (dashboard, schedule, assessment, "
+        "enrollment status) with 1,000+ concurrent logged-in connections: the "
+        "sync views on a WSGI server against the async views on an ASGI "
+        "server. Start both with gunicorn.conf.py against a seeded database "
+        "(seed_data) first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", help="Base URL of the WSGI server, e.g. http://127.0.0.1:8001/.")
+        parser.add_argument("--asgi-url", help="Base URL of the ASGI server, e.g. http://127.0.0.1:8002/.")
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--rounds", type=int, default=5, help="Times each connection requests every endpoint.")
+        parser.add_argument("--students", type=int, default=1000, help="Distinct logged-in students.")
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=sorted(STUDENT_ENDPOINTS),
+            default=sorted(STUDENT_ENDPOINTS),
+        )
+        parser.add_argument("--timeout", type=int, default=60, help="Seconds before a request counts as failed.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        targets = [
+            (interface, options[f"{interface}_url"], index)
+            for index, interface in enumerate(("wsgi", "asgi"))
+            if options[f"{interface}_url"]
+        ]
+        if not targets:
+            raise CommandError("Give --wsgi-url, --asgi-url or both.")
+        cookies = student_sessions(options["students"])
+        if not cookies:
+            raise CommandError("No students to log in; run seed_data first.")
+
+        results = []
+        for interface, url, index in targets:
+            paths = [reverse(STUDENT_ENDPOINTS[name][index]) for name in options["endpoints"]]
+            result = load_student_endpoints(
+                url,
+                paths,
+                cookies,
+                connections=options["connections"],
+                rounds=options["rounds"],
+                timeout=options["timeout"],
+            )
+            results.append({"interface": interface, **result})
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(result["interface"].upper()))
+            for name, value in result.items():
+                if name != "interface":
+                    self.stdout.write(f"  {name}: {value}")
@@ -0,0 +1,302 @@
+import cProfile
+import mimetypes
+import random
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import render
+
+from .services.admission import AdmissionGate, check_admission, get_admission_term
+from .services import profiling
+
+
+# URL names that write enrollments or that every student opens when
+# registration starts.
+ADMISSION_URL_NAMES = ("student_dashboard", "student_dashboard_async", "student_enroll")
+
+
+class AdmissionControlMiddleware:
+    """
+    Cap the number of requests working on enrollment at once while a term
+    with an admission limit is open. Requests over the cap get a "you are in
+    line" page that polls ``admission_status`` until it is their turn.
+
+    Runs in either mode, so under ASGI it does not push every request
+    through a thread; ``process_view`` is adapted by Django.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.url_names = getattr(settings, "ADMISSION_URL_NAMES", ADMISSION_URL_NAMES)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        gate = getattr(request, "_admission_gate", None)
+        if gate is not None:
+            gate.release()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        gate = getattr(request, "_admission_gate", None)
+        if gate is not None:
+            await sync_to_async(gate.release)()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.url_name not in self.url_names:
+            return None
+        term = get_admission_term()
+        if term is None:
+            return None
+
+        gate = AdmissionGate(term)
+        position = check_admission(request.session, gate)
+        if position == 0 and gate.acquire():
+            request._admission_gate = gate
+            return None
+
+        retry_after = self.retry_after(position, term)
+        if request.accepts("text/html"):
+            response = render(
+                request,
+                "tandikan_website/student/queue.html",
+                {"position": position, "retry_after": retry_after},
+            )
+        else:
+            response = JsonResponse({"queued": True, "position": position}, status=503)
+        response["Retry-After"] = retry_after
+        response["X-Queue-Position"] = position
+        return response
+
+    @staticmethod
+    def retry_after(position, term):
+        # Poll sooner near the front of the line.
+        return min(2 + position // term.admission_batch_size, 15)
+
+
+# --------------------------------------------------------
+# REQUEST PROFILING
+# --------------------------------------------------------
+
+PROFILING_DEFAULTS = {
+    "ENABLED": False,
+    "HISTORY": 1000,
+    "TRACE_MEMORY": False,
+    "CPROFILE_SAMPLE_RATE": 0.0,
+    "CPROFILE_THRESHOLD_MS": 0,
+    "CPROFILE_DIR": None,
+}
+
+
+# Held by the request whose cProfile.Profile is enabled.
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfilingMiddleware:
+    """
+    Time every routed request: wall time, database time, query count,
+    repeated statements, template rendering and optionally peak memory.
+    Results go to a ``Server-Timing`` header and the in-process histogram
+    behind the ``profiling_stats`` endpoint.
+
+    Configured by ``settings.REQUEST_PROFILING``. When it is not enabled
+    Django drops the middleware at startup, so it costs nothing. It is
+    sync only: enabled under ASGI, every request goes through a thread.
+    """
+
+    def __init__(self, get_response):
+        self.config = {**PROFILING_DEFAULTS, **getattr(settings, "REQUEST_PROFILING", {})}
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        profiling.profile_store.history = self.config["HISTORY"]
+        profiling.install_template_timer()
+        if self.config["TRACE_MEMORY"] and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.config["CPROFILE_DIR"]:
+            Path(self.config["CPROFILE_DIR"]).mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, request):
+        recorder = profiling.QueryRecorder()
+        template_time, template_token = profiling.start_template_timer()
+        profiler = self._maybe_profiler()
+        if self.config["TRACE_MEMORY"]:
+            # Process-wide: concurrent requests share the peak.
+            tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    _cprofile_lock.release()
+                profiling.stop_template_timer(template_token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        if match is None or match.url_name == "profiling_stats":
+            return response
+
+        sample = profiling.RequestSample(
+            view=match.view_name,
+            total_ms=total_ms,
+            db_ms=recorder.elapsed * 1000,
+            queries=recorder.count,
+            duplicate_queries=recorder.duplicates,
+            template_ms=template_time[0] * 1000,
+            peak_memory_kb=tracemalloc.get_traced_memory()[1] // 1024 if self.config["TRACE_MEMORY"] else None,
+            repeated_sql=recorder.repeated(),
+        )
+        profiling.profile_store.record(sample)
+        response["Server-Timing"] = sample.server_timing()
+        if profiler is not None and total_ms >= self.config["CPROFILE_THRESHOLD_MS"]:
+            self._dump(profiler, sample)
+        return response
+
+    def _maybe_profiler(self):
+        rate = self.config["CPROFILE_SAMPLE_RATE"]
+        # Only one profiler may be enabled per process (Python 3.12+ raises
+        # otherwise); a sampled request arriving while another thread is
+        # being profiled goes unprofiled.
+        if self.config["CPROFILE_DIR"] and rate and random.random() < rate and _cprofile_lock.acquire(blocking=False):
+            return cProfile.Profile()
+        return None
+
+    def _dump(self, profiler, sample):
+        name = re.sub(r"[^\w.-]+", "_", sample.view)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        profiler.dump_stats(
+            Path(self.config["CPROFILE_DIR"]) / f"{name}-{stamp}-{sample.total_ms:.0f}ms.prof"
+        )
+
+
+# --------------------------------------------------------
+# STATIC ASSETS
+# --------------------------------------------------------
+
+def accepted_encodings(header):
+    """{content coding: q-value} of an Accept-Encoding header."""
+    codings = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+
+class StaticAssetMiddleware:
+    """
+    Serve ``collectstatic`` output from STATIC_ROOT, picking the brotli or
+    gzip copy the client accepts. Fingerprinted names are cached for
+    ``STATIC_IMMUTABLE_MAX_AGE``, the rest for ``STATIC_MAX_AGE``.
+
+    Unused under DEBUG, where ``runserver`` serves the source files, and
+    until ``collectstatic`` has written a manifest. A front-end server
+    configured the same way can take over and make this a no-op.
+    """
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        storage = staticfiles_storage
+        if not getattr(storage, "hashed_files", None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = Path(settings.STATIC_ROOT).resolve()
+        self.prefix = urlsplit(storage.base_url).path
+        self.immutable = set(storage.hashed_files.values())
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        found = self._find(request)
+        if found is None:
+            return self.get_response(request)
+        name, served, encoding, content_type = found
+        return self._headers(FileResponse(open(served, "rb"), content_type=content_type), name, encoding)
+
+    async def __acall__(self, request):
+        found = self._find(request)
+        if found is None:
+            return await self.get_response(request)
+        # Collected files are small; read them whole rather than hand the
+        # ASGI handler a synchronous file iterator.
+        name, served, encoding, content_type = found
+        body = await sync_to_async(served.read_bytes, thread_sensitive=False)()
+        return self._headers(HttpResponse(body, content_type=content_type), name, encoding)
+
+    def _find(self, request):
+        """(static name, file to send, Content-Encoding, Content-Type), or None."""
+        if request.method not in ("GET", "HEAD") or not request.path.startswith(self.prefix):
+            return None
+        name = request.path[len(self.prefix):]
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return None
+
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        weights = {candidate: accepted.get(candidate, accepted.get("*", 0)) for candidate, _ in self.ENCODINGS}
+        encoding, served = None, path
+        # The client's preference first, then ours; q=0 refuses a coding.
+        for candidate, suffix in sorted(self.ENCODINGS, key=lambda item: -weights[item[0]]):
+            variant = path.with_name(path.name + suffix)
+            if weights[candidate] > 0 and variant.is_file():
+                encoding, served = candidate, variant
+                break
+
+        content_type, _ = mimetypes.guess_type(path.name)
+        return name, served, encoding, content_type or "application/octet-stream"
+
+    def _headers(self, response, name, encoding):
+        if encoding:
+            response["Content-Encoding"] = encoding
+        response["Vary"] = "Accept-Encoding"
+        if name in self.immutable:
+            max_age = getattr(settings, "STATIC_IMMUTABLE_MAX_AGE", 365 * 24 * 60 * 60)
+            response["Cache-Control"] = f"public, max-age={max_age}, immutable"
+        else:
+            response["Cache-Control"] = f"public, max-age={getattr(settings, 'STATIC_MAX_AGE', 3600)}"
+        return response
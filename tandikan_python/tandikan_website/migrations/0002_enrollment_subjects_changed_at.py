@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='subjects_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:16
+
+import django.db.models.expressions
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_payments(apps, schema_editor):
+    Assessment = apps.get_model('tandikan_website', 'Assessment')
+    Payment = apps.get_model('tandikan_website', 'Payment')
+    payments = Payment.objects.filter(assessment=models.OuterRef('pk')).values('assessment')
+    Assessment.objects.update(
+        amount_paid=Coalesce(
+            models.Subquery(
+                payments.annotate(total=models.Sum('amount_paid')).values('total'),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            ),
+            models.Value(0, output_field=models.DecimalField(max_digits=10, decimal_places=2)),
+        ),
+        last_payment_date=models.Subquery(
+            payments.annotate(last=models.Max('date_paid')).values('last')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0002_enrollment_subjects_changed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='last_payment_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='balance_due',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('total_amount'), '-', models.F('amount_paid')), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.RunPython(backfill_payments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0003_assessment_running_balance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['date_generated'], name='assessment_generated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classschedule',
+            index=models.Index(fields=['day', 'start_time'], name='schedule_day_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['term', 'date_enrolled'], name='enrollment_term_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faculty',
+            index=models.Index(fields=['last_name', 'first_name'], name='faculty_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['date_paid', 'payment_id'], name='payment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['cashier', 'date_paid'], name='payment_cashier_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['assessment', 'date_paid', 'amount_paid'], name='payment_assessment_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportlog',
+            index=models.Index(fields=['timestamp', 'id'], name='reportlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportlog',
+            index=models.Index(fields=['generated_by', 'timestamp'], name='reportlog_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentinfo',
+            index=models.Index(fields=['last_name', 'first_name'], name='student_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentinfo',
+            index=models.Index(fields=['program', 'year_level'], name='student_program_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['program', 'year_level', 'semester'], name='subject_curriculum_idx'),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:25
+
+from django.db import migrations, models
+
+
+FTS_TABLE = 'tandikan_website_searchentry_fts'
+ENTRY_TABLE = 'tandikan_website_searchentry'
+
+INDEX_SQL = {
+    # FTS5 external-content table mirrored from SearchEntry by triggers.
+    'sqlite': [
+        f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+            body, content='{ENTRY_TABLE}', content_rowid='id', tokenize='trigram'
+        )""",
+        f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {ENTRY_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body);
+        END""",
+        f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {ENTRY_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body);
+        END""",
+        f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {ENTRY_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body);
+            INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body);
+        END""",
+    ],
+    # Lets body ILIKE '%term%' use an index.
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        f'CREATE INDEX searchentry_body_trgm_idx ON {ENTRY_TABLE} USING gin (body gin_trgm_ops)',
+    ],
+}
+
+DROP_SQL = {
+    'sqlite': [
+        f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+        f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+        f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+        f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    ],
+    'postgresql': ['DROP INDEX IF EXISTS searchentry_body_trgm_idx'],
+}
+
+
+def create_search_index(apps, schema_editor):
+    for sql in INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def backfill_entries(apps, schema_editor):
+    SearchEntry = apps.get_model('tandikan_website', 'SearchEntry')
+    StudentInfo = apps.get_model('tandikan_website', 'StudentInfo')
+    Faculty = apps.get_model('tandikan_website', 'Faculty')
+    Subject = apps.get_model('tandikan_website', 'Subject')
+
+    def join(*parts):
+        return ' '.join(part for part in parts if part)
+
+    entries = [
+        SearchEntry(
+            kind='student',
+            object_id=s.student_id,
+            label=f'{s.student_id} - {s.last_name}, {s.first_name}',
+            body=join(s.student_id, s.first_name, s.middle_name, s.last_name,
+                      s.user.first_name, s.user.last_name, s.email),
+        )
+        for s in StudentInfo.objects.select_related('user').iterator()
+    ]
+    entries += [
+        SearchEntry(
+            kind='faculty',
+            object_id=str(f.faculty_id),
+            label=f'{f.last_name}, {f.first_name}',
+            body=join(f.first_name, f.last_name, f.email),
+        )
+        for f in Faculty.objects.iterator()
+    ]
+    entries += [
+        SearchEntry(
+            kind='subject',
+            object_id=str(s.subject_id),
+            label=f'{s.subject_code} - {s.subject_name}',
+            body=join(s.subject_code, s.subject_name),
+        )
+        for s in Subject.objects.iterator()
+    ]
+    SearchEntry.objects.bulk_create(entries, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0004_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('faculty', 'Faculty'), ('subject', 'Subject')], max_length=10)),
+                ('object_id', models.CharField(max_length=20)),
+                ('label', models.CharField(max_length=300)),
+                ('body', models.TextField()),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats(apps, schema_editor):
+    ClassSchedule = apps.get_model('tandikan_website', 'ClassSchedule')
+    EnrollmentSubject = apps.get_model('tandikan_website', 'EnrollmentSubject')
+    taken = (
+        EnrollmentSubject.objects.filter(schedule=models.OuterRef('pk'))
+        .values('schedule')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    ClassSchedule.objects.update(seats_taken=Coalesce(models.Subquery(taken), models.Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'waitlist entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='classschedule',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='classschedule',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_seats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='classschedule',
+            constraint=models.CheckConstraint(condition=models.Q(('capacity__isnull', True), ('seats_taken__lte', models.F('capacity')), _connector='OR'), name='schedule_seats_within_capacity'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='enrollment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tandikan_website.enrollment'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='schedule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tandikan_website.classschedule'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['schedule', 'requested_at', 'id'], name='waitlist_queue_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='waitlistentry',
+            unique_together={('schedule', 'enrollment')},
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0006_schedule_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicterm',
+            name='admission_batch_size',
+            field=models.PositiveIntegerField(default=50, help_text='Students let in from the line, and enrollments written, per batch.'),
+        ),
+        migrations.AddField(
+            model_name='academicterm',
+            name='admission_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Most enrollment requests served at once; the rest wait in line.', null=True),
+        ),
+        migrations.AddField(
+            model_name='academicterm',
+            name='enrollment_open',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0007_term_admission_control'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportlog',
+            name='duration_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportlog',
+            name='export_format',
+            field=models.CharField(blank=True, choices=[('csv', 'CSV'), ('xlsx', 'Excel')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='reportlog',
+            name='row_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:31
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_timetables(apps, schema_editor):
+    # The same rows services.timetables builds; later changes keep them current.
+    Enrollment = apps.get_model('tandikan_website', 'Enrollment')
+    EnrollmentSubject = apps.get_model('tandikan_website', 'EnrollmentSubject')
+    ClassSchedule = apps.get_model('tandikan_website', 'ClassSchedule')
+    StudentTimetable = apps.get_model('tandikan_website', 'StudentTimetable')
+    ClassRoster = apps.get_model('tandikan_website', 'ClassRoster')
+    F = models.F
+
+    classes, students = {}, {}
+    for row in EnrollmentSubject.objects.order_by('schedule__day', 'schedule__start_time').values(
+        'enrollment_id', 'schedule_id',
+        subject_code=F('schedule__subject__subject_code'),
+        subject_name=F('schedule__subject__subject_name'),
+        units=F('schedule__subject__units'),
+        day=F('schedule__day'),
+        start_time=F('schedule__start_time'),
+        end_time=F('schedule__end_time'),
+        room=F('schedule__room'),
+        instructor_first_name=F('schedule__instructor__first_name'),
+        instructor_last_name=F('schedule__instructor__last_name'),
+    ).iterator():
+        classes.setdefault(row.pop('enrollment_id'), []).append(row)
+    for row in EnrollmentSubject.objects.order_by(
+        'enrollment__student__last_name', 'enrollment__student__first_name', 'enrollment__student_id'
+    ).values(
+        'schedule_id',
+        student_id=F('enrollment__student_id'),
+        last_name=F('enrollment__student__last_name'),
+        first_name=F('enrollment__student__first_name'),
+        middle_name=F('enrollment__student__middle_name'),
+        program_code=F('enrollment__student__program__program_code'),
+        year_level=F('enrollment__student__year_level'),
+        term_id=F('enrollment__term_id'),
+    ).iterator():
+        students.setdefault(row.pop('schedule_id'), []).append(row)
+
+    StudentTimetable.objects.bulk_create([
+        StudentTimetable(
+            enrollment_id=pk,
+            student_id=student_id,
+            term_id=term_id,
+            classes=classes.get(pk, []),
+            total_units=sum(row['units'] for row in classes.get(pk, [])),
+        )
+        for pk, student_id, term_id in Enrollment.objects.values_list('pk', 'student_id', 'term_id').iterator()
+    ], batch_size=2000)
+
+    rosters = []
+    for details in ClassSchedule.objects.values(
+        'schedule_id', 'instructor_id', 'day', 'start_time', 'end_time', 'room', 'capacity',
+        subject_code=F('subject__subject_code'),
+        subject_name=F('subject__subject_name'),
+        units=F('subject__units'),
+        instructor_first_name=F('instructor__first_name'),
+        instructor_last_name=F('instructor__last_name'),
+    ).iterator():
+        schedule_id = details.pop('schedule_id')
+        enrolled = students.get(schedule_id, [])
+        rosters.append(ClassRoster(
+            schedule_id=schedule_id,
+            instructor_id=details.pop('instructor_id'),
+            details=details,
+            students=enrolled,
+            student_count=len(enrolled),
+        ))
+    ClassRoster.objects.bulk_create(rosters, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0009_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassRoster',
+            fields=[
+                ('schedule', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='roster', serialize=False, to='tandikan_website.classschedule')),
+                ('details', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('students', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tandikan_website.faculty')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StudentTimetable',
+            fields=[
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timetable', serialize=False, to='tandikan_website.enrollment')),
+                ('classes', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('total_units', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tandikan_website.studentinfo')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tandikan_website.academicterm')),
+            ],
+            options={
+                'unique_together': {('student', 'term')},
+            },
+        ),
+        migrations.RunPython(backfill_timetables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0010_timetables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollmentsubject',
+            name='status',
+            field=models.CharField(choices=[('enrolled', 'Enrolled'), ('passed', 'Passed'), ('failed', 'Failed'), ('dropped', 'Dropped')], default='enrolled', max_length=10),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:02
+
+from django.db import migrations, models
+
+
+def flag_tuition_fees(apps, schema_editor):
+    # Until now a fee was charged per unit when its name started with "tuition".
+    Fee = apps.get_model('tandikan_website', 'Fee')
+    for fee in Fee.objects.all():
+        if fee.name.strip().lower().startswith('tuition'):
+            fee.per_unit = True
+            fee.save(update_fields=['per_unit'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0011_enrollment_subject_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fee',
+            name='per_unit',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_tuition_fees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:24
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def drop_dropped_and_recount_seats(apps, schema_editor):
+    # A drop deletes the row; only enrolled subjects hold a seat.
+    ClassSchedule = apps.get_model('tandikan_website', 'ClassSchedule')
+    EnrollmentSubject = apps.get_model('tandikan_website', 'EnrollmentSubject')
+    EnrollmentSubject.objects.filter(status='dropped').delete()
+    taken = (
+        EnrollmentSubject.objects.filter(schedule=models.OuterRef('pk'), status='enrolled')
+        .values('schedule')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    ClassSchedule.objects.update(seats_taken=Coalesce(models.Subquery(taken), models.Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tandikan_website', '0012_fee_per_unit'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='enrollmentsubject',
+            name='status',
+            field=models.CharField(choices=[('enrolled', 'Enrolled'), ('passed', 'Passed'), ('failed', 'Failed')], default='enrolled', max_length=10),
+        ),
+        migrations.RunPython(drop_dropped_and_recount_seats, migrations.RunPython.noop),
+    ]
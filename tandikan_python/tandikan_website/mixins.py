@@ -0,0 +1,268 @@
+import hashlib
+import uuid
+
+from django import forms
+from django.contrib import messages
+from django.contrib.admin import ShowFacets
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.shortcuts import redirect, render
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+
+# --------------------------------------------------------
+# ADMIN
+# --------------------------------------------------------
+
+class RelatedChoicesMixin:
+    """
+    Join the relations a foreign key's ``__str__`` walks when its select
+    widget is rendered, e.g. ``{"schedule": ("subject",)}``. Without this
+    every option in the dropdown costs extra queries.
+    """
+
+    related_choices_select_related = {}
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        joins = self.related_choices_select_related.get(db_field.name)
+        if joins and "queryset" not in kwargs:
+            # Keep the ordering the related ModelAdmin would have applied.
+            queryset = self.get_field_queryset(kwargs.get("using"), db_field, request)
+            if queryset is None:
+                queryset = db_field.remote_field.model._default_manager.all()
+            kwargs["queryset"] = queryset.select_related(*joins)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+class IndexedSearchMixin:
+    """
+    Answer the changelist search box from the ``SearchEntry`` index instead
+    of ``search_fields`` LIKE scans. ``search_kind`` names the entry kind.
+    """
+
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        from .services.search import search_queryset
+
+        if not search_term.strip():
+            return queryset, False
+        return search_queryset(queryset, self.search_kind, search_term), False
+
+
+# --------------------------------------------------------
+# LARGE CHANGELISTS
+# --------------------------------------------------------
+
+CURSOR_VAR = "cursor"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose ``count`` avoids a fresh ``COUNT(*)`` on every page.
+
+    Unfiltered PostgreSQL tables use the planner's row estimate; anything
+    else is counted once and kept in the cache for ``cache_timeout`` seconds.
+    """
+
+    cache_timeout = 60
+    # Below this many rows the planner estimate is too coarse; count instead.
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self._table_estimate(queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        key = "admin-count:" + hashlib.md5(sql.encode()).hexdigest()
+        return cache.get_or_set(key, queryset.count, self.cache_timeout)
+
+    def _table_estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist that pages with ``WHERE (key, pk) < (last key, last pk)``
+    instead of ``OFFSET`` while the default ordering is in use. Sorting by a
+    column falls back to regular page numbers.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.next_cursor = None
+        super().__init__(request, *args, **kwargs)
+        # Filter and sort links start again from the first page.
+        self.params.pop(CURSOR_VAR, None)
+        self.filter_params.pop(CURSOR_VAR, None)
+
+    @property
+    def keyset_field(self):
+        name = self.model_admin.keyset_field
+        return self.lookup_opts.pk if name == "pk" else self.lookup_opts.get_field(name)
+
+    @property
+    def uses_keyset(self):
+        return ORDER_VAR not in self.params and not self.show_all
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        if ORDER_VAR in self.params:
+            return super().get_ordering(request, queryset)
+        field = self.keyset_field
+        if field.primary_key:
+            return [f"-{field.name}"]
+        return [f"-{field.name}", "-pk"]
+
+    def _encode_cursor(self, obj):
+        field = self.keyset_field
+        if field.primary_key:
+            return str(obj.pk)
+        value = getattr(obj, field.attname)
+        value = value.isoformat() if hasattr(value, "isoformat") else value
+        return f"{value}|{obj.pk}"
+
+    def _after_cursor(self, cursor):
+        field = self.keyset_field
+        pk_field = self.lookup_opts.pk
+        try:
+            if field.primary_key:
+                return Q(pk__lt=pk_field.to_python(cursor))
+            value, pk = cursor.rsplit("|", 1)
+            value, pk = field.to_python(value), pk_field.to_python(pk)
+        except (ValueError, ValidationError):
+            raise IncorrectLookupParameters(f"Invalid cursor: {cursor}")
+        return Q(**{f"{field.name}__lt": value}) | Q(**{field.name: value, "pk__lt": pk})
+
+    def get_results(self, request):
+        if not self.uses_keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        if self.cursor:
+            queryset = queryset.filter(self._after_cursor(self.cursor))
+
+        # One extra row tells whether there is a next page without counting.
+        rows = list(queryset[: self.list_per_page + 1])
+        if len(rows) > self.list_per_page:
+            rows = rows[: self.list_per_page]
+            self.next_cursor = self._encode_cursor(rows[-1])
+
+        self.result_count = paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = paginator
+
+
+class LargeChangelistMixin:
+    """
+    For changelists over very large tables: keyset pagination on
+    ``keyset_field`` (the primary key or an indexed date), cached or
+    estimated counts, and no facet counts.
+    """
+
+    keyset_field = "pk"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = ShowFacets.NEVER
+    change_list_template = "admin/tandikan_website/keyset_change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+# --------------------------------------------------------
+# CSV IMPORT
+# --------------------------------------------------------
+
+class CsvImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV with a header row, UTF-8.")
+
+
+class CsvImportMixin:
+    """
+    Add an "Import CSV" page to the changelist. The upload is handed to the
+    background job queue as an ``import`` job of kind ``import_kind`` (see
+    services/imports.py), so large files do not tie up the request.
+    """
+
+    import_kind = None
+    change_list_template = "admin/tandikan_website/csv_import_change_list.html"
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        from .services.imports import IMPORTERS
+        from .services.jobs import enqueue, output_dir
+
+        if not self.has_add_permission(request):
+            return redirect("admin:index")
+        form = CsvImportForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            name = f"import-{self.import_kind}-{uuid.uuid4().hex[:12]}.csv"
+            with open(output_dir() / name, "wb") as destination:
+                for chunk in form.cleaned_data["file"].chunks():
+                    destination.write(chunk)
+            job = enqueue("import", {"kind": self.import_kind, "file": name}, request.user)
+            messages.success(request, format_html(
+                'Import queued as job #{}. Follow it on the <a href="{}">jobs page</a>.',
+                job.pk, reverse("jobs"),
+            ))
+            return redirect(f"admin:{self.model._meta.app_label}_{self.model._meta.model_name}_changelist")
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Import {self.model._meta.verbose_name_plural}",
+            "form": form,
+            "required_columns": IMPORTERS[self.import_kind].required,
+        }
+        return render(request, "admin/tandikan_website/csv_import.html", context)
@@ -1,5 +1,9 @@
-from django.db import models
+from functools import partial
+
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
@@ -74,6 +78,11 @@ class Faculty(models.Model):
     emergency_contact_name = models.CharField(max_length=150, blank=True)
     email = models.EmailField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='faculty_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.last_name}, {self.first_name}"
 
@@ -94,6 +103,12 @@ class StudentInfo(models.Model):
     address = models.CharField(max_length=300, blank=True)
     email = models.EmailField(max_length=254, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='student_name_idx'),
+            models.Index(fields=['program', 'year_level'], name='student_program_year_idx'),
+        ]
+
     def __str__(self):
         return f"{self.student_id} - {self.user.last_name}"
 
@@ -107,6 +122,17 @@ class AcademicTerm(models.Model):
     term_id = models.AutoField(primary_key=True)
     academic_year = models.CharField(max_length=9)  # e.g. 2024-2025
     semester = models.CharField(max_length=1, choices=SEM_CHOICES)
+    enrollment_open = models.BooleanField(default=False)
+    # Admission control for registration day; an empty limit turns it off.
+    # See services.admission.
+    admission_limit = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="Most enrollment requests served at once; the rest wait in line.",
+    )
+    admission_batch_size = models.PositiveIntegerField(
+        default=50,
+        help_text="Students let in from the line, and enrollments written, per batch.",
+    )
 
     class Meta:
         unique_together = ('academic_year', 'semester')
@@ -129,6 +155,11 @@ class Subject(models.Model):
     college = models.ForeignKey(College, on_delete=models.SET_NULL, null=True)
     program = models.ForeignKey(Program, on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['program', 'year_level', 'semester'], name='subject_curriculum_idx'),
+        ]
+
     def __str__(self):
         return self.subject_code
 
@@ -143,6 +174,18 @@ class SubjectPrerequisite(models.Model):
     def __str__(self):
         return f"{self.prerequisite} → {self.subject}"
 
+    def clean(self):
+        from .services.prerequisites import get_prerequisite_graph
+
+        if self.subject_id is None or self.prerequisite_id is None:
+            return
+        if self.subject_id == self.prerequisite_id:
+            raise ValidationError("A subject cannot be its own prerequisite.")
+        if self.subject_id in get_prerequisite_graph().all_prerequisites(self.prerequisite_id):
+            raise ValidationError(
+                f"{self.prerequisite} already requires {self.subject}; this would create a cycle."
+            )
+
 
 # --------------------------------------------------------
 # CLASS SCHEDULING
@@ -156,6 +199,10 @@ class ClassSchedule(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     room = models.CharField(max_length=50)
+    # Empty capacity means the section is not limited.
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    # Maintained by EnrollmentSubject; see services.seats.
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         constraints = [
@@ -169,11 +216,40 @@ class ClassSchedule(models.Model):
                 fields=['room', 'day', 'start_time', 'end_time'],
                 name='unique_room_schedule'
             ),
+            # Last line of defence against oversubscription
+            models.CheckConstraint(
+                condition=models.Q(capacity__isnull=True) | models.Q(seats_taken__lte=models.F('capacity')),
+                name='schedule_seats_within_capacity'
+            ),
+        ]
+        # Room and instructor lookups are served by the unique constraints above.
+        indexes = [
+            models.Index(fields=['day', 'start_time'], name='schedule_day_start_idx'),
         ]
 
     def __str__(self):
         return f"{self.subject.subject_code} - {self.day} {self.start_time}-{self.end_time}"
 
+    def clean(self):
+        from .services.conflicts import find_schedule_conflicts, is_day_code
+
+        if not is_day_code(self.day):
+            raise ValidationError({"day": "Use day codes such as MWF, TTh or Sat."})
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValidationError({"end_time": "End time must be after the start time."})
+        if self.instructor_id is None or not self.start_time or not self.end_time:
+            return
+
+        conflicts = find_schedule_conflicts(self)
+        if conflicts:
+            raise ValidationError([str(conflict) for conflict in conflicts])
+
+    @property
+    def seats_left(self):
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.seats_taken, 0)
+
 
 # --------------------------------------------------------
 # ENROLLMENT PROCESS
@@ -184,17 +260,34 @@ class Enrollment(models.Model):
     student = models.ForeignKey(StudentInfo, on_delete=models.CASCADE)
     term = models.ForeignKey(AcademicTerm, on_delete=models.CASCADE)
     date_enrolled = models.DateTimeField(default=timezone.now)
+    # Bumped whenever EnrollmentSubject rows change; lets assessment
+    # generation recompute only what changed since the last run.
+    subjects_changed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ('student', 'term')
+        indexes = [
+            models.Index(fields=['term', 'date_enrolled'], name='enrollment_term_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.student_id} - {self.term}"
 
 
 class EnrollmentSubject(models.Model):
+    STATUS_CHOICES = [
+        ('enrolled', 'Enrolled'),
+        ('passed', 'Passed'),
+        ('failed', 'Failed'),
+    ]
+
     enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE)
     schedule = models.ForeignKey(ClassSchedule, on_delete=models.CASCADE)
+    # Recorded by the registrar at the end of the term; only a passed
+    # subject satisfies a prerequisite. Schedules are reused from term to
+    # term, so only an enrolled subject holds a seat and appears on the
+    # class roster. Dropping a subject deletes the row.
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='enrolled')
 
     class Meta:
         unique_together = ('enrollment', 'schedule')
@@ -202,6 +295,69 @@ class EnrollmentSubject(models.Model):
     def __str__(self):
         return f"{self.enrollment} → {self.schedule}"
 
+    def clean(self):
+        from .services.conflicts import find_student_conflicts
+
+        try:
+            enrollment, schedule = self.enrollment, self.schedule
+        except ObjectDoesNotExist:
+            return
+
+        conflicts = find_student_conflicts(enrollment, schedule, exclude_pk=self.pk)
+        if conflicts:
+            raise ValidationError([str(conflict) for conflict in conflicts])
+
+        if self._needs_seat() and schedule.seats_left == 0:
+            raise ValidationError({"schedule": "This section is full."})
+
+    def _previous_seat(self):
+        """The schedule whose seat the saved row holds, if any."""
+        if self.pk is None:
+            return None
+        return (
+            EnrollmentSubject.objects.filter(pk=self.pk, status="enrolled")
+            .values_list("schedule_id", flat=True)
+            .first()
+        )
+
+    def _needs_seat(self):
+        return self.status == "enrolled" and self._previous_seat() != self.schedule_id
+
+    def save(self, *args, **kwargs):
+        from .services.seats import release_seats, schedule_seats_freed, take_seat
+
+        with transaction.atomic():
+            previous = self._previous_seat()
+            seated = self.schedule_id if self.status == "enrolled" else None
+            if previous != seated:
+                if seated is not None:
+                    take_seat(seated)
+                if previous is not None:
+                    release_seats(previous)
+                    schedule_seats_freed(previous)
+                    if previous != self.schedule_id:
+                        # The old section's roster is rebuilt too; see signals.py.
+                        self._previous_schedule_id = previous
+            super().save(*args, **kwargs)
+
+
+class WaitlistEntry(models.Model):
+    """A student queued for a full section, served first come first served."""
+
+    schedule = models.ForeignKey(ClassSchedule, on_delete=models.CASCADE)
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE)
+    requested_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('schedule', 'enrollment')
+        verbose_name_plural = 'waitlist entries'
+        indexes = [
+            models.Index(fields=['schedule', 'requested_at', 'id'], name='waitlist_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.enrollment} waiting for {self.schedule}"
+
 
 # --------------------------------------------------------
 # FEES, ASSESSMENT, PAYMENT
@@ -210,6 +366,8 @@ class EnrollmentSubject(models.Model):
 class Fee(models.Model):
     name = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=8, decimal_places=2)
+    # Charged once per enrolled unit (tuition) instead of once per enrollment.
+    per_unit = models.BooleanField(default=False)
 
     def __str__(self):
         return f"{self.name} - {self.amount}"
@@ -224,10 +382,73 @@ class Assessment(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     date_generated = models.DateTimeField(default=timezone.now)
 
+    # Running totals kept in step with Payment rows (see Payment.save).
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    last_payment_date = models.DateTimeField(null=True, blank=True)
+    balance_due = models.GeneratedField(
+        expression=models.F("total_amount") - models.F("amount_paid"),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_generated'], name='assessment_generated_idx'),
+        ]
+
     def __str__(self):
         return f"Assessment for {self.enrollment}"
 
 
+class PaymentQuerySet(models.QuerySet):
+    """
+    Payment.save() and delete() keep the assessment's running totals
+    (services.ledger). Writes that skip them rebuild the totals of every
+    assessment they touched in the same transaction instead.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .services.ledger import recompute_balances
+
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            recompute_balances({payment.assessment_id for payment in objs})
+            self._invalidate_dashboard()
+        return created
+
+    def update(self, **kwargs):
+        from .services.ledger import recompute_balances
+
+        with transaction.atomic(using=self.db):
+            assessment_ids = set(self.values_list("assessment_id", flat=True))
+            updated = super().update(**kwargs)
+            if "assessment" in kwargs or "assessment_id" in kwargs:
+                assessment = kwargs.get("assessment", kwargs.get("assessment_id"))
+                assessment_ids.add(getattr(assessment, "pk", assessment))
+            recompute_balances(assessment_ids)
+            self._invalidate_dashboard()
+        return updated
+
+    def delete(self):
+        from .services.ledger import recompute_balances
+
+        with transaction.atomic(using=self.db):
+            assessment_ids = set(self.values_list("assessment_id", flat=True))
+            deleted = super().delete()
+            recompute_balances(assessment_ids)
+        return deleted
+
+    def _invalidate_dashboard(self):
+        # No post_save signal to adjust the counters by; see signals.py.
+        from .services.dashboard import invalidate_dashboard_stats
+
+        transaction.on_commit(
+            partial(invalidate_dashboard_stats, "pending_enrollments", "total_collection"),
+            using=self.db,
+        )
+
+
 class Payment(models.Model):
     payment_id = models.AutoField(primary_key=True)
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
@@ -235,18 +456,188 @@ class Payment(models.Model):
     date_paid = models.DateTimeField(default=timezone.now)
     cashier = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
+    objects = PaymentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Changelist keyset pagination and date filters
+            models.Index(fields=['date_paid', 'payment_id'], name='payment_date_idx'),
+            models.Index(fields=['cashier', 'date_paid'], name='payment_cashier_date_idx'),
+            # Covers the per-assessment totals without touching the table
+            models.Index(fields=['assessment', 'date_paid', 'amount_paid'], name='payment_assessment_cover_idx'),
+        ]
+
     def __str__(self):
         return f"Payment {self.amount_paid} for {self.assessment}"
 
+    def save(self, *args, **kwargs):
+        from .services.ledger import apply_payment, recompute_balances
+
+        with transaction.atomic():
+            # (assessment_id, amount_paid) before an edit, for the ledger and
+            # the dashboard counters (signals.payments_changed).
+            self._previous_payment = None
+            if self.pk is not None:
+                self._previous_payment = (
+                    Payment.objects.filter(pk=self.pk)
+                    .values_list("assessment_id", "amount_paid")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            if self._previous_payment is None:
+                apply_payment(self.assessment_id, self.amount_paid, self.date_paid)
+            else:
+                recompute_balances({self._previous_payment[0], self.assessment_id})
+
+    def delete(self, *args, **kwargs):
+        from .services.ledger import recompute_balances
+
+        with transaction.atomic():
+            assessment_id = self.assessment_id
+            result = super().delete(*args, **kwargs)
+            recompute_balances({assessment_id})
+        return result
+
 
 # --------------------------------------------------------
 # REPORT LOGGING
 # --------------------------------------------------------
 
 class ReportLog(models.Model):
+    FORMAT_CHOICES = [('csv', 'CSV'), ('xlsx', 'Excel')]
+
     report_name = models.CharField(max_length=100)
     generated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     timestamp = models.DateTimeField(default=timezone.now)
+    # Filled in by the report engine (services.reports) once a run finishes.
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, blank=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='reportlog_timestamp_idx'),
+            models.Index(fields=['generated_by', 'timestamp'], name='reportlog_user_time_idx'),
+        ]
 
     def __str__(self):
         return self.report_name
+
+
+# --------------------------------------------------------
+# SEARCH INDEX
+# --------------------------------------------------------
+
+class SearchEntry(models.Model):
+    """
+    One searchable row per student, faculty member and subject. On SQLite an
+    FTS5 trigram table mirrors ``body``; on PostgreSQL ``body`` carries a
+    trigram GIN index. See services/search.py.
+    """
+
+    KIND_CHOICES = [
+        ("student", "Student"),
+        ("faculty", "Faculty"),
+        ("subject", "Subject"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=20)
+    label = models.CharField(max_length=300)
+    body = models.TextField()
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return self.label
+
+
+# --------------------------------------------------------
+# TIMETABLES
+# --------------------------------------------------------
+
+class StudentTimetable(models.Model):
+    """
+    The weekly classes of one enrollment, i.e. one student in one term,
+    stored ready to serve instead of joined from EnrollmentSubject,
+    ClassSchedule, Subject and Faculty on every read. See
+    services/timetables.py.
+    """
+
+    enrollment = models.OneToOneField(
+        Enrollment, on_delete=models.CASCADE, primary_key=True, related_name="timetable"
+    )
+    student = models.ForeignKey(StudentInfo, on_delete=models.CASCADE)
+    term = models.ForeignKey(AcademicTerm, on_delete=models.CASCADE)
+    classes = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    total_units = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('student', 'term')
+
+    def __str__(self):
+        return f"Timetable of {self.enrollment_id}"
+
+
+class ClassRoster(models.Model):
+    """
+    One class schedule with its details and enrolled students, stored ready
+    to serve to its instructor. See services/timetables.py.
+    """
+
+    schedule = models.OneToOneField(
+        ClassSchedule, on_delete=models.CASCADE, primary_key=True, related_name="roster"
+    )
+    instructor = models.ForeignKey(Faculty, on_delete=models.CASCADE)
+    details = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    students = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    student_count = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Roster of {self.schedule_id}"
+
+
+# --------------------------------------------------------
+# BACKGROUND JOBS
+# --------------------------------------------------------
+
+class Job(models.Model):
+    """
+    A unit of work for the ``run_jobs`` worker. ``kind`` names a handler
+    registered in services/jobs.py and ``params`` holds its arguments.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Not picked up before this; pushed back after a failed attempt.
+    run_after = models.DateTimeField(default=timezone.now)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,236 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from ..models import AcademicTerm
+
+
+CACHE_PREFIX = "admission:"
+TICKET_SESSION_KEY = "admission_ticket"
+ADMITTED_SESSION_KEY = "admission_admitted_until"
+
+
+def _timeout():
+    # Counters outlive any registration day but cannot leak forever.
+    return getattr(settings, "ADMISSION_COUNTER_TIMEOUT", 24 * 60 * 60)
+
+
+def admission_window():
+    """Seconds an admitted session may keep coming back without queueing."""
+    return getattr(settings, "ADMISSION_WINDOW", 600)
+
+
+# --------------------------------------------------------
+# OPEN TERM
+# --------------------------------------------------------
+
+def get_admission_term():
+    """
+    The open term that has admission control switched on, or None. Looked
+    up on every gated request, so it is cached until a term is saved.
+    """
+    term_id = cache.get(CACHE_PREFIX + "term")
+    if term_id is None:
+        term_id = (
+            AcademicTerm.objects.filter(enrollment_open=True, admission_limit__isnull=False)
+            .order_by("-term_id")
+            .values_list("term_id", "admission_limit", "admission_batch_size")
+            .first()
+        ) or ()
+        cache.set(CACHE_PREFIX + "term", term_id, _timeout())
+    if not term_id:
+        return None
+    pk, limit, batch_size = term_id
+    return AcademicTerm(term_id=pk, admission_limit=limit, admission_batch_size=batch_size)
+
+
+def invalidate_admission_term():
+    cache.delete(CACHE_PREFIX + "term")
+
+
+# --------------------------------------------------------
+# ADMISSION GATE
+# --------------------------------------------------------
+
+class AdmissionGate:
+    """
+    A virtual waiting line kept in the shared cache.
+
+    Every waiting session draws a ticket from ``issued``. Tickets up to
+    ``served`` may enter. The first ``admission_limit`` tickets go straight
+    in; after that ``served`` only moves forward by the slots ``released``
+    since, at most one batch at a time, and only while fewer than
+    ``admission_limit`` requests hold a slot in ``active``. The slot counter
+    is the hard cap on concurrent writers.
+    """
+
+    def __init__(self, term):
+        self.term = term
+        self.prefix = f"{CACHE_PREFIX}{term.pk}:"
+
+    def _get(self, name):
+        return cache.get(self.prefix + name, 0)
+
+    def _incr(self, name, delta=1):
+        key = self.prefix + name
+        cache.add(key, 0, _timeout())
+        return cache.incr(key, delta)
+
+    def issue_ticket(self):
+        return self._incr("issued")
+
+    def position(self, ticket):
+        """How many tickets are still ahead of ``ticket``; 0 means admitted."""
+        return max(ticket - self._get("served"), 0)
+
+    def advance(self):
+        """Let in as many tickets as slots were freed, if the writers have room."""
+        if self._get("active") >= self.term.admission_limit:
+            return
+        served, issued = self._get("served"), self._get("issued")
+        freed = self.term.admission_limit + self._get("released") - served
+        step = min(self.term.admission_batch_size, issued - served, freed)
+        if step > 0:
+            self._incr("served", step)
+
+    def acquire(self):
+        if self._incr("active") > self.term.admission_limit:
+            self._incr("active", -1)
+            return False
+        return True
+
+    def release(self):
+        self._incr("active", -1)
+        self._incr("released")
+
+    def stats(self):
+        return {name: self._get(name) for name in ("issued", "served", "active", "released")}
+
+
+def check_admission(session, gate):
+    """
+    Return 0 if the session may go ahead now, otherwise its place in line.
+    Draws a ticket on the first visit and remembers admission for
+    ``admission_window()`` seconds.
+    """
+    now = time.time()
+    if session.get(ADMITTED_SESSION_KEY, 0) > now:
+        return 0
+
+    term_id, ticket = session.get(TICKET_SESSION_KEY, (None, None))
+    if term_id != gate.term.pk:
+        ticket = gate.issue_ticket()
+        session[TICKET_SESSION_KEY] = (gate.term.pk, ticket)
+
+    gate.advance()
+    position = gate.position(ticket)
+    if position == 0:
+        session[ADMITTED_SESSION_KEY] = now + admission_window()
+        session.pop(TICKET_SESSION_KEY, None)
+    return position
+
+
+# --------------------------------------------------------
+# BATCHED WRITES
+# --------------------------------------------------------
+
+class EnrollmentBatcher:
+    """
+    Collect single-student enrollment requests from many request threads
+    and write them with one ``bulk_enroll`` call per batch. SQLite only
+    allows one writer at a time, so one transaction for fifty students
+    beats fifty transactions queueing for the lock.
+    """
+
+    max_batch = 500
+    # How long the first request of a batch waits for company.
+    max_delay = 0.05
+    # How long a request thread waits for its batch to be written.
+    result_timeout = 30
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = {}
+
+    def submit(self, term, selection):
+        """
+        Queue ``selection`` for the next batch. Resubmitting a selection that
+        is still queued or being written returns the pending future, so a
+        client retrying after a timeout does not enroll twice.
+        """
+        key = (term.pk, selection.student_id, tuple(selection.schedule_ids))
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = Future()
+                future.add_done_callback(partial(self._forget, key))
+                self._queue.put((term, selection, future))
+        self._ensure_worker()
+        return future
+
+    def _forget(self, key, future):
+        self._pending.pop(key, None)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="enrollment-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            close_old_connections()
+            by_term = {}
+            for term, selection, future in batch:
+                by_term.setdefault(term.pk, (term, []))[1].append((selection, future))
+            for term, items in by_term.values():
+                self._write(term, items)
+
+    def _write(self, term, items):
+        from .enrollment import bulk_enroll
+
+        try:
+            result = bulk_enroll(
+                term,
+                [selection for selection, _ in items],
+                batch_size=term.admission_batch_size,
+            )
+        except Exception as exc:
+            for _, future in items:
+                future.set_exception(exc)
+            return
+
+        errors = {}
+        for error in result.errors:
+            errors.setdefault(str(error["student"]), []).append(error)
+        for selection, future in items:
+            future.set_result({
+                "student": selection.student_id,
+                "errors": errors.get(str(selection.student_id), []),
+                "batch_size": len(items),
+            })
+
+
+enrollment_batcher = EnrollmentBatcher()
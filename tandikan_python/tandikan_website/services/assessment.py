@@ -0,0 +1,121 @@
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Assessment, Enrollment, Fee
+
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+@dataclass
+class AssessmentRunResult:
+    assessed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.assessed / self.elapsed
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    per_unit: Decimal
+    flat: Decimal
+
+    @classmethod
+    def load(cls):
+        # Fees flagged per_unit are tuition; every other Fee is a flat
+        # charge added to other_fees.
+        per_unit = flat = Decimal("0")
+        for amount, charged_per_unit in Fee.objects.values_list("amount", "per_unit"):
+            if charged_per_unit:
+                per_unit += amount
+            else:
+                flat += amount
+        return cls(per_unit, flat)
+
+    def is_current(self, units, assessed_units, tuition_fee, other_fees):
+        """Whether a stored assessment still matches these fees and ``units``."""
+        return (
+            assessed_units == units
+            and tuition_fee == self.per_unit * units
+            and other_fees == self.flat
+        )
+
+    def assess(self, enrollment_id, units, generated_at):
+        tuition = self.per_unit * units
+        return Assessment(
+            enrollment_id=enrollment_id,
+            total_units=units,
+            tuition_fee=tuition,
+            other_fees=self.flat,
+            total_amount=tuition + self.flat,
+            date_generated=generated_at,
+        )
+
+
+def unit_totals(term, fees=None):
+    """
+    (enrollment_id, total units) for a term, from a single aggregate query.
+    With ``fees``, only enrollments without an assessment, whose subjects
+    changed after it was generated, or whose assessment no longer matches
+    their units and ``fees`` (a Fee or a subject's units was edited).
+    """
+    rows = Enrollment.objects.filter(term=term).annotate(
+        units=Coalesce(Sum("enrollmentsubject__schedule__subject__units"), 0)
+    ).values_list(
+        "enrollment_id",
+        "units",
+        "assessment__date_generated",
+        "subjects_changed_at",
+        "assessment__total_units",
+        "assessment__tuition_fee",
+        "assessment__other_fees",
+    )
+    for enrollment_id, units, generated_at, changed_at, *assessed in rows:
+        if (
+            fees is None
+            or generated_at is None
+            or changed_at > generated_at
+            or not fees.is_current(units, *assessed)
+        ):
+            yield enrollment_id, units
+
+
+def generate_assessments(term, incremental=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Compute and upsert the Assessment of every enrollment in ``term``.
+
+    Units come from one aggregate query, fees are read once and applied in
+    memory, and rows are written with an upserting ``bulk_create``. With
+    ``incremental`` only enrollments without an assessment, or whose
+    subjects, subject units or fees changed since it was generated, are
+    recomputed.
+    """
+    started = time.perf_counter()
+    fees = FeeSchedule.load()
+    generated_at = timezone.now()
+
+    assessments = [
+        fees.assess(enrollment_id, units, generated_at)
+        for enrollment_id, units in unit_totals(term, fees=fees if incremental else None)
+    ]
+
+    with transaction.atomic():
+        Assessment.objects.bulk_create(
+            assessments,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["enrollment"],
+            update_fields=["total_units", "tuition_fee", "other_fees", "total_amount", "date_generated"],
+        )
+
+    return AssessmentRunResult(len(assessments), time.perf_counter() - started)
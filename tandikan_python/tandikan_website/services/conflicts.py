@@ -0,0 +1,306 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+
+
+# --------------------------------------------------------
+# DAY PARSING
+# --------------------------------------------------------
+
+MON, TUE, WED, THU, FRI, SAT, SUN = (1 << n for n in range(7))
+WEEKDAYS = (MON, TUE, WED, THU, FRI, SAT, SUN)
+
+# Longest tokens first so "Th" wins over "T", "Tues" over "Tue" and "Sat"
+# over "S".
+_DAY_TOKENS = [
+    ("thurs", THU), ("tues", TUE), ("thur", THU),
+    ("sun", SUN), ("sat", SAT), ("thu", THU), ("tue", TUE),
+    ("mon", MON), ("wed", WED), ("fri", FRI),
+    ("th", THU), ("tu", TUE), ("sa", SAT), ("su", SUN),
+    ("m", MON), ("t", TUE), ("w", WED), ("r", THU),
+    ("f", FRI), ("s", SAT), ("u", SUN),
+]
+_DAY_PATTERN = re.compile("|".join(token for token, _ in _DAY_TOKENS), re.IGNORECASE)
+_DAY_BITS = dict(_DAY_TOKENS)
+_DAY_SEPARATORS = re.compile(r"[\s,/]+")
+
+
+def parse_days(value):
+    """
+    Turn a day string such as "MWF", "TTh", "TuTh" or "Sat" into a weekday
+    bitmask. Raises ValueError on anything that is not a day code.
+    """
+    text = _DAY_SEPARATORS.sub("", value)
+    mask = position = 0
+    while position < len(text):
+        match = _DAY_PATTERN.match(text, position)
+        if match is None:
+            raise ValueError(f"Unknown day code {text[position:]!r} in {value!r}.")
+        mask |= _DAY_BITS[match.group().lower()]
+        position = match.end()
+    return mask
+
+
+def is_day_code(value):
+    """True when ``value`` names at least one weekday and nothing else."""
+    try:
+        return bool(parse_days(value))
+    except ValueError:
+        return False
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+# --------------------------------------------------------
+# INTERVAL INDEX
+# --------------------------------------------------------
+
+class _DayIntervals:
+    """
+    Intervals of one weekday kept sorted by start, with a running maximum of
+    the end times. Checking for an overlap is a bisect plus a walk over the
+    intervals that actually overlap.
+    """
+
+    def __init__(self):
+        self.entries = []   # (start, end, item) sorted by start
+        self.max_end = []   # max end of entries[:i + 1]
+
+    def add(self, start, end, item):
+        insort(self.entries, (start, end, item), key=lambda entry: entry[:2])
+        position = bisect_left(self.entries, (start, end), key=lambda entry: entry[:2])
+        running = self.max_end[position - 1] if position else 0
+        self.max_end[position:] = []
+        for entry in self.entries[position:]:
+            running = max(running, entry[1])
+            self.max_end.append(running)
+
+    def overlapping(self, start, end):
+        found = []
+        index = bisect_left(self.entries, end, key=lambda entry: entry[0]) - 1
+        while index >= 0 and self.max_end[index] > start:
+            entry = self.entries[index]
+            if entry[1] > start:
+                found.append(entry[2])
+            index -= 1
+        return found
+
+
+class IntervalIndex:
+    """Weekly intervals for a single room, instructor or student."""
+
+    def __init__(self):
+        self.days = defaultdict(_DayIntervals)
+
+    def add(self, days_mask, start, end, item):
+        for day in WEEKDAYS:
+            if days_mask & day:
+                self.days[day].add(start, end, item)
+
+    def overlapping(self, days_mask, start, end):
+        found = []
+        for day in WEEKDAYS:
+            if days_mask & day and day in self.days:
+                for item in self.days[day].overlapping(start, end):
+                    if item not in found:
+                        found.append(item)
+        return found
+
+
+# --------------------------------------------------------
+# SCHEDULE CONFLICTS
+# --------------------------------------------------------
+
+@dataclass(frozen=True)
+class Slot:
+    schedule_id: int
+    room: str
+    instructor_id: int
+    days: int
+    start: int
+    end: int
+
+    @classmethod
+    def from_schedule(cls, schedule):
+        return cls(
+            schedule.schedule_id,
+            schedule.room,
+            schedule.instructor_id,
+            parse_days(schedule.day),
+            to_minutes(schedule.start_time),
+            to_minutes(schedule.end_time),
+        )
+
+    @classmethod
+    def from_values(cls, schedule_id, room, instructor_id, day, start_time, end_time):
+        return cls(
+            schedule_id, room, instructor_id, parse_days(day),
+            to_minutes(start_time), to_minutes(end_time),
+        )
+
+
+SLOT_FIELDS = ("schedule_id", "room", "instructor_id", "day", "start_time", "end_time")
+
+
+@dataclass(frozen=True)
+class Conflict:
+    kind: str        # "room", "instructor" or "student"
+    key: object      # the room name, instructor id or student id
+    schedule_id: int
+    other_id: int
+
+    def __str__(self):
+        schedule = f"schedule {self.schedule_id}" if self.schedule_id else "this schedule"
+        return f"{self.kind} {self.key}: {schedule} overlaps schedule {self.other_id}"
+
+
+class ScheduleConflictIndex:
+    """Interval indexes per room, per instructor and per student."""
+
+    def __init__(self):
+        self.rooms = defaultdict(IntervalIndex)
+        self.instructors = defaultdict(IntervalIndex)
+        self.students = defaultdict(IntervalIndex)
+
+    def add_slot(self, slot):
+        self.rooms[slot.room].add(slot.days, slot.start, slot.end, slot.schedule_id)
+        self.instructors[slot.instructor_id].add(slot.days, slot.start, slot.end, slot.schedule_id)
+
+    def add_student_slot(self, student_id, slot):
+        self.students[student_id].add(slot.days, slot.start, slot.end, slot.schedule_id)
+
+    def slot_conflicts(self, slot):
+        conflicts = []
+        for kind, indexes, key in (
+            ("room", self.rooms, slot.room),
+            ("instructor", self.instructors, slot.instructor_id),
+        ):
+            if key in indexes:
+                for other in indexes[key].overlapping(slot.days, slot.start, slot.end):
+                    if other != slot.schedule_id:
+                        conflicts.append(Conflict(kind, key, slot.schedule_id, other))
+        return conflicts
+
+    def student_conflicts(self, student_id, slot):
+        if student_id not in self.students:
+            return []
+        return [
+            Conflict("student", student_id, slot.schedule_id, other)
+            for other in self.students[student_id].overlapping(slot.days, slot.start, slot.end)
+            if other != slot.schedule_id
+        ]
+
+
+def sweep_conflicts(kind, key, slots):
+    """Report every overlapping pair among ``slots`` with a sweep per weekday."""
+    conflicts = []
+    for day in WEEKDAYS:
+        active = []  # heap of (end, schedule_id)
+        for slot in sorted((s for s in slots if s.days & day), key=lambda s: (s.start, s.end)):
+            while active and active[0][0] <= slot.start:
+                heapq.heappop(active)
+            for _, other in active:
+                conflicts.append(Conflict(kind, key, slot.schedule_id, other))
+            heapq.heappush(active, (slot.end, slot.schedule_id))
+    return list(dict.fromkeys(conflicts))
+
+
+# --------------------------------------------------------
+# DATABASE ENTRY POINTS
+# --------------------------------------------------------
+
+def find_schedule_conflicts(schedule):
+    """
+    Room and instructor overlaps for a ClassSchedule about to be saved,
+    among schedules of the same semester (as audit_term). Only the rows of
+    its room or instructor whose times overlap are read, through the
+    indexes behind the unique constraints; their days are compared here.
+    """
+    from django.db.models import Q, Subquery
+    from ..models import ClassSchedule, Subject
+
+    candidates = (
+        ClassSchedule.objects.filter(
+            Q(room=schedule.room) | Q(instructor_id=schedule.instructor_id),
+            start_time__lt=schedule.end_time,
+            end_time__gt=schedule.start_time,
+        )
+        .exclude(pk=schedule.pk)
+    )
+    if schedule.subject_id is not None:
+        candidates = candidates.filter(
+            subject__semester=Subquery(Subject.objects.filter(pk=schedule.subject_id).values("semester"))
+        )
+
+    slot = Slot.from_schedule(schedule)
+    conflicts = []
+    for values in candidates.order_by("schedule_id").values_list(*SLOT_FIELDS):
+        other = Slot.from_values(*values)
+        if not other.days & slot.days:
+            continue
+        if other.room == slot.room:
+            conflicts.append(Conflict("room", slot.room, slot.schedule_id, other.schedule_id))
+        if other.instructor_id == slot.instructor_id:
+            conflicts.append(Conflict("instructor", slot.instructor_id, slot.schedule_id, other.schedule_id))
+    return conflicts
+
+
+def find_student_conflicts(enrollment, schedule, pending=(), exclude_pk=None):
+    """
+    Overlaps between ``schedule`` and the student's other schedules in the
+    same term. ``pending`` holds schedules not yet saved, e.g. the other rows
+    of an inline formset; ``exclude_pk`` is the EnrollmentSubject being edited.
+    """
+    from ..models import EnrollmentSubject
+
+    index = ScheduleConflictIndex()
+    student_id = enrollment.student_id
+    taken = (
+        EnrollmentSubject.objects.filter(
+            enrollment__student_id=student_id,
+            enrollment__term_id=enrollment.term_id,
+        )
+        .exclude(pk=exclude_pk)
+        .exclude(schedule_id=schedule.pk)
+        .values_list(*("schedule__" + name for name in SLOT_FIELDS))
+    )
+    for values in taken:
+        index.add_student_slot(student_id, Slot.from_values(*values))
+    for other in pending:
+        if other.pk != schedule.pk:
+            index.add_student_slot(student_id, Slot.from_schedule(other))
+    return index.student_conflicts(student_id, Slot.from_schedule(schedule))
+
+
+def audit_term(term):
+    """All room, instructor and student overlaps for an academic term."""
+    from ..models import ClassSchedule, EnrollmentSubject
+
+    slots = {
+        values[0]: Slot.from_values(*values)
+        for values in ClassSchedule.objects.filter(subject__semester=term.semester)
+        .values_list(*SLOT_FIELDS)
+    }
+
+    by_room = defaultdict(list)
+    by_instructor = defaultdict(list)
+    for slot in slots.values():
+        by_room[slot.room].append(slot)
+        by_instructor[slot.instructor_id].append(slot)
+
+    by_student = defaultdict(list)
+    pairs = EnrollmentSubject.objects.filter(enrollment__term=term).values_list(
+        "enrollment__student_id", *("schedule__" + name for name in SLOT_FIELDS)
+    )
+    for student_id, *values in pairs:
+        by_student[student_id].append(Slot.from_values(*values))
+
+    conflicts = []
+    for kind, groups in (("room", by_room), ("instructor", by_instructor), ("student", by_student)):
+        for key, group in groups.items():
+            conflicts.extend(sweep_conflicts(kind, key, group))
+    return conflicts
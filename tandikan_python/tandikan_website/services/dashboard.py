@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+from ..models import College, Enrollment, Faculty, Payment, Program, StudentInfo, Subject
+from ..routers import replica_reads
+
+
+CACHE_PREFIX = "dashboard:"
+
+
+def _pending_enrollments():
+    # Enrolled but nothing paid yet, whether or not an assessment exists.
+    return Enrollment.objects.exclude(assessment__amount_paid__gt=0).count()
+
+
+def _total_collection():
+    return Payment.objects.aggregate(total=Sum("amount_paid"))["total"] or 0
+
+
+# Counter name -> how to compute it from scratch. The names match the
+# context variables used by the dashboard templates.
+COUNTERS = {
+    "total_students": StudentInfo.objects.count,
+    "total_faculty": Faculty.objects.count,
+    "total_departments": Program.objects.count,
+    "total_colleges": College.objects.count,
+    "total_subjects": Subject.objects.count,
+    "pending_enrollments": _pending_enrollments,
+    "total_collection": _total_collection,
+}
+
+# Kept in the cache as whole centavos, since cache.incr() only takes
+# integers on most backends; get_dashboard_stats() returns pesos.
+MONEY_COUNTERS = {"total_collection"}
+
+
+def _centavos(amount):
+    return int(Decimal(amount) * 100)
+
+
+def _timeout():
+    return getattr(settings, "DASHBOARD_STATS_TIMEOUT", 300)
+
+
+def get_dashboard_stats(names=None):
+    """
+    Dashboard counters from the cache. Only counters missing from the cache
+    (first render, TTL expiry, or invalidation) are computed, on the read
+    replica when there is one.
+    """
+    names = list(names or COUNTERS)
+    cached = cache.get_many([CACHE_PREFIX + name for name in names])
+
+    stats, missing = {}, {}
+    with replica_reads():
+        for name in names:
+            key = CACHE_PREFIX + name
+            if key in cached:
+                value = cached[key]
+            else:
+                value = COUNTERS[name]()
+                if name in MONEY_COUNTERS:
+                    value = _centavos(value)
+                missing[key] = value
+            stats[name] = (Decimal(value) / 100).quantize(Decimal("0.01")) if name in MONEY_COUNTERS else value
+    if missing:
+        cache.set_many(missing, _timeout())
+    return stats
+
+
+def bump_dashboard_stat(name, delta=1):
+    """Adjust a cached counter in place; a missing counter is left to be recomputed."""
+    try:
+        cache.incr(CACHE_PREFIX + name, delta)
+    except ValueError:
+        pass
+
+
+def payment_changes(added=(), removed=()):
+    """
+    Work out, before committing, how payments of ``(assessment_id, amount)``
+    being added and removed change the counters: the collection by the net
+    amount, and the pending enrollments by the assessments whose paid total
+    crosses zero. Must run inside the transaction, right after the payment
+    rows are written. Returns keyword arguments for ``record_payments``.
+    """
+    deltas = {}
+    for sign, payments in ((1, added), (-1, removed)):
+        for assessment_id, amount in payments:
+            if assessment_id is not None:
+                deltas[assessment_id] = deltas.get(assessment_id, 0) + sign * Decimal(amount)
+    paid = dict(
+        Payment.objects.filter(assessment_id__in=deltas)
+        .values("assessment_id")
+        .annotate(total=Sum("amount_paid"))
+        .values_list("assessment_id", "total")
+    )
+    pending = 0
+    for assessment_id, delta in deltas.items():
+        after = paid.get(assessment_id) or 0
+        pending += (after - delta > 0) - (after > 0)
+    return {"collection": sum(deltas.values()), "pending": pending}
+
+
+def record_payments(collection, pending):
+    """Apply ``payment_changes`` to the cached counters, after commit."""
+    if collection:
+        bump_dashboard_stat("total_collection", _centavos(collection))
+    if pending:
+        bump_dashboard_stat("pending_enrollments", pending)
+
+
+def invalidate_dashboard_stats(*names):
+    cache.delete_many([CACHE_PREFIX + name for name in names or COUNTERS])
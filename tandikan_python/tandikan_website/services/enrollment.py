@@ -0,0 +1,232 @@
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from .conflicts import SLOT_FIELDS, ScheduleConflictIndex, Slot
+from .dashboard import invalidate_dashboard_stats
+from .seats import recount_seats
+from .timetables import rebuild_rosters, rebuild_timetables
+from ..models import (
+    AcademicTerm,
+    ClassSchedule,
+    Enrollment,
+    EnrollmentSubject,
+    StudentInfo,
+)
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+# --------------------------------------------------------
+# INPUT / OUTPUT
+# --------------------------------------------------------
+
+@dataclass
+class EnrollmentSelection:
+    student_id: str
+    schedule_ids: list
+
+
+@dataclass
+class BulkEnrollmentResult:
+    enrollments_created: int = 0
+    subjects_created: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_created(self):
+        return self.enrollments_created + self.subjects_created
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.rows_created / self.elapsed
+
+    def merge(self, other):
+        self.enrollments_created += other.enrollments_created
+        self.subjects_created += other.subjects_created
+        self.errors.extend(other.errors)
+        self.elapsed += other.elapsed
+
+    def as_dict(self):
+        return {
+            "enrollments_created": self.enrollments_created,
+            "subjects_created": self.subjects_created,
+            "rows_created": self.rows_created,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed, 4),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+# --------------------------------------------------------
+# BULK ENROLLMENT
+# --------------------------------------------------------
+
+def _merge_selections(selections):
+    """Collapse repeated students into one ordered, de-duplicated cart."""
+    carts = {}
+    for selection in selections:
+        if not isinstance(selection.schedule_ids, (list, tuple)):
+            raise TypeError(f"schedules of {selection.student_id} must be a list of schedule ids.")
+        cart = carts.setdefault(str(selection.student_id), [])
+        for schedule_id in selection.schedule_ids:
+            schedule_id = int(schedule_id)
+            if schedule_id not in cart:
+                cart.append(schedule_id)
+    return carts
+
+
+def _enroll_batch(term, carts):
+    result = BulkEnrollmentResult()
+    started = time.perf_counter()
+
+    student_ids = set(carts)
+    schedule_ids = {sid for cart in carts.values() for sid in cart}
+
+    known_students = set(
+        StudentInfo.objects.filter(student_id__in=student_ids)
+        .values_list("student_id", flat=True)
+    )
+    known_schedules = {
+        values[0]: Slot.from_values(*values)
+        for values in ClassSchedule.objects.filter(schedule_id__in=schedule_ids)
+        .values_list(*SLOT_FIELDS)
+    }
+
+    with transaction.atomic():
+        # Lock the requested sections so concurrent batches cannot both
+        # hand out their last seats, nor enroll the same student in them.
+        seats_left = {
+            schedule_id: None if capacity is None else capacity - taken
+            for schedule_id, capacity, taken in ClassSchedule.objects.select_for_update()
+            .filter(schedule_id__in=known_schedules)
+            .order_by("schedule_id")
+            .values_list("schedule_id", "capacity", "seats_taken")
+        }
+
+        # unique_together ('student', 'term'): reuse existing enrollments
+        enrollment_ids = dict(
+            Enrollment.objects.filter(term=term, student_id__in=known_students)
+            .values_list("student_id", "enrollment_id")
+        )
+
+        # unique_together ('enrollment', 'schedule'): skip existing pairs.
+        # The same rows seed the per-student time-conflict index.
+        existing_pairs = set()
+        conflict_index = ScheduleConflictIndex()
+        taken = EnrollmentSubject.objects.filter(
+            enrollment_id__in=enrollment_ids.values()
+        ).values_list("enrollment__student_id", *("schedule__" + name for name in SLOT_FIELDS))
+        for student_id, *values in taken:
+            slot = Slot.from_values(*values)
+            existing_pairs.add((student_id, slot.schedule_id))
+            conflict_index.add_student_slot(student_id, slot)
+
+        accepted = []
+        for student_id, cart in carts.items():
+            if student_id not in known_students:
+                result.errors.append({"student": student_id, "error": "Unknown student."})
+                continue
+            for schedule_id in cart:
+                if schedule_id not in known_schedules:
+                    result.errors.append({
+                        "student": student_id,
+                        "schedule": schedule_id,
+                        "error": "Unknown schedule.",
+                    })
+                elif (student_id, schedule_id) in existing_pairs:
+                    result.errors.append({
+                        "student": student_id,
+                        "schedule": schedule_id,
+                        "error": "Already enrolled in this schedule.",
+                    })
+                elif conflicts := conflict_index.student_conflicts(
+                    student_id, known_schedules[schedule_id]
+                ):
+                    result.errors.append({
+                        "student": student_id,
+                        "schedule": schedule_id,
+                        "error": f"Time conflict with schedule {conflicts[0].other_id}.",
+                    })
+                elif seats_left[schedule_id] is not None and seats_left[schedule_id] <= 0:
+                    result.errors.append({
+                        "student": student_id,
+                        "schedule": schedule_id,
+                        "error": "Section is full.",
+                    })
+                else:
+                    if seats_left[schedule_id] is not None:
+                        seats_left[schedule_id] -= 1
+                    conflict_index.add_student_slot(student_id, known_schedules[schedule_id])
+                    accepted.append((student_id, schedule_id))
+
+        # Only students with at least one accepted subject get an enrollment.
+        new_students = {student_id for student_id, _ in accepted if student_id not in enrollment_ids}
+        if new_students:
+            enrolled = Enrollment.objects.filter(term=term, student_id__in=new_students)
+            before = enrolled.count()
+            # A concurrent batch may have enrolled the same student first.
+            Enrollment.objects.bulk_create(
+                [Enrollment(student_id=student_id, term=term) for student_id in new_students],
+                ignore_conflicts=True,
+            )
+            result.enrollments_created = enrolled.count() - before
+            # Re-read instead of trusting returned pks, which not every
+            # backend fills in on bulk_create.
+            enrollment_ids.update(enrolled.values_list("student_id", "enrollment_id"))
+
+        new_subjects = [
+            EnrollmentSubject(enrollment_id=enrollment_ids[student_id], schedule_id=schedule_id)
+            for student_id, schedule_id in accepted
+        ]
+        changed = {subject.enrollment_id for subject in new_subjects}
+        seats = {subject.schedule_id for subject in new_subjects}
+        if new_subjects:
+            written = EnrollmentSubject.objects.filter(enrollment_id__in=changed, schedule_id__in=seats)
+            before = written.count()
+            # A pair a concurrent run inserted first is skipped rather than
+            # aborting the batch.
+            EnrollmentSubject.objects.bulk_create(new_subjects, ignore_conflicts=True)
+            result.subjects_created = written.count() - before
+            # bulk_create skips EnrollmentSubject.save(), which counts seats;
+            # recounting from the rows also covers the skipped pairs.
+            recount_seats(seats)
+            # bulk_create skips signals, so flag the changed enrollments and
+            # rebuild their timetables and rosters here.
+            Enrollment.objects.filter(pk__in=changed).update(subjects_changed_at=timezone.now())
+            rebuild_timetables(changed)
+            rebuild_rosters(seats)
+
+    if result.enrollments_created:
+        # bulk_create skips the signals that keep the counter current.
+        invalidate_dashboard_stats("pending_enrollments")
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def bulk_enroll(term, selections, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Enroll many students at once.
+
+    ``selections`` is an iterable of ``EnrollmentSelection``. Each batch of
+    ``batch_size`` students is validated with a handful of set-based queries
+    and written with ``bulk_create`` inside its own transaction.
+    """
+    if not isinstance(term, AcademicTerm):
+        term = AcademicTerm.objects.get(pk=term)
+
+    carts = _merge_selections(selections)
+    student_ids = list(carts)
+
+    result = BulkEnrollmentResult()
+    for start in range(0, len(student_ids), batch_size):
+        batch = {sid: carts[sid] for sid in student_ids[start:start + batch_size]}
+        result.merge(_enroll_batch(term, batch))
+    return result
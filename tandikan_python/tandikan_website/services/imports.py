@@ -0,0 +1,419 @@
+import csv
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from ..models import ClassSchedule, College, Faculty, Program, StudentInfo, Subject, User
+from .conflicts import is_day_code
+from .dashboard import invalidate_dashboard_stats
+from .passwords import HashingPool
+from .prerequisites import invalidate_prerequisite_graphs
+from .search import index_objects
+from .timetables import rebuild_rosters
+
+
+CHUNK_SIZE = 1000
+
+
+@dataclass
+class RowError:
+    line: int
+    field: str
+    message: str
+
+
+@dataclass
+class ImportResult:
+    kind: str
+    created: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return (self.created + len(self.errors)) / self.elapsed
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "created": self.created,
+            "errors": len(self.errors),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def write_error_report(errors, stream):
+    writer = csv.writer(stream)
+    writer.writerow(["line", "field", "message"])
+    for error in errors:
+        writer.writerow([error.line, error.field, error.message])
+
+
+# --------------------------------------------------------
+# IMPORTERS
+# --------------------------------------------------------
+
+def _by_name(queryset, key, value="pk"):
+    return {name.strip().lower(): pk for name, pk in queryset.values_list(key, value)}
+
+
+class Importer:
+    """
+    Turns CSV rows into unsaved model instances and writes them in bulk.
+    Foreign keys are resolved from dicts loaded once per import, so
+    validating a row costs no queries.
+    """
+
+    kind = None
+    # Columns every file must have.
+    required = ()
+    # name -> (model, field): values that must not exist yet, checked with
+    # one query per chunk.
+    unique = {}
+
+    def __init__(self, hashing_pool):
+        self.hashing_pool = hashing_pool
+        self.seen = {name: set() for name in self.unique}
+
+    def build(self, row):
+        """Return the item for one row or raise ValidationError."""
+        raise NotImplementedError
+
+    def keys(self, item):
+        """name -> value for the ``unique`` checks."""
+        raise NotImplementedError
+
+    def prepare(self, items):
+        """Slow per-item work done before the chunk's transaction opens."""
+
+    def save(self, items):
+        raise NotImplementedError
+
+    def drop_duplicates(self, items, errors):
+        existing = {}
+        for name, (model, model_field) in self.unique.items():
+            values = [self.keys(item)[name] for _, item in items]
+            existing[name] = set(
+                model.objects.filter(**{f"{model_field}__in": values}).values_list(model_field, flat=True)
+            )
+        kept = []
+        for line, item in items:
+            keys = self.keys(item)
+            for name, value in keys.items():
+                if value in existing[name]:
+                    errors.append(RowError(line, name, f"{value} already exists."))
+                    break
+                if value in self.seen[name]:
+                    errors.append(RowError(line, name, f"{value} appears earlier in the file."))
+                    break
+            else:
+                for name, value in keys.items():
+                    self.seen[name].add(value)
+                kept.append((line, item))
+        return kept
+
+    @staticmethod
+    def check(instance, exclude):
+        instance.clean_fields(exclude=exclude)
+
+    def lookup(self, table, row, column, label, required=True):
+        value = row.get(column, "")
+        if not value:
+            if required:
+                raise ValidationError({column: "This field is required."})
+            return None
+        try:
+            return table[value.lower()]
+        except KeyError:
+            raise ValidationError({column: f"Unknown {label} {value!r}."})
+
+
+class _AccountImporter(Importer):
+    """Rows that also create the User account they log in with."""
+
+    role = None
+
+    def account(self, row, username):
+        user = User(
+            username=username,
+            email=row.get("email", ""),
+            first_name=row.get("first_name", ""),
+            last_name=row.get("last_name", ""),
+            role=self.role,
+        )
+        self.check(user, exclude=["password", "last_login", "date_joined"])
+        return user
+
+    def prepare(self, items):
+        passwords = self.hashing_pool.hash([password for _, _, password in items])
+        for (_, user, _), password in zip(items, passwords):
+            user.password = password
+
+    def create_accounts(self, items):
+        User.objects.bulk_create([user for _, user, _ in items])
+        for profile, user, _ in items:
+            profile.user = user
+        return [profile for profile, _, _ in items]
+
+
+class StudentImporter(_AccountImporter):
+    kind = "students"
+    role = "student"
+    required = ("student_id", "first_name", "last_name", "program")
+    unique = {"student_id": (StudentInfo, "student_id"), "username": (User, "username")}
+
+    def __init__(self, hashing_pool):
+        super().__init__(hashing_pool)
+        self.colleges = _by_name(College.objects, "college_name")
+        self.programs = _by_name(Program.objects, "program_code")
+        self.program_colleges = dict(Program.objects.values_list("pk", "college_id"))
+
+    def build(self, row):
+        program_id = self.lookup(self.programs, row, "program", "program")
+        college_id = self.lookup(self.colleges, row, "college", "college", required=False)
+        student = StudentInfo(
+            student_id=row["student_id"],
+            first_name=row["first_name"],
+            middle_name=row.get("middle_name") or None,
+            last_name=row["last_name"],
+            college_id=college_id or self.program_colleges[program_id],
+            program_id=program_id,
+            year_level=row.get("year_level") or 1,
+            birth_date=row.get("birth_date") or None,
+            contact_no=row.get("contact_no", ""),
+            emergency_contact_name=row.get("emergency_contact_name", ""),
+            emergency_contact_number=row.get("emergency_contact_number", ""),
+            address=row.get("address", ""),
+            email=row.get("email", ""),
+        )
+        self.check(student, exclude=["user", "college", "program"])
+        user = self.account(row, row.get("username") or row["student_id"])
+        return student, user, row.get("password", "")
+
+    def keys(self, item):
+        student, user, _ = item
+        return {"student_id": student.student_id, "username": user.username}
+
+    def save(self, items):
+        students = StudentInfo.objects.bulk_create(self.create_accounts(items))
+        index_objects("student", students)
+        transaction.on_commit(partial(invalidate_dashboard_stats, "total_students"))
+        return len(students)
+
+
+class FacultyImporter(_AccountImporter):
+    kind = "faculty"
+    role = "instructor"
+    required = ("first_name", "last_name", "gender", "email")
+    unique = {"username": (User, "username")}
+
+    def __init__(self, hashing_pool):
+        super().__init__(hashing_pool)
+        self.colleges = _by_name(College.objects, "college_name")
+
+    def build(self, row):
+        faculty = Faculty(
+            college_id=self.lookup(self.colleges, row, "college", "college", required=False),
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            gender=row["gender"],
+            address=row.get("address", ""),
+            contact_no=row.get("contact_no", ""),
+            birth_date=row.get("birth_date") or None,
+            emergency_contact=row.get("emergency_contact", ""),
+            emergency_contact_name=row.get("emergency_contact_name", ""),
+            email=row["email"],
+        )
+        self.check(faculty, exclude=["user", "college"])
+        user = self.account(row, row.get("username") or row["email"])
+        return faculty, user, row.get("password", "")
+
+    def keys(self, item):
+        return {"username": item[1].username}
+
+    def save(self, items):
+        faculty = Faculty.objects.bulk_create(self.create_accounts(items))
+        index_objects("faculty", faculty)
+        transaction.on_commit(partial(invalidate_dashboard_stats, "total_faculty"))
+        return len(faculty)
+
+
+class SubjectImporter(Importer):
+    kind = "subjects"
+    required = ("subject_code", "subject_name", "units", "semester")
+    unique = {"subject_code": (Subject, "subject_code")}
+
+    def __init__(self, hashing_pool):
+        super().__init__(hashing_pool)
+        self.colleges = _by_name(College.objects, "college_name")
+        self.programs = _by_name(Program.objects, "program_code")
+        self.program_colleges = dict(Program.objects.values_list("pk", "college_id"))
+
+    def build(self, row):
+        program_id = self.lookup(self.programs, row, "program", "program", required=False)
+        college_id = self.lookup(self.colleges, row, "college", "college", required=False)
+        subject = Subject(
+            subject_code=row["subject_code"],
+            subject_name=row["subject_name"],
+            units=row["units"],
+            year_level=row.get("year_level") or 1,
+            semester=row["semester"],
+            college_id=college_id or self.program_colleges.get(program_id),
+            program_id=program_id,
+        )
+        self.check(subject, exclude=["college", "program"])
+        return subject
+
+    def keys(self, item):
+        return {"subject_code": item.subject_code}
+
+    def save(self, items):
+        subjects = Subject.objects.bulk_create(items)
+        index_objects("subject", subjects)
+        transaction.on_commit(invalidate_prerequisite_graphs)
+        transaction.on_commit(partial(invalidate_dashboard_stats, "total_subjects"))
+        return len(subjects)
+
+
+class ScheduleImporter(Importer):
+    """
+    Rows naming the same room or instructor at the same day and times as an
+    existing schedule are rejected here. Overlapping, non-identical times
+    are left to the ``audit_schedule_conflicts`` command.
+    """
+
+    kind = "schedules"
+    required = ("subject", "instructor", "day", "start_time", "end_time", "room")
+
+    def __init__(self, hashing_pool):
+        super().__init__(hashing_pool)
+        self.subjects = _by_name(Subject.objects, "subject_code")
+        self.instructors = _by_name(Faculty.objects, "email")
+        slots = ClassSchedule.objects.values_list("instructor_id", "room", "day", "start_time", "end_time")
+        self.booked = {"instructor": set(), "room": set()}
+        for instructor_id, room, *times in slots:
+            self.booked["instructor"].add((instructor_id, *times))
+            self.booked["room"].add((room.lower(), *times))
+
+    def build(self, row):
+        schedule = ClassSchedule(
+            subject_id=self.lookup(self.subjects, row, "subject", "subject"),
+            instructor_id=self.lookup(self.instructors, row, "instructor", "instructor email"),
+            day=row["day"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            room=row["room"],
+            capacity=row.get("capacity") or None,
+        )
+        self.check(schedule, exclude=["subject", "instructor"])
+        if not is_day_code(schedule.day):
+            raise ValidationError({"day": "Use day codes such as MWF, TTh or Sat."})
+        if schedule.start_time >= schedule.end_time:
+            raise ValidationError({"end_time": "End time must be after start time."})
+        return schedule
+
+    def drop_duplicates(self, items, errors):
+        kept = []
+        for line, schedule in items:
+            times = (schedule.day, schedule.start_time, schedule.end_time)
+            keys = {
+                "instructor": (schedule.instructor_id, *times),
+                "room": (schedule.room.lower(), *times),
+            }
+            clash = next((name for name, key in keys.items() if key in self.booked[name]), None)
+            if clash is not None:
+                errors.append(RowError(line, clash, f"The {clash} is already booked at that time."))
+                continue
+            for name, key in keys.items():
+                self.booked[name].add(key)
+            kept.append((line, schedule))
+        return kept
+
+    def save(self, items):
+        created = len(ClassSchedule.objects.bulk_create(items))
+        # bulk_create skips the signal that gives each schedule its roster,
+        # and not every backend returns the new pks.
+        rebuild_rosters(ClassSchedule.objects.filter(roster__isnull=True).values_list("pk", flat=True))
+        return created
+
+
+IMPORTERS = {
+    importer.kind: importer
+    for importer in (StudentImporter, FacultyImporter, SubjectImporter, ScheduleImporter)
+}
+
+
+# --------------------------------------------------------
+# ENGINE
+# --------------------------------------------------------
+
+def _rows(reader):
+    for line, row in enumerate(reader, 2):
+        # Spreadsheet exports pad cells with spaces and name columns freely.
+        yield line, {
+            (key or "").strip().lower(): (value or "").strip()
+            for key, value in row.items()
+            if key is not None
+        }
+
+
+def run_import(kind, stream, processes=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Import the CSV text ``stream`` in chunks of ``chunk_size`` rows. Each
+    chunk is validated in memory, checked for duplicates with one query per
+    unique column and written with ``bulk_create`` in its own transaction,
+    so a bad row only costs itself. A chunk the database still refuses is
+    saved again row by row. Rows that fail end up in ``result.errors`` with
+    their line number.
+    """
+    started = time.perf_counter()
+    result = ImportResult(kind)
+    reader = csv.DictReader(stream)
+    headers = {(name or "").strip().lower() for name in reader.fieldnames or ()}
+    with HashingPool(processes) as hashing_pool:
+        importer = IMPORTERS[kind](hashing_pool)
+        missing = [column for column in importer.required if column not in headers]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}.")
+
+        rows = _rows(reader)
+        while chunk := list(islice(rows, chunk_size)):
+            items = []
+            for line, row in chunk:
+                try:
+                    items.append((line, importer.build(row)))
+                except ValidationError as exc:
+                    for name, messages in exc.message_dict.items():
+                        result.errors.extend(RowError(line, name, message) for message in messages)
+            kept = importer.drop_duplicates(items, result.errors)
+            if kept:
+                items = [item for _, item in kept]
+                importer.prepare(items)
+                try:
+                    with transaction.atomic():
+                        result.created += importer.save(items)
+                except IntegrityError:
+                    # Someone else wrote a clashing row since the duplicate
+                    # check. Rebuilt, as the failed attempt may have left pks
+                    # on the instances.
+                    chunk_rows = dict(chunk)
+                    for line, _ in kept:
+                        item = importer.build(chunk_rows[line])
+                        importer.prepare([item])
+                        try:
+                            with transaction.atomic():
+                                result.created += importer.save([item])
+                        except IntegrityError as exc:
+                            result.errors.append(RowError(line, "", f"Not saved: {exc}"))
+            if progress is not None:
+                progress(chunk[-1][0] - 1, result)
+
+    result.errors.sort(key=lambda error: error.line)
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,263 @@
+import inspect
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Job
+
+
+# Seconds before the first retry of a failed job; doubled on every attempt.
+DEFAULT_RETRY_DELAY = 30
+# Seconds a job may stay "running" before it is assumed lost with its worker.
+DEFAULT_TIMEOUT = 3600
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    title: str
+    handler: object
+    max_attempts: int
+    # Queued by the code that prepares its input, never from the jobs page.
+    internal: bool = False
+
+    def check_params(self, params):
+        """Raise ValueError unless ``params`` are exactly arguments the handler takes."""
+        if not isinstance(params, dict):
+            raise ValueError("Job params must be an object.")
+        try:
+            inspect.signature(self.handler).bind(None, **params)
+        except TypeError as exc:
+            raise ValueError(f"Bad params for {self.name!r} jobs: {exc}.")
+
+
+JOBS = {}
+
+
+def job(name, title, max_attempts=3, internal=False):
+    """Register ``handler(context, **params)`` as the handler for ``name`` jobs."""
+    def register(handler):
+        JOBS[name] = JobType(name, title, handler, max_attempts, internal)
+        return handler
+    return register
+
+
+class JobContext:
+    """Handed to a job handler to report progress on its Job row."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def progress(self, done, total=None, message=""):
+        percent = min(int(done * 100 / total), 99) if total else done
+        Job.objects.filter(pk=self.job.pk).update(progress=percent, message=message[:255])
+
+
+# --------------------------------------------------------
+# QUEUE
+# --------------------------------------------------------
+
+def enqueue(kind, params=None, user=None):
+    if kind not in JOBS:
+        raise ValueError(f"Unknown job kind {kind!r}.")
+    params = params or {}
+    JOBS[kind].check_params(params)
+    return Job.objects.create(
+        kind=kind,
+        params=params,
+        max_attempts=JOBS[kind].max_attempts,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_jobs(worker, limit):
+    """
+    Mark up to ``limit`` due jobs as running on ``worker`` and return their
+    ids. Each claim is a conditional UPDATE, so two workers polling at once
+    never both get the same job, on any database backend.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status="queued", run_after__lte=now)
+        .order_by("run_after", "pk")
+        .values_list("pk", flat=True)[: limit * 2]
+    )
+    claimed = []
+    for pk in candidates:
+        if len(claimed) == limit:
+            break
+        if Job.objects.filter(pk=pk, status="queued").update(
+            status="running",
+            worker=worker,
+            started_at=now,
+            attempts=F("attempts") + 1,
+            progress=0,
+            message="",
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def fail_job(job_id, error):
+    """Record a failed attempt: queue a retry with backoff, or give up."""
+    job = Job.objects.get(pk=job_id)
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        delay = getattr(settings, "JOB_RETRY_DELAY", DEFAULT_RETRY_DELAY) * 2 ** (job.attempts - 1)
+        job.status = "queued"
+        job.run_after = now + timedelta(seconds=delay)
+    else:
+        job.status = "failed"
+        job.finished_at = now
+    job.error = error
+    job.save(update_fields=["status", "run_after", "finished_at", "error"])
+    return job.status
+
+
+def release_jobs(job_ids):
+    """Put jobs a stopping worker did not finish back in the queue, uncounted."""
+    return Job.objects.filter(pk__in=job_ids, status="running").update(
+        status="queued", worker="", attempts=F("attempts") - 1
+    )
+
+
+def requeue_stale_jobs():
+    """Fail the current attempt of jobs running longer than ``JOB_TIMEOUT``."""
+    timeout = getattr(settings, "JOB_TIMEOUT", DEFAULT_TIMEOUT)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status="running", started_at__lt=cutoff).values_list("pk", flat=True)
+    for job_id in stale:
+        fail_job(job_id, f"Still running after {timeout}s; worker presumed lost.")
+    return len(stale)
+
+
+def run_job(job_id):
+    """Run one claimed job to completion. Called inside a worker process."""
+    close_old_connections()
+    job = Job.objects.get(pk=job_id)
+    job_type = JOBS.get(job.kind)
+    try:
+        if job_type is None:
+            raise LookupError(f"No handler registered for {job.kind!r}.")
+        result = job_type.handler(JobContext(job), **job.params)
+    except Exception:
+        return fail_job(job_id, traceback.format_exc())
+    finally:
+        close_old_connections()
+
+    Job.objects.filter(pk=job_id).update(
+        status="succeeded",
+        progress=100,
+        result=result,
+        error="",
+        finished_at=timezone.now(),
+    )
+    return "succeeded"
+
+
+def job_as_dict(job):
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "title": JOBS[job.kind].title if job.kind in JOBS else job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error.strip().splitlines()[-1] if job.error else "",
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# --------------------------------------------------------
+# HANDLERS
+# --------------------------------------------------------
+
+def output_dir():
+    path = Path(getattr(settings, "JOB_OUTPUT_DIR", settings.BASE_DIR / "job_output"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@job("generate_assessments", "Generate assessments")
+def generate_assessments_job(context, term_id, incremental=False):
+    from ..models import AcademicTerm
+    from .assessment import generate_assessments
+
+    term = AcademicTerm.objects.get(pk=term_id)
+    context.progress(0, message=f"Assessing {term}")
+    result = generate_assessments(term, incremental=incremental)
+    return {"assessed": result.assessed, "elapsed": round(result.elapsed, 3)}
+
+
+@job("recompute_balances", "Recompute balances")
+def recompute_balances_job(context):
+    from .ledger import recompute_balances
+
+    return {"updated": recompute_balances()}
+
+
+@job("report", "Export report")
+def report_job(context, name, format="csv", params=None):
+    from .reports import REPORTS, report_filename, report_params, stream_report
+
+    report = REPORTS[name]
+    params = report_params(report, params or {})
+    path = output_dir() / f"job{context.job.pk}-{report_filename(report, params, format)}"
+    written = 0
+    with open(path, "wb") as output:
+        for chunk in stream_report(report, params, format, context.job.created_by):
+            output.write(chunk)
+            written += len(chunk)
+            context.progress(0, message=f"{written // 1024} KiB written")
+    return {"file": path.name, "bytes": written}
+
+
+def import_upload_path(file):
+    """
+    The uploaded CSV ``file`` names in output_dir(). Only a bare file name
+    written there by CsvImportMixin is accepted, never a path.
+    """
+    directory = output_dir().resolve()
+    path = (directory / file).resolve()
+    if Path(file).name != file or not file.startswith("import-") or not path.is_relative_to(directory):
+        raise ValueError(f"Not an uploaded import file: {file!r}.")
+    return path
+
+
+# Queued by CsvImportMixin with the name of the file it saved; not retried,
+# as rows from a failed run may already be in the database.
+@job("import", "CSV import", max_attempts=1, internal=True)
+def import_job(context, kind, file):
+    from .imports import run_import, write_error_report
+
+    path = import_upload_path(file)
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as stream:
+            total = sum(1 for _ in stream) - 1
+            stream.seek(0)
+            result = run_import(
+                kind,
+                stream,
+                progress=lambda lines, result: context.progress(
+                    lines, total, f"{result.created} created, {len(result.errors)} rejected"
+                ),
+            )
+    finally:
+        path.unlink(missing_ok=True)
+    outcome = result.as_dict()
+    if result.errors:
+        report = path.with_name(f"{path.stem}-errors.csv")
+        with open(report, "w", newline="", encoding="utf-8") as stream:
+            write_error_report(result.errors, stream)
+        outcome["file"] = report.name
+    return outcome
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from ..models import Assessment, Payment
+
+
+ZERO = Decimal("0.00")
+
+
+# --------------------------------------------------------
+# RUNNING BALANCE
+# --------------------------------------------------------
+
+def apply_payment(assessment_id, amount, date_paid):
+    """Add a new payment to the running totals with a single UPDATE."""
+    Assessment.objects.filter(pk=assessment_id).update(
+        amount_paid=F("amount_paid") + amount,
+        last_payment_date=Greatest(
+            Coalesce(F("last_payment_date"), Value(date_paid)), Value(date_paid)
+        ),
+    )
+
+
+def _payment_totals():
+    payments = Payment.objects.filter(assessment=OuterRef("pk")).values("assessment")
+    paid = Subquery(
+        payments.annotate(total=Sum("amount_paid")).values("total"),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    last_paid = Subquery(payments.annotate(last=Max("date_paid")).values("last"))
+    return Coalesce(paid, Value(ZERO)), last_paid
+
+
+def recompute_balances(assessment_ids=None):
+    """
+    Rebuild the running totals from the raw Payment rows. Used when a payment
+    is edited or deleted, and by the reconciliation command.
+    """
+    assessments = Assessment.objects.all()
+    if assessment_ids is not None:
+        assessments = assessments.filter(pk__in=assessment_ids)
+    paid, last_paid = _payment_totals()
+    return assessments.update(amount_paid=paid, last_payment_date=last_paid)
+
+
+def get_balance(student, term):
+    """Balance of a student for a term from one indexed lookup, or None."""
+    return (
+        Assessment.objects.filter(enrollment__student=student, enrollment__term=term)
+        .values("assessment_id", "total_amount", "amount_paid", "balance_due", "last_payment_date")
+        .first()
+    )
+
+
+# --------------------------------------------------------
+# RECONCILIATION
+# --------------------------------------------------------
+
+@dataclass(frozen=True)
+class BalanceMismatch:
+    assessment_id: int
+    stored_paid: Decimal
+    actual_paid: Decimal
+    stored_last_payment: object
+    actual_last_payment: object
+
+    def __str__(self):
+        return (
+            f"Assessment {self.assessment_id}: stored paid {self.stored_paid}, "
+            f"payments total {self.actual_paid} "
+            f"(last payment {self.stored_last_payment} vs {self.actual_last_payment})"
+        )
+
+
+def find_balance_mismatches():
+    """Compare the stored totals with the Payment rows in one grouped query."""
+    actual = {
+        assessment_id: (total, last)
+        for assessment_id, total, last in Payment.objects.values("assessment")
+        .annotate(total=Sum("amount_paid"), last=Max("date_paid"))
+        .values_list("assessment", "total", "last")
+        .order_by()
+    }
+
+    mismatches = []
+    stored = Assessment.objects.values_list("assessment_id", "amount_paid", "last_payment_date")
+    for assessment_id, stored_paid, stored_last in stored.iterator(chunk_size=5000):
+        actual_paid, actual_last = actual.get(assessment_id, (ZERO, None))
+        if stored_paid != actual_paid or stored_last != actual_last:
+            mismatches.append(BalanceMismatch(
+                assessment_id, stored_paid, actual_paid, stored_last, actual_last
+            ))
+    return mismatches
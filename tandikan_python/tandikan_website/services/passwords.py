@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+
+
+# Below this many passwords, hashing in this process is faster than
+# handing them to the pool.
+POOL_THRESHOLD = 8
+
+
+class HashingPool:
+    """
+    ``make_password`` over a pool of processes, one per core by default.
+    Password hashing is deliberately slow and holds the GIL, so threads
+    would not help. Blank passwords become unusable ones without hashing.
+    The pool starts on first use and is reused until the block exits.
+    """
+
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count() or 1
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def hash(self, passwords):
+        hashed = [make_password(None) for _ in passwords]
+        todo = [(n, password) for n, password in enumerate(passwords) if password]
+        if len(todo) < POOL_THRESHOLD or self.processes == 1:
+            results = [make_password(password) for _, password in todo]
+        else:
+            if self._pool is None:
+                # Spawned, so the children share no database connection or
+                # other state with this process.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=django.setup,
+                )
+            chunksize = max(1, len(todo) // (self.processes * 4))
+            results = self._pool.map(make_password, [password for _, password in todo], chunksize=chunksize)
+        for (n, _), value in zip(todo, results):
+            hashed[n] = value
+        return hashed
+
+
+def hash_passwords(passwords, processes=None):
+    """Hash ``passwords`` in parallel; for one-off bulk account creation."""
+    with HashingPool(processes) as pool:
+        return pool.hash(passwords)
@@ -0,0 +1,176 @@
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from ..models import AcademicTerm, EnrollmentSubject, Subject, SubjectPrerequisite
+
+
+CACHE_VERSION_KEY = "prerequisites:version"
+CACHE_TIMEOUT = 60 * 60
+
+
+# --------------------------------------------------------
+# GRAPH
+# --------------------------------------------------------
+
+class PrerequisiteGraph:
+    """
+    Prerequisite edges of one program with their transitive closure and a
+    topological order. ``cycles`` lists the subjects that sit on a cycle.
+    """
+
+    def __init__(self, edges):
+        self.requires = defaultdict(set)   # subject -> direct prerequisites
+        nodes = set()
+        for subject_id, prerequisite_id in edges:
+            self.requires[subject_id].add(prerequisite_id)
+            nodes.update((subject_id, prerequisite_id))
+
+        self.order, self.cycles = self._topological_order(nodes)
+        self.closure = self._closure()
+
+    def _topological_order(self, nodes):
+        pending = {node: len(self.requires.get(node, ())) for node in nodes}
+        unlocks = defaultdict(list)
+        for subject_id, prerequisites in self.requires.items():
+            for prerequisite_id in prerequisites:
+                unlocks[prerequisite_id].append(subject_id)
+
+        ready = deque(sorted(node for node, count in pending.items() if count == 0))
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for subject_id in unlocks[node]:
+                pending[subject_id] -= 1
+                if pending[subject_id] == 0:
+                    ready.append(subject_id)
+
+        cycles = sorted(node for node, count in pending.items() if count > 0)
+        return order, cycles
+
+    def _closure(self):
+        closure = {}
+        # Prerequisites come first in topological order, so every direct
+        # prerequisite already has its closure when a subject is reached.
+        for node in self.order:
+            reach = set()
+            for prerequisite_id in self.requires.get(node, ()):
+                reach.add(prerequisite_id)
+                reach |= closure[prerequisite_id]
+            closure[node] = frozenset(reach)
+
+        # Subjects on a cycle cannot be ordered; fall back to a plain search.
+        for node in self.cycles:
+            reach = set()
+            queue = deque(self.requires.get(node, ()))
+            while queue:
+                prerequisite_id = queue.popleft()
+                if prerequisite_id not in reach:
+                    reach.add(prerequisite_id)
+                    queue.extend(self.requires.get(prerequisite_id, ()))
+            closure[node] = frozenset(reach)
+        return closure
+
+    def all_prerequisites(self, subject_id):
+        return self.closure.get(subject_id, frozenset())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["requires"] = dict(self.requires)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.requires = defaultdict(set, self.requires)
+
+
+def _cache_version():
+    return cache.get_or_set(CACHE_VERSION_KEY, 1, None)
+
+
+def invalidate_prerequisite_graphs():
+    """Drop every cached graph by moving to a new cache version."""
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, None)
+
+
+def get_prerequisite_graph(program_id=None):
+    """
+    Graph for a program, built from one query and cached until the
+    SubjectPrerequisite table changes. Subjects without a program (general
+    education) are part of every program's graph; ``None`` loads all edges.
+    """
+    key = f"prerequisites:graph:{_cache_version()}:{program_id or 'all'}"
+    graph = cache.get(key)
+    if graph is None:
+        edges = SubjectPrerequisite.objects.all()
+        if program_id is not None:
+            edges = edges.filter(Q(subject__program_id=program_id) | Q(subject__program__isnull=True))
+        graph = PrerequisiteGraph(edges.values_list("subject_id", "prerequisite_id"))
+        cache.set(key, graph, CACHE_TIMEOUT)
+    return graph
+
+
+# --------------------------------------------------------
+# ELIGIBILITY
+# --------------------------------------------------------
+
+@dataclass
+class Eligibility:
+    missing: dict = field(default_factory=dict)   # subject_id -> missing prerequisite ids
+    unknown: list = field(default_factory=list)   # requested ids that are not subjects
+
+    @property
+    def allowed(self):
+        return not self.missing and not self.unknown
+
+    def __bool__(self):
+        return self.allowed
+
+
+def earlier_terms(term):
+    """Terms before ``term``: earlier academic years, then earlier semesters."""
+    return AcademicTerm.objects.filter(
+        Q(academic_year__lt=term.academic_year)
+        | Q(academic_year=term.academic_year, semester__lt=term.semester)
+    )
+
+
+def completed_subject_ids(student, before_term=None):
+    """Subjects the student passed, in terms before ``before_term`` when given, in one query."""
+    passed = EnrollmentSubject.objects.filter(enrollment__student=student, status="passed")
+    if before_term is not None:
+        passed = passed.filter(enrollment__term__in=earlier_terms(before_term))
+    return set(passed.values_list("schedule__subject_id", flat=True))
+
+
+def can_enroll(student, subjects, term=None):
+    """
+    Check a whole cart of subjects at once. A subject is allowed when every
+    prerequisite in its transitive closure was passed in an enrollment of a
+    term before ``term``; subjects in the same cart do not satisfy each
+    other. Ids that are not subjects are reported in ``unknown``.
+    """
+    if term is not None and not isinstance(term, AcademicTerm):
+        term = AcademicTerm.objects.get(pk=term)
+    requested = list(dict.fromkeys(getattr(s, "pk", s) for s in subjects))
+    subject_programs = dict(
+        Subject.objects.filter(pk__in=requested).values_list("subject_id", "program_id")
+    )
+    completed = completed_subject_ids(student, before_term=term)
+
+    graphs = {}
+    eligibility = Eligibility(unknown=[s for s in requested if s not in subject_programs])
+    for subject_id, program_id in subject_programs.items():
+        program_id = program_id or student.program_id
+        if program_id not in graphs:
+            graphs[program_id] = get_prerequisite_graph(program_id)
+        missing = graphs[program_id].all_prerequisites(subject_id) - completed
+        if missing:
+            eligibility.missing[subject_id] = sorted(missing)
+    return eligibility
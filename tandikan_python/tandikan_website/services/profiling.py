@@ -0,0 +1,162 @@
+import bisect
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.template.base import Template
+
+
+# Upper bounds, in milliseconds, of the histogram buckets.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class RequestSample:
+    view: str
+    total_ms: float = 0.0
+    db_ms: float = 0.0
+    queries: int = 0
+    duplicate_queries: int = 0
+    template_ms: float = 0.0
+    peak_memory_kb: int | None = None
+    # SQL -> executions, only for statements that ran more than once
+    repeated_sql: dict = field(default_factory=dict)
+
+    def server_timing(self):
+        """Value for the ``Server-Timing`` response header."""
+        parts = [
+            f"total;dur={self.total_ms:.1f}",
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries, {self.duplicate_queries} duplicate"',
+            f"tpl;dur={self.template_ms:.1f}",
+        ]
+        if self.peak_memory_kb is not None:
+            parts.append(f'mem;desc="peak {self.peak_memory_kb} KiB"')
+        return ", ".join(parts)
+
+
+# --------------------------------------------------------
+# QUERIES
+# --------------------------------------------------------
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that times and counts every statement."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    @property
+    def count(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self):
+        """Executions of a statement already run in this request (N+1 suspects)."""
+        return self.count - len(self.statements)
+
+    def repeated(self, limit=5):
+        return {sql: n for sql, n in self.statements.most_common(limit) if n > 1}
+
+
+# --------------------------------------------------------
+# TEMPLATES
+# --------------------------------------------------------
+
+_template_time = ContextVar("template_time", default=None)
+_template_depth = ContextVar("template_depth", default=0)
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    # Only the outermost render is timed; {% include %} and {% extends %}
+    # render nested templates inside it.
+    depth = _template_depth.get()
+    totals = _template_time.get()
+    if totals is None or depth:
+        return _original_render(self, context)
+    token = _template_depth.set(depth + 1)
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        totals[0] += time.perf_counter() - started
+        _template_depth.reset(token)
+
+
+def install_template_timer():
+    Template.render = _timed_render
+
+
+def start_template_timer():
+    totals = [0.0]
+    return totals, _template_time.set(totals)
+
+
+def stop_template_timer(token):
+    _template_time.reset(token)
+
+
+# --------------------------------------------------------
+# ROLLING HISTOGRAM
+# --------------------------------------------------------
+
+class ProfileStore:
+    """The last ``history`` samples per view, kept in this process only."""
+
+    def __init__(self, history=1000):
+        self.history = history
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, sample):
+        with self._lock:
+            samples = self._samples.get(sample.view)
+            if samples is None:
+                samples = self._samples[sample.view] = deque(maxlen=self.history)
+            samples.append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    @staticmethod
+    def _percentile(values, percent):
+        return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+    def summary(self):
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+
+        views = {}
+        for view, samples in snapshot.items():
+            totals = sorted(sample.total_ms for sample in samples)
+            buckets = [0] * (len(BUCKETS_MS) + 1)
+            for total in totals:
+                buckets[bisect.bisect_left(BUCKETS_MS, total)] += 1
+            views[view] = {
+                "requests": len(samples),
+                "p50_ms": round(self._percentile(totals, 50), 2),
+                "p95_ms": round(self._percentile(totals, 95), 2),
+                "p99_ms": round(self._percentile(totals, 99), 2),
+                "max_ms": round(totals[-1], 2),
+                "mean_db_ms": round(sum(s.db_ms for s in samples) / len(samples), 2),
+                "mean_template_ms": round(sum(s.template_ms for s in samples) / len(samples), 2),
+                "mean_queries": round(sum(s.queries for s in samples) / len(samples), 1),
+                "max_duplicate_queries": max(s.duplicate_queries for s in samples),
+                "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + ["slower"], buckets)),
+                "last_repeated_sql": samples[-1].repeated_sql,
+            }
+        return dict(sorted(views.items(), key=lambda item: -item[1]["p95_ms"]))
+
+
+profile_store = ProfileStore()
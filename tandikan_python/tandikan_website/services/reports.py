@@ -0,0 +1,338 @@
+import csv
+import datetime
+import re
+import time
+import zipfile
+from dataclasses import dataclass
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db import router
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ..models import ClassSchedule, Enrollment, EnrollmentSubject, Payment, ReportLog
+from ..routers import replica_reads
+
+
+CHUNK_SIZE = 2000
+# Rows per chunk handed to the web server.
+ROWS_PER_FLUSH = 500
+
+
+# --------------------------------------------------------
+# WRITERS
+# --------------------------------------------------------
+
+class _Buffer:
+    """Write-only file object whose contents are drained after every flush."""
+
+    def __init__(self, text=False):
+        self._parts = []
+        self._offset = 0
+        self._text = text
+
+    def write(self, data):
+        self._parts.append(data)
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        # zipfile needs tell(); without seek() it writes data descriptors,
+        # which is what lets the archive be streamed.
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = ("" if self._text else b"").join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def csv_stream(headers, rows):
+    buffer = _Buffer(text=True)
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for n, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if n % ROWS_PER_FLUSH == 0:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# Characters XML 1.0 does not allow, even escaped.
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.strftime("%Y-%m-%d %H:%M:%S")
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_stream(headers, rows):
+    """
+    A single-sheet XLSX workbook written as it is read. Cells use inline
+    strings, so nothing has to be held back for a shared-strings table.
+    """
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(("<row>" + "".join(map(_xlsx_cell, headers)) + "</row>").encode())
+            for n, row in enumerate(rows, 1):
+                sheet.write(("<row>" + "".join(map(_xlsx_cell, row)) + "</row>").encode())
+                if n % ROWS_PER_FLUSH == 0:
+                    yield buffer.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield buffer.drain()
+
+
+FORMATS = {
+    "csv": (csv_stream, "text/csv"),
+    "xlsx": (xlsx_stream, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+# --------------------------------------------------------
+# REPORTS
+# --------------------------------------------------------
+
+@dataclass(frozen=True)
+class Report:
+    name: str
+    title: str
+    headers: tuple
+    # params dict -> values_list queryset, one tuple per output row
+    rows: object
+    roles: tuple
+
+
+def _class_list(params):
+    return (
+        EnrollmentSubject.objects.filter(schedule_id=params["schedule"], status="enrolled")
+        .order_by("enrollment__student__last_name", "enrollment__student__first_name")
+        .values_list(
+            "enrollment__student_id",
+            "enrollment__student__last_name",
+            "enrollment__student__first_name",
+            "enrollment__student__program__program_code",
+            "enrollment__student__year_level",
+            "enrollment__term__academic_year",
+            "enrollment__term__semester",
+        )
+    )
+
+
+def _enrollment_summary(params):
+    enrollments = Enrollment.objects.all()
+    if params.get("term"):
+        enrollments = enrollments.filter(term_id=params["term"])
+    return (
+        enrollments.values("term_id", "student__program_id")
+        .annotate(
+            students=Count("pk"),
+            units=Sum("assessment__total_units"),
+            assessed=Sum("assessment__total_amount"),
+            paid=Sum("assessment__amount_paid"),
+        )
+        .order_by("-term_id", "student__program__program_code")
+        .values_list(
+            "term__academic_year",
+            "term__semester",
+            "student__program__program_code",
+            "student__program__program_name",
+            "students",
+            "units",
+            "assessed",
+            "paid",
+        )
+    )
+
+
+def _payment_collection(params):
+    payments = Payment.objects.all()
+    if params.get("term"):
+        payments = payments.filter(assessment__enrollment__term_id=params["term"])
+    if params.get("start"):
+        payments = payments.filter(date_paid__date__gte=params["start"])
+    if params.get("end"):
+        payments = payments.filter(date_paid__date__lte=params["end"])
+    return payments.order_by("date_paid", "payment_id").values_list(
+        "payment_id",
+        "date_paid",
+        "assessment__enrollment__student_id",
+        "assessment__enrollment__student__last_name",
+        "assessment__enrollment__student__first_name",
+        "assessment__enrollment__term__academic_year",
+        "assessment__enrollment__term__semester",
+        "amount_paid",
+        "cashier__username",
+    )
+
+
+REPORTS = {
+    report.name: report
+    for report in (
+        Report(
+            "class-list",
+            "Class list",
+            ("Student ID", "Last name", "First name", "Program", "Year", "Academic year", "Semester"),
+            _class_list,
+            ("admin", "registrar", "instructor"),
+        ),
+        Report(
+            "enrollment-summary",
+            "Enrollment summary",
+            ("Academic year", "Semester", "Program", "Program name", "Students", "Units", "Assessed", "Paid"),
+            _enrollment_summary,
+            ("admin", "registrar"),
+        ),
+        Report(
+            "payment-collection",
+            "Collection report",
+            ("Payment", "Date paid", "Student ID", "Last name", "First name", "Academic year",
+             "Semester", "Amount", "Cashier"),
+            _payment_collection,
+            ("admin", "cashier"),
+        ),
+    )
+}
+
+
+# --------------------------------------------------------
+# ENGINE
+# --------------------------------------------------------
+
+def report_params(report, values):
+    """
+    The term, schedule, start and end filters from request or job
+    ``values``, parsed. Raises ValueError for a bad one, so callers can
+    refuse the run before any of it is streamed.
+    """
+    params = {}
+    for key in ("term", "schedule"):
+        value = values.get(key) or None
+        if value is not None:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be a number.")
+        params[key] = value
+    for key in ("start", "end"):
+        value = values.get(key) or None
+        if value is not None:
+            try:
+                value = parse_date(str(value))
+            except ValueError:
+                value = None
+            if value is None:
+                raise ValueError(f"{key} must be a date (YYYY-MM-DD).")
+        params[key] = value
+    if report.name == "class-list" and params["schedule"] is None:
+        raise ValueError("A schedule is required.")
+    return params
+
+
+def stream_report(report, params, export_format, user=None):
+    """
+    Yield the encoded report chunk by chunk. Rows come from
+    ``values_list().iterator(chunk_size=...)``, so memory use does not grow
+    with the size of the report. A completed run is logged to ReportLog,
+    with its row count and duration, once the last chunk is sent.
+    """
+    write, _ = FORMATS[export_format]
+    queryset = report.rows(params)
+    # The rows are read after the view has returned, outside any
+    # replica_reads() block, so pick the database now.
+    with replica_reads():
+        queryset = queryset.using(router.db_for_read(queryset.model))
+
+    counted = 0
+    started = time.perf_counter()
+
+    def rows():
+        nonlocal counted
+        for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+            counted += 1
+            yield row
+
+    for chunk in write(report.headers, rows()):
+        if chunk:
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+    ReportLog.objects.create(
+        report_name=report.title,
+        generated_by=user if user is not None and user.is_authenticated else None,
+        export_format=export_format,
+        row_count=counted,
+        duration_ms=round((time.perf_counter() - started) * 1000),
+    )
+
+
+def report_filename(report, params, export_format):
+    suffix = ""
+    if report.name == "class-list":
+        schedule = ClassSchedule.objects.filter(pk=params["schedule"]).values_list(
+            "subject__subject_code", flat=True
+        ).first()
+        suffix = f"-{schedule or params['schedule']}"
+    elif params.get("term"):
+        suffix = f"-term{params['term']}"
+    stamp = timezone.localdate().isoformat()
+    return f"{report.name}{suffix}-{stamp}.{export_format}"
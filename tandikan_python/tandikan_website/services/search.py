@@ -0,0 +1,140 @@
+from django.db import connections, transaction
+from django.db.models import IntegerField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from ..models import Faculty, SearchEntry, StudentInfo, Subject
+
+
+# Created, together with its sync triggers, by migration 0005.
+FTS_TABLE = "tandikan_website_searchentry_fts"
+TYPEAHEAD_LIMIT = 20
+# The trigram tokenizer cannot match anything shorter than three characters.
+MIN_FTS_LENGTH = 3
+
+
+# --------------------------------------------------------
+# ENTRIES
+# --------------------------------------------------------
+
+def _join(*parts):
+    return " ".join(part for part in parts if part)
+
+
+def student_entry(student):
+    return SearchEntry(
+        kind="student",
+        object_id=student.student_id,
+        label=f"{student.student_id} - {student.last_name}, {student.first_name}",
+        body=_join(
+            student.student_id, student.first_name, student.middle_name, student.last_name,
+            student.user.first_name, student.user.last_name, student.email,
+        ),
+    )
+
+
+def faculty_entry(faculty):
+    return SearchEntry(
+        kind="faculty",
+        object_id=str(faculty.faculty_id),
+        label=f"{faculty.last_name}, {faculty.first_name}",
+        body=_join(faculty.first_name, faculty.last_name, faculty.email),
+    )
+
+
+def subject_entry(subject):
+    return SearchEntry(
+        kind="subject",
+        object_id=str(subject.subject_id),
+        label=f"{subject.subject_code} - {subject.subject_name}",
+        body=_join(subject.subject_code, subject.subject_name),
+    )
+
+
+# kind -> (model, joins needed by the entry builder, entry builder)
+INDEXED = {
+    "student": (StudentInfo, ("user",), student_entry),
+    "faculty": (Faculty, (), faculty_entry),
+    "subject": (Subject, (), subject_entry),
+}
+
+
+def index_objects(kind, objects):
+    """Insert or refresh the entries for ``objects``."""
+    entries = [INDEXED[kind][2](obj) for obj in objects]
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=["label", "body"],
+    )
+
+
+def unindex_object(kind, pk):
+    SearchEntry.objects.filter(kind=kind, object_id=str(pk)).delete()
+
+
+def rebuild_search_index(chunk_size=2000):
+    """Recreate every entry; needed after imports that bypass signals."""
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        for kind, (model, joins, _) in INDEXED.items():
+            batch = []
+            for obj in model.objects.select_related(*joins).iterator(chunk_size=chunk_size):
+                batch.append(obj)
+                if len(batch) == chunk_size:
+                    index_objects(kind, batch)
+                    batch = []
+            index_objects(kind, batch)
+    return SearchEntry.objects.count()
+
+
+# --------------------------------------------------------
+# QUERIES
+# --------------------------------------------------------
+
+def matching_entries(term, kind=None, using="default"):
+    """
+    SearchEntry rows whose text contains every word of ``term``. SQLite
+    answers from the FTS5 trigram index and PostgreSQL from the trigram GIN
+    index; words too short for trigrams are matched with LIKE.
+    """
+    words = term.split()
+    entries = SearchEntry.objects.using(using)
+    if kind:
+        entries = entries.filter(kind=kind)
+
+    if connections[using].vendor == "sqlite":
+        indexed = [word for word in words if len(word) >= MIN_FTS_LENGTH]
+        if indexed:
+            # One quoted string per word: a single phrase would need the
+            # words next to each other, in order.
+            query = " AND ".join('"' + word.replace('"', '""') + '"' for word in indexed)
+            entries = entries.filter(
+                id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [query])
+            )
+            words = [word for word in words if len(word) < MIN_FTS_LENGTH]
+    for word in words:
+        entries = entries.filter(body__icontains=word)
+    return entries
+
+
+def search_queryset(queryset, kind, term):
+    """Restrict a StudentInfo, Faculty or Subject queryset to search matches."""
+    object_ids = matching_entries(term, kind, using=queryset.db)
+    if kind == "student":
+        object_ids = object_ids.values("object_id")
+    else:
+        object_ids = object_ids.annotate(
+            pk_value=Cast("object_id", output_field=IntegerField())
+        ).values("pk_value")
+    return queryset.filter(pk__in=object_ids)
+
+
+def typeahead(term, kind=None, limit=TYPEAHEAD_LIMIT):
+    return [
+        {"kind": kind, "id": object_id, "label": label}
+        for kind, object_id, label in matching_entries(term, kind)
+        .order_by("kind", "label")
+        .values_list("kind", "object_id", "label")[:limit]
+    ]
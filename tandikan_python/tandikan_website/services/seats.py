@@ -0,0 +1,130 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from ..models import ClassSchedule, EnrollmentSubject, WaitlistEntry
+
+
+class SectionFull(Exception):
+    def __init__(self, schedule_id):
+        super().__init__(f"Schedule {schedule_id} has no seats left.")
+        self.schedule_id = schedule_id
+
+
+class StudentConflict(Exception):
+    def __init__(self, schedule_id, conflicts):
+        super().__init__(f"Schedule {schedule_id} overlaps the student's other sections.")
+        self.schedule_id = schedule_id
+        self.conflicts = conflicts
+
+
+# --------------------------------------------------------
+# SEAT COUNTER
+# --------------------------------------------------------
+
+def _has_room(count):
+    return Q(capacity__isnull=True) | Q(seats_taken__lte=F("capacity") - count)
+
+
+def take_seats(schedule_id, count=1):
+    """
+    Claim ``count`` seats with one conditional UPDATE. The database applies
+    the capacity check and the increment atomically, so concurrent callers
+    can never push a section past its capacity. Returns False when full.
+    """
+    return ClassSchedule.objects.filter(_has_room(count), pk=schedule_id).update(
+        seats_taken=F("seats_taken") + count
+    ) == 1
+
+
+def take_seat(schedule_id):
+    if not take_seats(schedule_id):
+        raise SectionFull(schedule_id)
+
+
+def release_seats(schedule_id, count=1):
+    ClassSchedule.objects.filter(pk=schedule_id).update(
+        seats_taken=Greatest(F("seats_taken") - count, Value(0))
+    )
+
+
+def recount_seats(schedule_ids=None):
+    """Rebuild ``seats_taken`` from the enrolled EnrollmentSubject rows."""
+    schedules = ClassSchedule.objects.all()
+    if schedule_ids is not None:
+        schedules = schedules.filter(pk__in=schedule_ids)
+    taken = (
+        EnrollmentSubject.objects.filter(schedule=OuterRef("pk"), status="enrolled")
+        .values("schedule")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return schedules.update(seats_taken=Coalesce(Subquery(taken), Value(0)))
+
+
+# --------------------------------------------------------
+# ENROLL / DROP
+# --------------------------------------------------------
+
+def enroll_in_schedule(enrollment, schedule_id, waitlist=False):
+    """
+    Add a section to an enrollment. ``StudentConflict`` is raised when it
+    overlaps the student's other sections in the term, as promote_waitlist()
+    would skip them anyway. When the section is full the student is queued
+    instead if ``waitlist`` is set, otherwise ``SectionFull`` is raised.
+    Returns the new EnrollmentSubject or WaitlistEntry.
+    """
+    from .conflicts import find_student_conflicts
+
+    conflicts = find_student_conflicts(enrollment, ClassSchedule.objects.get(pk=schedule_id))
+    if conflicts:
+        raise StudentConflict(schedule_id, conflicts)
+    try:
+        with transaction.atomic():
+            return EnrollmentSubject.objects.create(enrollment=enrollment, schedule_id=schedule_id)
+    except SectionFull:
+        if not waitlist:
+            raise
+    entry, _ = WaitlistEntry.objects.get_or_create(enrollment=enrollment, schedule_id=schedule_id)
+    return entry
+
+
+def schedule_seats_freed(schedule_id):
+    """Fill seats freed in a section from its waitlist once the drop commits."""
+    transaction.on_commit(partial(promote_waitlist, schedule_id))
+
+
+def promote_waitlist(schedule_id):
+    """Move waitlisted students into the section while it has free seats."""
+    from .conflicts import find_student_conflicts
+
+    promoted = []
+    with transaction.atomic():
+        # Serialises promotions of the same section.
+        schedule = ClassSchedule.objects.select_for_update().filter(pk=schedule_id).first()
+        if schedule is None:
+            return promoted
+
+        queue = (
+            WaitlistEntry.objects.filter(schedule=schedule)
+            .select_related("enrollment")
+            .order_by("requested_at", "id")
+        )
+        for entry in queue.iterator():
+            if EnrollmentSubject.objects.filter(enrollment=entry.enrollment, schedule=schedule).exists():
+                entry.delete()
+                continue
+            # A student who has since picked a clashing section keeps their place.
+            if find_student_conflicts(entry.enrollment, schedule):
+                continue
+            try:
+                with transaction.atomic():
+                    promoted.append(
+                        EnrollmentSubject.objects.create(enrollment=entry.enrollment, schedule=schedule)
+                    )
+            except SectionFull:
+                break
+            entry.delete()
+    return promoted
@@ -0,0 +1,238 @@
+import asyncio
+
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .timetables import class_fields
+from ..models import Assessment, Enrollment, EnrollmentSubject, Payment, WaitlistEntry
+
+
+RECENT_PAYMENTS = 5
+
+
+# --------------------------------------------------------
+# QUERIES
+# --------------------------------------------------------
+# Every read below is a single indexed query over ``values()``, shared by
+# the sync views (WSGI) and the async ones (ASGI). Apart from the
+# enrollment lookup they only need the enrollment id, so the async
+# functions run them together with asyncio.gather.
+
+def _enrollment(user, **extra):
+    """The student's latest enrollment, joined from the user in one query."""
+    return (
+        Enrollment.objects.filter(student__user=user)
+        .order_by("-term_id")
+        .values(
+            "enrollment_id",
+            "term_id",
+            "date_enrolled",
+            "student_id",
+            academic_year=F("term__academic_year"),
+            semester=F("term__semester"),
+            enrollment_open=F("term__enrollment_open"),
+            **extra,
+        )
+    )
+
+
+def _enrollment_with_timetable(user):
+    # The materialized classes come along in the same query; None when the
+    # timetable has not been built (see services/timetables.py).
+    return _enrollment(user, classes=F("timetable__classes"))
+
+
+def _subjects(enrollment_id):
+    return EnrollmentSubject.objects.filter(enrollment_id=enrollment_id)
+
+
+def _load_totals():
+    return {
+        "subjects": Count("pk"),
+        "units": Coalesce(Sum("schedule__subject__units"), Value(0)),
+    }
+
+
+def _schedule(enrollment_id):
+    return (
+        _subjects(enrollment_id)
+        .order_by("schedule__day", "schedule__start_time")
+        .values("schedule_id", **class_fields())
+    )
+
+
+def _balance(enrollment_id):
+    return Assessment.objects.filter(enrollment_id=enrollment_id).values(
+        "assessment_id", "total_units", "total_amount", "amount_paid", "balance_due", "last_payment_date"
+    )
+
+
+def _payments(enrollment_id):
+    return (
+        Payment.objects.filter(assessment__enrollment_id=enrollment_id)
+        .order_by("-date_paid", "-payment_id")
+        .values("payment_id", "amount_paid", "date_paid")[:RECENT_PAYMENTS]
+    )
+
+
+def _waitlist(enrollment_id):
+    # Place in line, counted over waitlist_queue_idx.
+    ahead = (
+        WaitlistEntry.objects.filter(schedule=OuterRef("schedule"), requested_at__lt=OuterRef("requested_at"))
+        .order_by()
+        .values("schedule")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return (
+        WaitlistEntry.objects.filter(enrollment_id=enrollment_id)
+        .order_by("requested_at")
+        .values(
+            "schedule_id",
+            "requested_at",
+            subject_code=F("schedule__subject__subject_code"),
+            position=Coalesce(Subquery(ahead), Value(0)) + 1,
+        )
+    )
+
+
+# --------------------------------------------------------
+# RESULTS
+# --------------------------------------------------------
+
+def _activity(payments):
+    # Shaped for the "Recent Activity" card of the student dashboard.
+    return [
+        {"message": f"Payment of {payment['amount_paid']} received", "timestamp": payment["date_paid"]}
+        for payment in payments
+    ]
+
+
+def _dashboard(enrollment, load, payments):
+    if enrollment is None:
+        return {"current_semester": None, "total_enrolled_subjects": 0, "total_units": 0, "logs": []}
+    return {
+        "current_semester": f"{enrollment['semester']}, {enrollment['academic_year']}",
+        "total_enrolled_subjects": load["subjects"],
+        "total_units": load["units"],
+        "logs": _activity(payments),
+    }
+
+
+def _status(enrollment, load, waitlist):
+    if enrollment is None:
+        return {"enrolled": False, "enrollment": None, "subjects": 0, "units": 0, "waitlist": []}
+    return {
+        "enrolled": load["subjects"] > 0,
+        "enrollment": enrollment,
+        "subjects": load["subjects"],
+        "units": load["units"],
+        "waitlist": waitlist,
+    }
+
+
+def _timetable(enrollment, rows):
+    return {
+        "enrollment": enrollment,
+        "schedule": rows,
+        "total_units": sum(row["units"] for row in rows),
+    }
+
+
+# --------------------------------------------------------
+# SYNC
+# --------------------------------------------------------
+
+def student_dashboard(user):
+    """Template context of the student dashboard."""
+    enrollment = _enrollment(user).first()
+    if enrollment is None:
+        return _dashboard(None, None, None)
+    enrollment_id = enrollment["enrollment_id"]
+    load = _subjects(enrollment_id).aggregate(**_load_totals())
+    return _dashboard(enrollment, load, list(_payments(enrollment_id)))
+
+
+def student_schedule(user):
+    enrollment = _enrollment_with_timetable(user).first()
+    if enrollment is None:
+        return _timetable(None, [])
+    rows = enrollment.pop("classes")
+    if rows is None:
+        rows = list(_schedule(enrollment["enrollment_id"]))
+    return _timetable(enrollment, rows)
+
+
+def student_balance(user):
+    """Balance and recent payments of the latest enrollment, or None."""
+    enrollment = _enrollment(user).first()
+    if enrollment is None:
+        return None
+    balance = _balance(enrollment["enrollment_id"]).first()
+    if balance is None:
+        return None
+    return {**balance, "payments": list(_payments(enrollment["enrollment_id"]))}
+
+
+def student_enrollment_status(user):
+    enrollment = _enrollment(user).first()
+    if enrollment is None:
+        return _status(None, None, None)
+    enrollment_id = enrollment["enrollment_id"]
+    load = _subjects(enrollment_id).aggregate(**_load_totals())
+    return _status(enrollment, load, list(_waitlist(enrollment_id)))
+
+
+# --------------------------------------------------------
+# ASYNC
+# --------------------------------------------------------
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+async def astudent_dashboard(user):
+    enrollment = await _enrollment(user).afirst()
+    if enrollment is None:
+        return _dashboard(None, None, None)
+    enrollment_id = enrollment["enrollment_id"]
+    load, payments = await asyncio.gather(
+        _subjects(enrollment_id).aaggregate(**_load_totals()),
+        _alist(_payments(enrollment_id)),
+    )
+    return _dashboard(enrollment, load, payments)
+
+
+async def astudent_schedule(user):
+    enrollment = await _enrollment_with_timetable(user).afirst()
+    if enrollment is None:
+        return _timetable(None, [])
+    rows = enrollment.pop("classes")
+    if rows is None:
+        rows = await _alist(_schedule(enrollment["enrollment_id"]))
+    return _timetable(enrollment, rows)
+
+
+async def astudent_balance(user):
+    enrollment = await _enrollment(user).afirst()
+    if enrollment is None:
+        return None
+    balance, payments = await asyncio.gather(
+        _balance(enrollment["enrollment_id"]).afirst(),
+        _alist(_payments(enrollment["enrollment_id"])),
+    )
+    if balance is None:
+        return None
+    return {**balance, "payments": payments}
+
+
+async def astudent_enrollment_status(user):
+    enrollment = await _enrollment(user).afirst()
+    if enrollment is None:
+        return _status(None, None, None)
+    enrollment_id = enrollment["enrollment_id"]
+    load, waitlist = await asyncio.gather(
+        _subjects(enrollment_id).aaggregate(**_load_totals()),
+        _alist(_waitlist(enrollment_id)),
+    )
+    return _status(enrollment, load, waitlist)
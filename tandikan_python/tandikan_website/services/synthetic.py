@@ -0,0 +1,276 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import (
+    AcademicTerm,
+    Assessment,
+    ClassSchedule,
+    College,
+    Enrollment,
+    EnrollmentSubject,
+    Faculty,
+    Fee,
+    Payment,
+    Program,
+    ReportLog,
+    StudentInfo,
+    Subject,
+    SubjectPrerequisite,
+    User,
+)
+
+
+BATCH_SIZE = 2000
+
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Ocampo", "Garcia", "Mendoza", "Torres",
+    "Tomas", "Andrada", "Castillo", "Flores", "Villanueva", "Ramos", "Castro", "Rivera",
+    "Aquino", "Navarro", "Salazar", "Mercado", "Dela Cruz", "Gonzales", "Lopez", "Perez",
+]
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Mark", "Angel", "John", "Kristine", "Paolo", "Joy",
+    "Miguel", "Camille", "Carlo", "Patricia", "Rafael", "Nicole", "Gabriel", "Bea",
+]
+DAY_PATTERNS = ["MWF", "TTh"]
+START_HOURS = range(7, 19)
+
+
+def _flush(model, rows, force=False):
+    """bulk_create ``rows`` once enough have piled up; returns the pending list."""
+    if rows and (force or len(rows) >= BATCH_SIZE * 5):
+        model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        return []
+    return rows
+
+
+def _slots():
+    """Every (day, start, end) a room can hold without overlaps."""
+    return [
+        (day, datetime.time(hour), datetime.time(hour, 50))
+        for day in DAY_PATTERNS
+        for hour in START_HOURS
+    ]
+
+
+def seed_dataset(
+    students=2000,
+    terms=2,
+    colleges=4,
+    programs_per_college=3,
+    subjects_per_program=24,
+    rooms=40,
+    subjects_per_student=6,
+    payments_per_assessment=2,
+    terms_per_student=8,
+    seed=0,
+):
+    """
+    Fill an empty database with a linked, realistic data set using bulk
+    inserts. Each student attends up to ``terms_per_student`` consecutive
+    terms, and subjects form a prerequisite chain within their program.
+    Rows are streamed in batches, so 50k students over 10 terms fit in
+    memory. Returns the number of rows created per model.
+    """
+    from .assessment import generate_assessments
+    from .search import rebuild_search_index
+    from .seats import recount_seats
+    from .timetables import rebuild_all
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    counts = {}
+
+    with transaction.atomic():
+        College.objects.bulk_create([College(college_name=f"College {c + 1}") for c in range(colleges)])
+        college_ids = list(College.objects.values_list("pk", flat=True))
+
+        Program.objects.bulk_create([
+            Program(program_code=f"P{c:02}{p:02}", program_name=f"Program {c}-{p}", college_id=college_id)
+            for c, college_id in enumerate(college_ids)
+            for p in range(programs_per_college)
+        ])
+        programs = list(Program.objects.values_list("pk", "college_id"))
+
+        Subject.objects.bulk_create([
+            Subject(
+                subject_code=f"S{program_id:03}-{n:03}",
+                subject_name=f"Subject {n} of program {program_id}",
+                units=rng.choice((2, 3, 3, 3, 4, 5)),
+                year_level=n * 4 // subjects_per_program + 1,
+                semester="1" if n % 2 == 0 else "2",
+                college_id=college_id,
+                program_id=program_id,
+            )
+            for program_id, college_id in programs
+            for n in range(subjects_per_program)
+        ], batch_size=BATCH_SIZE)
+        subjects = list(Subject.objects.order_by("pk").values_list("pk", "program_id", "college_id"))
+
+        # Each subject requires the one two places earlier in its program,
+        # i.e. the previous subject of the same semester.
+        by_program = {}
+        for subject_id, program_id, _ in subjects:
+            by_program.setdefault(program_id, []).append(subject_id)
+        SubjectPrerequisite.objects.bulk_create([
+            SubjectPrerequisite(subject_id=chain[n], prerequisite_id=chain[n - 2])
+            for chain in by_program.values()
+            for n in range(2, len(chain))
+        ], batch_size=BATCH_SIZE)
+
+        # One instructor per room keeps both unique schedule constraints happy.
+        User.objects.bulk_create([
+            User(username=f"faculty{n}", password="!", role="instructor", last_name=rng.choice(LAST_NAMES))
+            for n in range(rooms)
+        ], batch_size=BATCH_SIZE)
+        faculty_users = list(User.objects.filter(role="instructor").values_list("pk", "last_name"))
+        Faculty.objects.bulk_create([
+            Faculty(
+                user_id=user_id,
+                college_id=college_ids[n % len(college_ids)],
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=last_name,
+                gender=rng.choice(("M", "F")),
+                email=f"faculty{n}@example.edu",
+            )
+            for n, (user_id, last_name) in enumerate(faculty_users)
+        ], batch_size=BATCH_SIZE)
+        faculty_ids = list(Faculty.objects.order_by("pk").values_list("pk", flat=True))
+
+        slots = _slots()
+        schedules = []
+        # Fill one room's week before the next, so the subjects of a
+        # program land in different time slots and students can combine them.
+        for n, (subject_id, _, _) in enumerate(subjects[: rooms * len(slots)]):
+            room = n // len(slots)
+            day, start, end = slots[n % len(slots)]
+            schedules.append(ClassSchedule(
+                subject_id=subject_id,
+                instructor_id=faculty_ids[room],
+                day=day,
+                start_time=start,
+                end_time=end,
+                room=f"Room {room + 1:03}",
+            ))
+        ClassSchedule.objects.bulk_create(schedules, batch_size=BATCH_SIZE)
+
+        offerings = {}   # program_id -> [(schedule_id, slot key)]
+        for schedule_id, program_id, day, start in ClassSchedule.objects.values_list(
+            "pk", "subject__program_id", "day", "start_time"
+        ):
+            offerings.setdefault(program_id, []).append((schedule_id, (day, start)))
+
+        User.objects.bulk_create([
+            User(
+                username=f"student{n}",
+                password="!",
+                role="student",
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+            )
+            for n in range(students)
+        ], batch_size=BATCH_SIZE)
+        student_users = User.objects.filter(role="student").order_by("pk").values_list(
+            "pk", "first_name", "last_name"
+        )
+        StudentInfo.objects.bulk_create([
+            StudentInfo(
+                student_id=f"{2020 + n % 5}-{n:06}",
+                first_name=first_name,
+                last_name=last_name,
+                user_id=user_id,
+                college_id=programs[n % len(programs)][1],
+                program_id=programs[n % len(programs)][0],
+                year_level=n % 4 + 1,
+                emergency_contact_name=f"{rng.choice(FIRST_NAMES)} {last_name}",
+                emergency_contact_number="09170000000",
+            )
+            for n, (user_id, first_name, last_name) in enumerate(student_users)
+        ], batch_size=BATCH_SIZE)
+        student_programs = list(StudentInfo.objects.values_list("pk", "program_id"))
+
+        AcademicTerm.objects.bulk_create([
+            AcademicTerm(academic_year=f"{2015 + t // 2}-{2016 + t // 2}", semester=str(t % 2 + 1))
+            for t in range(terms)
+        ])
+        term_ids = list(AcademicTerm.objects.order_by("pk").values_list("pk", flat=True))
+
+        attended = min(terms_per_student, len(term_ids))
+        first_terms = len(term_ids) - attended + 1
+        for t, term_id in enumerate(term_ids):
+            Enrollment.objects.bulk_create([
+                Enrollment(
+                    student_id=student_id,
+                    term_id=term_id,
+                    date_enrolled=now - datetime.timedelta(
+                        days=180 * (len(term_ids) - t), minutes=rng.randint(0, 20000)
+                    ),
+                )
+                for n, (student_id, _) in enumerate(student_programs)
+                if n % first_terms <= t < n % first_terms + attended
+            ], batch_size=BATCH_SIZE)
+
+        programs_by_student = dict(student_programs)
+        enrollment_subjects = []
+        for enrollment_id, student_id, term_id in Enrollment.objects.values_list(
+            "pk", "student_id", "term_id"
+        ).iterator(chunk_size=BATCH_SIZE):
+            # Everything before the latest term has been graded.
+            status = "enrolled" if term_id == term_ids[-1] else "passed"
+            taken_slots = set()
+            choices = offerings.get(programs_by_student[student_id], [])
+            for schedule_id, slot in rng.sample(choices, min(len(choices), subjects_per_student * 2)):
+                if slot not in taken_slots and len(taken_slots) < subjects_per_student:
+                    taken_slots.add(slot)
+                    enrollment_subjects.append(
+                        EnrollmentSubject(enrollment_id=enrollment_id, schedule_id=schedule_id, status=status)
+                    )
+            enrollment_subjects = _flush(EnrollmentSubject, enrollment_subjects)
+        _flush(EnrollmentSubject, enrollment_subjects, force=True)
+        recount_seats()
+
+        Fee.objects.bulk_create([
+            Fee(name="Tuition per unit", amount="450.00", per_unit=True),
+            Fee(name="Library fee", amount="500.00"),
+            Fee(name="Laboratory fee", amount="1500.00"),
+            Fee(name="Registration fee", amount="300.00"),
+        ])
+        for term_id in term_ids:
+            generate_assessments(AcademicTerm(pk=term_id))
+
+        cashier = User.objects.create(username="cashier", password="!", role="cashier")
+        payments = []
+        for assessment_id, total, generated in Assessment.objects.values_list(
+            "pk", "total_amount", "date_generated"
+        ).iterator(chunk_size=BATCH_SIZE):
+            for n in range(rng.randint(0, payments_per_assessment)):
+                payments.append(Payment(
+                    assessment_id=assessment_id,
+                    amount_paid=(total / payments_per_assessment).quantize(Decimal("0.01")),
+                    date_paid=generated + datetime.timedelta(days=30 * n, minutes=rng.randint(0, 600)),
+                    cashier=cashier,
+                ))
+            payments = _flush(Payment, payments)
+        # Payment.objects.bulk_create folds each batch into the balances.
+        _flush(Payment, payments, force=True)
+
+        ReportLog.objects.bulk_create([
+            ReportLog(
+                report_name=rng.choice(("Class list", "Enrollment summary", "Collection report")),
+                generated_by=cashier,
+                timestamp=now - datetime.timedelta(minutes=n * 37),
+            )
+            for n in range(max(students // 10, 1))
+        ], batch_size=BATCH_SIZE)
+        rebuild_search_index()
+        rebuild_all(processes=1)
+
+    for model in (
+        College, Program, Subject, SubjectPrerequisite, Faculty, ClassSchedule, StudentInfo, AcademicTerm,
+        Enrollment, EnrollmentSubject, Assessment, Payment, ReportLog,
+    ):
+        counts[model.__name__] = model.objects.count()
+    return counts
@@ -0,0 +1,215 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import ClassRoster, ClassSchedule, Enrollment, EnrollmentSubject, StudentTimetable
+
+
+CHUNK_SIZE = 500
+
+
+# --------------------------------------------------------
+# ROWS
+# --------------------------------------------------------
+
+def class_fields():
+    """One class of a timetable, as ``values()`` keyword arguments from EnrollmentSubject."""
+    return {
+        "subject_code": F("schedule__subject__subject_code"),
+        "subject_name": F("schedule__subject__subject_name"),
+        "units": F("schedule__subject__units"),
+        "day": F("schedule__day"),
+        "start_time": F("schedule__start_time"),
+        "end_time": F("schedule__end_time"),
+        "room": F("schedule__room"),
+        "instructor_first_name": F("schedule__instructor__first_name"),
+        "instructor_last_name": F("schedule__instructor__last_name"),
+    }
+
+
+def _roster_details(schedule_ids):
+    return ClassSchedule.objects.filter(pk__in=schedule_ids).values(
+        "schedule_id",
+        "instructor_id",
+        "day",
+        "start_time",
+        "end_time",
+        "room",
+        "capacity",
+        subject_code=F("subject__subject_code"),
+        subject_name=F("subject__subject_name"),
+        units=F("subject__units"),
+        instructor_first_name=F("instructor__first_name"),
+        instructor_last_name=F("instructor__last_name"),
+    )
+
+
+def _roster_students(schedule_ids):
+    return (
+        EnrollmentSubject.objects.filter(schedule_id__in=schedule_ids, status="enrolled")
+        .order_by("enrollment__student__last_name", "enrollment__student__first_name", "enrollment__student_id")
+        .values(
+            "schedule_id",
+            student_id=F("enrollment__student_id"),
+            last_name=F("enrollment__student__last_name"),
+            first_name=F("enrollment__student__first_name"),
+            middle_name=F("enrollment__student__middle_name"),
+            program_code=F("enrollment__student__program__program_code"),
+            year_level=F("enrollment__student__year_level"),
+            term_id=F("enrollment__term_id"),
+        )
+    )
+
+
+# --------------------------------------------------------
+# REBUILDS
+# --------------------------------------------------------
+# Each rebuild reads the live rows of the ids it is given with two joined
+# queries and upserts one row per id; ids whose enrollment or schedule is
+# gone are skipped (the cascade already removed their row).
+
+def rebuild_timetables(enrollment_ids):
+    enrollment_ids = set(enrollment_ids)
+    if not enrollment_ids:
+        return 0
+    classes = {}
+    for row in (
+        EnrollmentSubject.objects.filter(enrollment_id__in=enrollment_ids)
+        .order_by("schedule__day", "schedule__start_time")
+        .values("enrollment_id", "schedule_id", **class_fields())
+    ):
+        classes.setdefault(row.pop("enrollment_id"), []).append(row)
+
+    now = timezone.now()
+    timetables = [
+        StudentTimetable(
+            enrollment_id=enrollment_id,
+            student_id=student_id,
+            term_id=term_id,
+            classes=classes.get(enrollment_id, []),
+            total_units=sum(row["units"] for row in classes.get(enrollment_id, [])),
+            built_at=now,
+        )
+        for enrollment_id, student_id, term_id in Enrollment.objects.filter(pk__in=enrollment_ids).values_list(
+            "pk", "student_id", "term_id"
+        )
+    ]
+    StudentTimetable.objects.bulk_create(
+        timetables,
+        update_conflicts=True,
+        unique_fields=["enrollment"],
+        update_fields=["student", "term", "classes", "total_units", "built_at"],
+    )
+    return len(timetables)
+
+
+def rebuild_rosters(schedule_ids):
+    schedule_ids = set(schedule_ids)
+    if not schedule_ids:
+        return 0
+    students = {}
+    for row in _roster_students(schedule_ids):
+        students.setdefault(row.pop("schedule_id"), []).append(row)
+
+    now = timezone.now()
+    rosters = []
+    for details in _roster_details(schedule_ids):
+        schedule_id = details.pop("schedule_id")
+        enrolled = students.get(schedule_id, [])
+        rosters.append(ClassRoster(
+            schedule_id=schedule_id,
+            instructor_id=details.pop("instructor_id"),
+            details=details,
+            students=enrolled,
+            student_count=len(enrolled),
+            built_at=now,
+        ))
+    ClassRoster.objects.bulk_create(
+        rosters,
+        update_conflicts=True,
+        unique_fields=["schedule"],
+        update_fields=["instructor", "details", "students", "student_count", "built_at"],
+    )
+    return len(rosters)
+
+
+def rebuild_for_schedules(schedule_ids):
+    """
+    After a schedule, or the subject or instructor it shows, changed: its
+    roster and the timetable of everyone enrolled in it.
+    """
+    schedule_ids = set(schedule_ids)
+    rebuild_rosters(schedule_ids)
+    rebuild_timetables(
+        EnrollmentSubject.objects.filter(schedule_id__in=schedule_ids).values_list("enrollment_id", flat=True)
+    )
+
+
+# --------------------------------------------------------
+# READS
+# --------------------------------------------------------
+
+def instructor_rosters(user):
+    """Every class roster of the instructor behind ``user``, in one query."""
+    return list(
+        ClassRoster.objects.filter(instructor__user=user)
+        .order_by("schedule_id")
+        .values("schedule_id", "details", "students", "student_count", "built_at")
+    )
+
+
+# --------------------------------------------------------
+# REBUILD ALL
+# --------------------------------------------------------
+
+REBUILDERS = {
+    "timetables": (Enrollment, rebuild_timetables),
+    "rosters": (ClassSchedule, rebuild_rosters),
+}
+
+
+def _rebuild_chunk(kind, ids):
+    try:
+        with transaction.atomic():
+            return REBUILDERS[kind][1](ids)
+    finally:
+        connections.close_all()
+
+
+def _chunks(model, chunk_size):
+    ids = list(model.objects.order_by("pk").values_list("pk", flat=True))
+    return [ids[start:start + chunk_size] for start in range(0, len(ids), chunk_size)]
+
+
+def rebuild_all(processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Rebuild every timetable and roster, e.g. after imports that bypass
+    signals. Chunks of ``chunk_size`` enrollments or schedules are rebuilt
+    in parallel, each in its own process and transaction; ``processes=1``
+    works in this process instead. Returns the rows written per kind.
+    """
+    processes = processes or os.cpu_count() or 1
+    work = [(kind, chunk) for kind, (model, _) in REBUILDERS.items() for chunk in _chunks(model, chunk_size)]
+    counts = dict.fromkeys(REBUILDERS, 0)
+    if processes == 1 or len(work) < 2:
+        for kind, chunk in work:
+            with transaction.atomic():
+                counts[kind] += REBUILDERS[kind][1](chunk)
+        return counts
+
+    # Spawned, so no child inherits this process's database connection.
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    ) as pool:
+        futures = [(kind, pool.submit(_rebuild_chunk, kind, chunk)) for kind, chunk in work]
+        for kind, future in futures:
+            counts[kind] += future.result()
+    return counts
@@ -0,0 +1,556 @@
+import datetime
+import heapq
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Count
+
+from ..models import ClassSchedule, Faculty, StudentInfo, Subject
+from .conflicts import parse_days, to_minutes
+from .timetables import rebuild_rosters
+
+
+BATCH_SIZE = 1000
+DEFAULT_MAX_LOAD = 8        # sections per instructor in a term
+DEFAULT_TIME_LIMIT = 10.0   # seconds of repair after the first pass
+MAX_EJECTIONS = 2           # placed sections one repair move may displace
+STALE_ROUNDS = 5            # repair rounds without progress before giving up
+
+
+# --------------------------------------------------------
+# TIME SLOTS
+# --------------------------------------------------------
+
+@dataclass(frozen=True)
+class TimeSlot:
+    day: str
+    start_time: datetime.time
+    end_time: datetime.time
+
+    @property
+    def interval(self):
+        return parse_days(self.day), to_minutes(self.start_time), to_minutes(self.end_time)
+
+
+def _time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def default_slots():
+    """
+    Three contact hours a week either way: one-hour MWF meetings from 7:00
+    to 18:00 and 90-minute TTh meetings from 7:00 to 17:30.
+    """
+    slots = [TimeSlot("MWF", _time(start), _time(start + 60)) for start in range(7 * 60, 18 * 60, 60)]
+    slots += [TimeSlot("TTh", _time(start), _time(start + 90)) for start in range(7 * 60, 16 * 60 + 1, 90)]
+    return slots
+
+
+def _overlap(interval, other):
+    return bool(interval[0] & other[0]) and interval[1] < other[2] and other[1] < interval[2]
+
+
+# --------------------------------------------------------
+# INPUT / OUTPUT
+# --------------------------------------------------------
+
+@dataclass(eq=False)
+class Section:
+    """
+    One section of a subject still to be scheduled. Sections sharing a
+    ``cohort`` (program, year level, section number) are taken together by
+    one block of students, so none of them may overlap.
+    """
+    subject_id: int
+    subject_code: str
+    number: int
+    cohort: tuple
+    instructors: tuple   # faculty ids allowed to teach it
+    slot: int = None
+    room: str = None
+    instructor_id: int = None
+
+
+@dataclass(frozen=True)
+class Booking:
+    """An existing ClassSchedule the generator has to work around."""
+    room: str
+    instructor_id: int
+    cohort: tuple
+    day: str
+    start_time: datetime.time
+    end_time: datetime.time
+    same_term: bool
+
+
+@dataclass
+class TimetableResult:
+    sections: int = 0
+    placed: list = field(default_factory=list)
+    unplaced: list = field(default_factory=list)
+    repaired: int = 0
+    created: int = 0
+    elapsed: float = 0.0
+
+    def as_dict(self):
+        return {
+            "sections": self.sections,
+            "placed": len(self.placed),
+            "repaired": self.repaired,
+            "created": self.created,
+            "unplaced": self.unplaced,
+            "elapsed_seconds": round(self.elapsed, 4),
+            "schedule": self.placed,
+        }
+
+
+# --------------------------------------------------------
+# SOLVER
+# --------------------------------------------------------
+
+class TimetableSolver:
+    """
+    Assigns every section a time slot, a room and an instructor from its
+    college so that no room, instructor or student block is booked twice
+    at overlapping times, and no instructor exceeds ``max_load`` sections.
+
+    The first pass places the most constrained section first (fewest
+    feasible slots, then largest block) in the slot that takes the fewest
+    options away from its block, and forward-checks the slots of every
+    section still waiting. Sections it could not place are then repaired by
+    local search: each tries every slot, displacing up to MAX_EJECTIONS
+    sections that block it and moving them elsewhere, and the move is
+    undone when they do not fit.
+    """
+
+    def __init__(self, sections, rooms, slots, max_load=DEFAULT_MAX_LOAD, bookings=(), seed=0):
+        self.sections = list(sections)
+        self.rooms = sorted(set(rooms))
+        self.slots = list(slots)
+        self.max_load = max_load
+        self.rng = random.Random(seed)
+        self.repaired = 0
+
+        intervals = [slot.interval for slot in self.slots]
+        self.overlaps = [
+            [other for other, interval in enumerate(intervals) if _overlap(own, interval)]
+            for own in intervals
+        ]
+        count = len(self.slots)
+        # What the sections placed at exactly this slot occupy.
+        self.rooms_at = [set() for _ in range(count)]
+        self.instructors_at = [set() for _ in range(count)]
+        self.cohorts_at = [set() for _ in range(count)]
+        self.subjects_at = [Counter() for _ in range(count)]
+        self.placed_at = [[] for _ in range(count)]
+        # What existing schedules occupy at any time overlapping this slot.
+        self.blocked_rooms = [set() for _ in range(count)]
+        self.blocked_instructors = [set() for _ in range(count)]
+        self.blocked_cohorts = [set() for _ in range(count)]
+        self.load = Counter()
+        for booking in bookings:
+            self._book(booking, intervals)
+
+        self.by_cohort = defaultdict(list)
+        for index, section in enumerate(self.sections):
+            if section.cohort is not None:
+                self.by_cohort[section.cohort].append(index)
+
+    def _book(self, booking, intervals):
+        interval = (parse_days(booking.day), to_minutes(booking.start_time), to_minutes(booking.end_time))
+        exact = (booking.day, booking.start_time, booking.end_time)
+        for index, slot in enumerate(self.slots):
+            if booking.same_term and _overlap(intervals[index], interval):
+                self.blocked_rooms[index].add(booking.room)
+                self.blocked_instructors[index].add(booking.instructor_id)
+                if booking.cohort is not None:
+                    self.blocked_cohorts[index].add(booking.cohort)
+            elif (slot.day, slot.start_time, slot.end_time) == exact:
+                # Another term's class only meets the unique constraints of
+                # ClassSchedule, which compare the exact day and times.
+                self.blocked_rooms[index].add(booking.room)
+                self.blocked_instructors[index].add(booking.instructor_id)
+        if booking.same_term:
+            self.load[booking.instructor_id] += 1
+
+    # ---- feasibility ----
+
+    def _cohort_free(self, section, slot):
+        if section.cohort is None:
+            return True
+        if section.cohort in self.blocked_cohorts[slot]:
+            return False
+        return not any(section.cohort in self.cohorts_at[other] for other in self.overlaps[slot])
+
+    def _free_room(self, slot):
+        taken = self.blocked_rooms[slot].union(*(self.rooms_at[other] for other in self.overlaps[slot]))
+        return next((room for room in self.rooms if room not in taken), None)
+
+    def _free_instructor(self, instructors, slot):
+        busy = self.blocked_instructors[slot].union(*(self.instructors_at[other] for other in self.overlaps[slot]))
+        return min(
+            (
+                instructor_id
+                for instructor_id in instructors
+                if instructor_id not in busy and self.load[instructor_id] < self.max_load
+            ),
+            key=lambda instructor_id: (self.load[instructor_id], instructor_id),
+            default=None,
+        )
+
+    def _fit(self, section, slot):
+        """(room, instructor id) for ``section`` at ``slot``, or None."""
+        if not self._cohort_free(section, slot):
+            return None
+        room = self._free_room(slot)
+        if room is None:
+            return None
+        instructor_id = self._free_instructor(section.instructors, slot)
+        if instructor_id is None:
+            return None
+        return room, instructor_id
+
+    def _place(self, section, slot, room, instructor_id):
+        section.slot, section.room, section.instructor_id = slot, room, instructor_id
+        self.rooms_at[slot].add(room)
+        self.instructors_at[slot].add(instructor_id)
+        if section.cohort is not None:
+            self.cohorts_at[slot].add(section.cohort)
+        self.subjects_at[slot][section.subject_id] += 1
+        self.placed_at[slot].append(section)
+        self.load[instructor_id] += 1
+
+    def _unplace(self, section):
+        placement = (section.slot, section.room, section.instructor_id)
+        slot, room, instructor_id = placement
+        self.rooms_at[slot].discard(room)
+        self.instructors_at[slot].discard(instructor_id)
+        if section.cohort is not None:
+            self.cohorts_at[slot].discard(section.cohort)
+        self.subjects_at[slot][section.subject_id] -= 1
+        self.placed_at[slot].remove(section)
+        self.load[instructor_id] -= 1
+        section.slot = section.room = section.instructor_id = None
+        return placement
+
+    # ---- first pass ----
+
+    def _construct(self):
+        all_slots = range(len(self.slots))
+        domains = [{slot for slot in all_slots if self._fit(section, slot)} for section in self.sections]
+        degree = [len(self.by_cohort.get(section.cohort, ())) for section in self.sections]
+        pending = set(range(len(self.sections)))
+        unplaced = []
+
+        # Sections sharing the same eligible instructors lose a slot together
+        # when none of those instructors is left there.
+        pools = defaultdict(list)
+        for index, section in enumerate(self.sections):
+            pools[section.instructors].append(index)
+        pools_of = defaultdict(list)
+        for instructors in pools:
+            for instructor_id in instructors:
+                pools_of[instructor_id].append(instructors)
+
+        # Most constrained first, from a heap refreshed whenever a domain shrinks.
+        queue = [(len(domains[n]), -degree[n], n) for n in pending]
+        heapq.heapify(queue)
+
+        def drop(indexes, slot):
+            for n in indexes:
+                if n in pending and slot in domains[n]:
+                    domains[n].discard(slot)
+                    heapq.heappush(queue, (len(domains[n]), -degree[n], n))
+
+        while queue:
+            size, _, index = heapq.heappop(queue)
+            if index not in pending or size != len(domains[index]):
+                continue
+            pending.remove(index)
+            section = self.sections[index]
+            if not domains[index]:
+                unplaced.append(section)
+                continue
+
+            mates = [n for n in self.by_cohort.get(section.cohort, ()) if n in pending]
+            slot = min(domains[index], key=lambda slot: (
+                # Least constraining: options taken from the rest of the block,
+                # then sections of the same subject at that time.
+                sum(1 for n in mates for other in self.overlaps[slot] if other in domains[n]),
+                sum(self.subjects_at[other][section.subject_id] for other in self.overlaps[slot]),
+                slot,
+            ))
+            room, instructor_id = self._fit(section, slot)
+            self._place(section, slot, room, instructor_id)
+
+            # Forward checking: only the slots overlapping ``slot`` changed,
+            # for the block, for everyone once the rooms ran out, and for the
+            # pools of this instructor; all slots when they hit their load.
+            for other in self.overlaps[slot]:
+                drop(mates, other)
+                if self._free_room(other) is None:
+                    drop(list(pending), other)
+            changed = all_slots if self.load[instructor_id] >= self.max_load else self.overlaps[slot]
+            for instructors in pools_of[instructor_id]:
+                for other in changed:
+                    if self._free_instructor(instructors, other) is None:
+                        drop(pools[instructors], other)
+        return unplaced
+
+    # ---- repair ----
+
+    def _shuffled_slots(self):
+        slots = list(range(len(self.slots)))
+        self.rng.shuffle(slots)
+        return slots
+
+    def _place_anywhere(self, section):
+        for slot in self._shuffled_slots():
+            fit = self._fit(section, slot)
+            if fit:
+                self._place(section, slot, *fit)
+                return True
+        return False
+
+    def _placed_around(self, slot):
+        return [placed for other in self.overlaps[slot] for placed in self.placed_at[other]]
+
+    def _move(self, section, slot):
+        """Place ``section`` at ``slot`` by displacing what blocks it, or change nothing."""
+        if section.cohort in self.blocked_cohorts[slot]:
+            return False
+        ejected = [
+            placed for placed in self._placed_around(slot)
+            if section.cohort is not None and placed.cohort == section.cohort
+        ]
+        if len(ejected) > MAX_EJECTIONS:
+            return False
+        undo = [(placed, self._unplace(placed)) for placed in ejected]
+
+        if self._free_room(slot) is None:
+            around = self._placed_around(slot)
+            if around:
+                victim = self.rng.choice(around)
+                undo.append((victim, self._unplace(victim)))
+        if self._free_instructor(section.instructors, slot) is None:
+            around = [placed for placed in self._placed_around(slot) if placed.instructor_id in section.instructors]
+            if around:
+                victim = self.rng.choice(around)
+                undo.append((victim, self._unplace(victim)))
+
+        fit = self._fit(section, slot) if len(undo) <= MAX_EJECTIONS else None
+        if fit is None:
+            for placed, placement in undo:
+                self._place(placed, *placement)
+            return False
+
+        self._place(section, slot, *fit)
+        moved = []
+        for placed, _ in undo:
+            if not self._place_anywhere(placed):
+                for other in moved + [section]:
+                    self._unplace(other)
+                for other, placement in undo:
+                    self._place(other, *placement)
+                return False
+            moved.append(placed)
+        return True
+
+    def _repair(self, unplaced, deadline):
+        stale = 0
+        while unplaced and stale < STALE_ROUNDS and time.perf_counter() < deadline:
+            progress = False
+            for section in list(unplaced):
+                if time.perf_counter() >= deadline:
+                    break
+                if self._place_anywhere(section) or any(
+                    self._move(section, slot) for slot in self._shuffled_slots()
+                ):
+                    unplaced.remove(section)
+                    self.repaired += 1
+                    progress = True
+            stale = 0 if progress else stale + 1
+        return unplaced
+
+    def reason(self, section):
+        """Why ``section`` has no place, for the report."""
+        if not section.instructors:
+            return "no instructor belongs to the subject's college"
+        if all(self.load[instructor_id] >= self.max_load for instructor_id in section.instructors):
+            return f"every eligible instructor already teaches {self.max_load} sections"
+        if not self.slots:
+            return "no time slots"
+        blocked = Counter()
+        for slot in range(len(self.slots)):
+            if not self._cohort_free(section, slot):
+                blocked["block"] += 1
+            elif self._free_room(slot) is None:
+                blocked["room"] += 1
+            else:
+                blocked["instructor"] += 1
+        return {
+            "block": "its student block has a class at every time slot",
+            "room": "no room is free when its student block is",
+            "instructor": "no eligible instructor is free when a room and its student block are",
+        }[blocked.most_common(1)[0][0]]
+
+    def solve(self, time_limit=DEFAULT_TIME_LIMIT):
+        """Place what fits; returns the sections left without a place."""
+        deadline = time.perf_counter() + time_limit
+        return self._repair(self._construct(), deadline)
+
+
+# --------------------------------------------------------
+# DATABASE ENTRY POINTS
+# --------------------------------------------------------
+
+def _instructors_by_college():
+    by_college = defaultdict(list)
+    for faculty_id, college_id in Faculty.objects.order_by("pk").values_list("pk", "college_id"):
+        by_college[college_id].append(faculty_id)
+    return by_college
+
+
+def _eligible(by_college, college_id):
+    # Faculty without a college can teach anywhere; so can anyone for a
+    # subject without one.
+    if college_id is None:
+        return tuple(faculty_id for group in by_college.values() for faculty_id in group)
+    return tuple(by_college.get(college_id, []) + by_college.get(None, []))
+
+
+def _term_plan(term, sections, section_size, ignore_existing=False):
+    """Sections to place for ``term`` and the existing schedules to avoid."""
+    subjects = list(
+        Subject.objects.filter(semester=term.semester)
+        .order_by("subject_code")
+        .values_list("pk", "subject_code", "college_id", "program_id", "year_level")
+    )
+    students = {}
+    if section_size:
+        students = {
+            (program_id, year_level): count
+            for program_id, year_level, count in StudentInfo.objects.order_by()
+            .values_list("program_id", "year_level")
+            .annotate(count=Count("pk"))
+        }
+
+    bookings = []
+    scheduled = Counter()
+    for subject_id, program_id, year_level, semester, room, instructor_id, day, start, end in (
+        ClassSchedule.objects.order_by("pk").values_list(
+            "subject_id", "subject__program_id", "subject__year_level", "subject__semester",
+            "room", "instructor_id", "day", "start_time", "end_time",
+        )
+    ):
+        # ClassSchedule has no term; the subject's semester is all there is.
+        # Ignored schedules still take part in the unique constraints.
+        same_term = not ignore_existing and semester == term.semester
+        cohort = None
+        if same_term:
+            scheduled[subject_id] += 1
+            if program_id is not None:
+                cohort = (program_id, year_level, scheduled[subject_id])
+        bookings.append(Booking(room, instructor_id, cohort, day, start, end, same_term))
+
+    by_college = _instructors_by_college()
+    pending = []
+    for subject_id, subject_code, college_id, program_id, year_level in subjects:
+        wanted = sections
+        if section_size:
+            wanted = max(1, math.ceil(students.get((program_id, year_level), 0) / section_size))
+        instructors = _eligible(by_college, college_id)
+        for number in range(scheduled[subject_id] + 1, wanted + 1):
+            cohort = (program_id, year_level, number) if program_id is not None else None
+            pending.append(Section(subject_id, subject_code, number, cohort, instructors))
+    return pending, bookings
+
+
+def _write(sections, slots, capacity):
+    schedules = [
+        ClassSchedule(
+            subject_id=section.subject_id,
+            instructor_id=section.instructor_id,
+            day=slots[section.slot].day,
+            start_time=slots[section.slot].start_time,
+            end_time=slots[section.slot].end_time,
+            room=section.room,
+            capacity=capacity,
+        )
+        for section in sections
+    ]
+    with transaction.atomic():
+        created = len(ClassSchedule.objects.bulk_create(schedules, batch_size=BATCH_SIZE))
+        # bulk_create skips the signal that gives each schedule its roster.
+        rebuild_rosters(ClassSchedule.objects.filter(roster__isnull=True).values_list("pk", flat=True))
+    return created
+
+
+def generate_timetable(
+    term,
+    rooms=None,
+    slots=None,
+    sections=1,
+    section_size=None,
+    max_load=DEFAULT_MAX_LOAD,
+    time_limit=DEFAULT_TIME_LIMIT,
+    seed=0,
+    dry_run=False,
+    ignore_existing=False,
+):
+    """
+    Schedule the subjects offered in ``term``: ``sections`` sections each,
+    or enough sections of ``section_size`` students for the program and
+    year level taking it. Subjects that already have schedules only get
+    the sections they are missing, and existing schedules are worked
+    around, so running it again fills gaps instead of duplicating.
+
+    ClassSchedule has no term: a schedule counts as ``term``'s when its
+    subject is offered in the term's semester, so the schedules of the
+    same semester of an earlier year count too. ``ignore_existing``
+    schedules every section and treats every existing schedule as another
+    term's, for a term whose schedules on file are all from an earlier
+    year: only their exact room and instructor slots stay blocked.
+
+    ``rooms`` defaults to every room already in use and ``slots`` to
+    default_slots(). The placed sections are written with bulk_create in
+    one transaction unless ``dry_run``. Returns a TimetableResult listing
+    the sections that could not be placed and why.
+    """
+    started = time.perf_counter()
+    if rooms is None:
+        rooms = list(ClassSchedule.objects.order_by("room").values_list("room", flat=True).distinct())
+    if not rooms:
+        raise ValueError("There are no rooms to schedule into.")
+    slots = list(slots or default_slots())
+
+    pending, bookings = _term_plan(term, sections, section_size, ignore_existing)
+    solver = TimetableSolver(pending, rooms, slots, max_load=max_load, bookings=bookings, seed=seed)
+    unplaced = solver.solve(time_limit)
+    placed = [section for section in pending if section.slot is not None]
+
+    result = TimetableResult(sections=len(pending), repaired=solver.repaired)
+    result.placed = [
+        {
+            "subject_code": section.subject_code,
+            "section": section.number,
+            "day": slots[section.slot].day,
+            "start_time": slots[section.slot].start_time.strftime("%H:%M"),
+            "end_time": slots[section.slot].end_time.strftime("%H:%M"),
+            "room": section.room,
+            "instructor_id": section.instructor_id,
+        }
+        for section in placed
+    ]
+    result.unplaced = [
+        {"subject_code": section.subject_code, "section": section.number, "reason": solver.reason(section)}
+        for section in sorted(unplaced, key=lambda section: (section.subject_code, section.number))
+    ]
+    if placed and not dry_run:
+        result.created = _write(placed, slots, section_size)
+    result.elapsed = time.perf_counter() - started
+    return result
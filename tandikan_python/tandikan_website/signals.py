@@ -0,0 +1,271 @@
+from functools import partial
+
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .backends import invalidate_all_permissions, invalidate_user
+from .context_processors import invalidate_user_fragments
+from .models import (
+    AcademicTerm,
+    ClassSchedule,
+    College,
+    Enrollment,
+    EnrollmentSubject,
+    Faculty,
+    Payment,
+    Program,
+    StudentInfo,
+    Subject,
+    SubjectPrerequisite,
+    User,
+)
+from .services.admission import invalidate_admission_term
+from .services.dashboard import (
+    bump_dashboard_stat,
+    invalidate_dashboard_stats,
+    payment_changes,
+    record_payments,
+)
+from .services.prerequisites import invalidate_prerequisite_graphs
+from .services.search import index_objects, unindex_object
+from .services.seats import release_seats, schedule_seats_freed
+from .services.timetables import rebuild_for_schedules, rebuild_rosters, rebuild_timetables
+
+
+# --------------------------------------------------------
+# PREREQUISITE GRAPH
+# --------------------------------------------------------
+
+@receiver(post_save, sender=SubjectPrerequisite)
+@receiver(post_delete, sender=SubjectPrerequisite)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def prerequisites_changed(sender, **kwargs):
+    invalidate_prerequisite_graphs()
+
+
+# --------------------------------------------------------
+# ASSESSMENT
+# --------------------------------------------------------
+
+@receiver(post_save, sender=EnrollmentSubject)
+@receiver(post_delete, sender=EnrollmentSubject)
+def enrollment_subjects_changed(sender, instance, **kwargs):
+    Enrollment.objects.filter(pk=instance.enrollment_id).update(subjects_changed_at=timezone.now())
+
+
+# --------------------------------------------------------
+# SEATS
+# --------------------------------------------------------
+
+@receiver(post_delete, sender=EnrollmentSubject)
+def enrollment_subject_dropped(sender, instance, **kwargs):
+    # Seats are taken in EnrollmentSubject.save(); a signal also catches
+    # queryset and cascade deletes, which skip Model.delete().
+    if instance.status == "enrolled":
+        release_seats(instance.schedule_id)
+        schedule_seats_freed(instance.schedule_id)
+
+
+# --------------------------------------------------------
+# DASHBOARD COUNTERS
+# --------------------------------------------------------
+
+COUNTED_MODELS = {
+    StudentInfo: "total_students",
+    Faculty: "total_faculty",
+    Program: "total_departments",
+    College: "total_colleges",
+    Subject: "total_subjects",
+    Enrollment: "pending_enrollments",
+}
+
+
+def _count_created(sender, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(bump_dashboard_stat, COUNTED_MODELS[sender], 1))
+
+
+def _count_deleted(sender, **kwargs):
+    if sender is Enrollment:
+        # A deleted enrollment may or may not have been pending.
+        transaction.on_commit(partial(invalidate_dashboard_stats, "pending_enrollments"))
+    else:
+        transaction.on_commit(partial(bump_dashboard_stat, COUNTED_MODELS[sender], -1))
+
+
+for model in COUNTED_MODELS:
+    post_save.connect(_count_created, sender=model, dispatch_uid=f"dashboard_created_{model.__name__}")
+    post_delete.connect(_count_deleted, sender=model, dispatch_uid=f"dashboard_deleted_{model.__name__}")
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance, **kwargs):
+    # Set by Payment.save() on an edit.
+    previous = getattr(instance, "_previous_payment", None)
+    changes = payment_changes(
+        added=[(instance.assessment_id, instance.amount_paid)],
+        removed=[previous] if previous is not None else [],
+    )
+    transaction.on_commit(partial(record_payments, **changes))
+
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance, origin=None, **kwargs):
+    if origin is not instance:
+        # Queryset and cascade deletes remove many rows before the first
+        # signal, so the totals from before are gone.
+        transaction.on_commit(
+            partial(invalidate_dashboard_stats, "pending_enrollments", "total_collection")
+        )
+        return
+    changes = payment_changes(removed=[(instance.assessment_id, instance.amount_paid)])
+    transaction.on_commit(partial(record_payments, **changes))
+
+
+# --------------------------------------------------------
+# SEARCH INDEX
+# --------------------------------------------------------
+
+SEARCHED_MODELS = {
+    StudentInfo: "student",
+    Faculty: "faculty",
+    Subject: "subject",
+}
+
+
+def _index_saved(sender, instance, **kwargs):
+    index_objects(SEARCHED_MODELS[sender], [instance])
+
+
+def _unindex_deleted(sender, instance, **kwargs):
+    unindex_object(SEARCHED_MODELS[sender], instance.pk)
+
+
+for model in SEARCHED_MODELS:
+    post_save.connect(_index_saved, sender=model, dispatch_uid=f"search_saved_{model.__name__}")
+    post_delete.connect(_unindex_deleted, sender=model, dispatch_uid=f"search_deleted_{model.__name__}")
+
+
+@receiver(post_save, sender=User)
+def user_names_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Student entries include the account's first and last name. Logins
+    # save only last_login and must not write to the index.
+    if created or (update_fields is not None and not {"first_name", "last_name"} & update_fields):
+        return
+    index_objects("student", StudentInfo.objects.filter(user=instance).select_related("user"))
+
+
+# --------------------------------------------------------
+# TIMETABLES AND ROSTERS
+# --------------------------------------------------------
+# Rebuilt after commit: a cascade delete would otherwise recreate a row
+# for the enrollment or schedule being deleted. Each rebuild reads and
+# upserts in its own transaction, so two requests rebuilding the same row
+# cannot interleave and leave the older read in place.
+
+def _rebuild(rebuild, ids):
+    with transaction.atomic():
+        rebuild(ids)
+
+
+def _rebuild_on_commit(rebuild, ids):
+    transaction.on_commit(partial(_rebuild, rebuild, ids))
+
+
+@receiver(post_save, sender=EnrollmentSubject)
+@receiver(post_delete, sender=EnrollmentSubject)
+def timetable_subjects_changed(sender, instance, **kwargs):
+    schedule_ids = {instance.schedule_id}
+    # Set by EnrollmentSubject.save() when the row moved to another schedule.
+    previous = getattr(instance, "_previous_schedule_id", None)
+    if previous is not None:
+        schedule_ids.add(previous)
+    _rebuild_on_commit(rebuild_timetables, [instance.enrollment_id])
+    _rebuild_on_commit(rebuild_rosters, schedule_ids)
+
+
+@receiver(post_save, sender=ClassSchedule)
+def timetable_schedule_changed(sender, instance, **kwargs):
+    _rebuild_on_commit(rebuild_for_schedules, [instance.pk])
+
+
+@receiver(post_save, sender=Subject)
+def timetable_subject_changed(sender, instance, created, **kwargs):
+    if not created:
+        schedule_ids = ClassSchedule.objects.filter(subject=instance).values_list("pk", flat=True)
+        _rebuild_on_commit(rebuild_for_schedules, list(schedule_ids))
+
+
+@receiver(post_save, sender=Faculty)
+def timetable_instructor_changed(sender, instance, created, **kwargs):
+    if not created:
+        schedule_ids = ClassSchedule.objects.filter(instructor=instance).values_list("pk", flat=True)
+        _rebuild_on_commit(rebuild_for_schedules, list(schedule_ids))
+
+
+@receiver(post_save, sender=StudentInfo)
+def roster_student_changed(sender, instance, created, **kwargs):
+    if not created:
+        schedule_ids = EnrollmentSubject.objects.filter(enrollment__student=instance).values_list(
+            "schedule_id", flat=True
+        )
+        _rebuild_on_commit(rebuild_rosters, list(schedule_ids))
+
+
+@receiver(post_save, sender=Program)
+@receiver(pre_delete, sender=Program)
+def roster_program_changed(sender, instance, created=False, **kwargs):
+    # Rosters copy each student's program_code. Collected before a delete,
+    # which sets the students' program to NULL without signals.
+    if not created:
+        schedule_ids = EnrollmentSubject.objects.filter(enrollment__student__program=instance).values_list(
+            "schedule_id", flat=True
+        )
+        _rebuild_on_commit(rebuild_rosters, list(schedule_ids))
+
+
+# --------------------------------------------------------
+# ADMISSION CONTROL
+# --------------------------------------------------------
+
+@receiver(post_save, sender=AcademicTerm)
+@receiver(post_delete, sender=AcademicTerm)
+def admission_settings_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_admission_term)
+
+
+# --------------------------------------------------------
+# AUTH CACHE
+# --------------------------------------------------------
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def cached_user_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_user, instance.pk))
+    transaction.on_commit(partial(invalidate_user_fragments, instance.pk))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_grants_changed(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # Changed from the Group or Permission side: any number of users.
+        transaction.on_commit(invalidate_all_permissions)
+    else:
+        transaction.on_commit(partial(invalidate_user, instance.pk))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def grants_changed(sender, action="post_", **kwargs):
+    if action.startswith("post_"):
+        transaction.on_commit(invalidate_all_permissions)
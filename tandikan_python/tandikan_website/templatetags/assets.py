@@ -0,0 +1,42 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from ..assets import bundle_path, get_bundles
+
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _bundle_tags(name, bundling):
+    paths = [bundle_path(name)] if bundling else get_bundles()[name]
+    if name.endswith(".css"):
+        markup = '<link rel="stylesheet" href="{}">'
+    else:
+        markup = '<script src="{}"></script>'
+    return format_html_join("\n", markup, ((static(path),) for path in paths))
+
+
+def _clear_bundle_tags(**kwargs):
+    _bundle_tags.cache_clear()
+
+
+# Asset URLs only change with the settings (DEBUG, STATIC_URL, ...) or a
+# new manifest, which takes a restart.
+setting_changed.connect(_clear_bundle_tags)
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    ``<link>`` or ``<script>`` tags for the ``ASSET_BUNDLES`` entry ``name``:
+    the built bundle with ``ASSET_BUNDLING`` on, otherwise its source files.
+    """
+    if name not in get_bundles():
+        raise template.TemplateSyntaxError(f"Unknown asset bundle {name!r}.")
+    return _bundle_tags(name, getattr(settings, "ASSET_BUNDLING", False))
@@ -1,3 +1,1771 @@
-from django.test import TestCase
+import datetime
+import importlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password, identify_hasher, is_password_usable, make_password
+from django.contrib.staticfiles import finders
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Max, Sum
+from django.http import HttpResponse
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .admin import PaymentAdmin
+from .assets import BundleFinder, ReferencedFilesFinder, build_bundle, minify_css, referenced_assets
+from .backends import CachedModelBackend
+from .benchmarks.load import STUDENT_ENDPOINTS
+from .benchmarks.suite import hot_paths
+from .management.commands.run_jobs import Command as RunJobsCommand
+from .middleware import StaticAssetMiddleware, _cprofile_lock
+
+from .models import (
+    AcademicTerm,
+    Assessment,
+    ClassRoster,
+    ClassSchedule,
+    College,
+    Enrollment,
+    EnrollmentSubject,
+    Faculty,
+    Fee,
+    Job,
+    Payment,
+    Program,
+    ReportLog,
+    StudentInfo,
+    StudentTimetable,
+    Subject,
+    SubjectPrerequisite,
+    User,
+    WaitlistEntry,
+)
+from .routers import ReplicaRouter, replica_reads, use_replica
+from .services.admission import AdmissionGate, EnrollmentBatcher, check_admission, enrollment_batcher
+from .services.assessment import generate_assessments
+from .services.dashboard import get_dashboard_stats
+from .services.enrollment import BulkEnrollmentResult, EnrollmentSelection, bulk_enroll
+from .services.imports import SubjectImporter, run_import, write_error_report
+from .services.jobs import (
+    JobContext,
+    claim_jobs,
+    enqueue,
+    fail_job,
+    import_job,
+    release_jobs,
+    requeue_stale_jobs,
+)
+from .services.passwords import hash_passwords
+from .services.prerequisites import can_enroll
+from .services.reports import FORMATS, REPORTS, report_params, stream_report
+from .services.search import search_queryset, typeahead
+from .services.seats import SectionFull, StudentConflict, enroll_in_schedule, recount_seats
+from .services.conflicts import (
+    FRI, MON, SAT, SUN, THU, TUE, WED,
+    Slot,
+    audit_term,
+    find_schedule_conflicts,
+    parse_days,
+    sweep_conflicts,
+)
+from .services.timetables import rebuild_all
+from .services.timetabling import generate_timetable
+
+
+def create_sample_data(count):
+    """A small but fully linked data set with ``count`` rows per table."""
+    college = College.objects.create(college_name="College of Engineering")
+    program = Program.objects.create(program_code="BSCE", program_name="Civil Engineering", college=college)
+    term = AcademicTerm.objects.create(academic_year="2024-2025", semester="1")
+    cashier = User.objects.create(username="cashier", role="cashier")
+    Fee.objects.create(name="Tuition", amount="500.00", per_unit=True)
+
+    for n in range(count):
+        instructor = Faculty.objects.create(
+            user=User.objects.create(username=f"faculty{n}", role="instructor"),
+            college=college,
+            first_name="Faculty",
+            last_name=f"Member {n}",
+            gender="F",
+            email=f"faculty{n}@example.com",
+        )
+        subject = Subject.objects.create(
+            subject_code=f"CE{n:03}",
+            subject_name=f"Subject {n}",
+            units=3,
+            semester="1",
+            college=college,
+            program=program,
+        )
+        if n:
+            SubjectPrerequisite.objects.create(subject=subject, prerequisite=Subject.objects.get(subject_code="CE000"))
+        schedule = ClassSchedule.objects.create(
+            subject=subject,
+            instructor=instructor,
+            day="MWF",
+            start_time=datetime.time(7 + n % 12),
+            end_time=datetime.time(8 + n % 12),
+            room=f"Room {n}",
+        )
+        student = StudentInfo.objects.create(
+            student_id=f"2024-{n:05}",
+            first_name="Student",
+            last_name=f"Number {n}",
+            user=User.objects.create(username=f"student{n}", role="student", last_name=f"Number {n}"),
+            college=college,
+            program=program,
+            emergency_contact_name="Guardian",
+            emergency_contact_number="09170000000",
+        )
+        enrollment = Enrollment.objects.create(student=student, term=term)
+        EnrollmentSubject.objects.create(enrollment=enrollment, schedule=schedule)
+        assessment = Assessment.objects.create(enrollment=enrollment, total_units=3, total_amount="1500.00")
+        Payment.objects.create(assessment=assessment, amount_paid="500.00", cashier=cashier)
+        ReportLog.objects.create(report_name=f"Report {n}", generated_by=cashier)
+
+
+# --------------------------------------------------------
+# ADMIN QUERY COUNTS
+# --------------------------------------------------------
+
+class AdminQueryCountTests(TestCase):
+    """
+    Every changelist page and change form must issue a fixed number of
+    queries, however many rows there are. A per-row query from a ``__str__``,
+    a ``list_display`` callable or a foreign key dropdown shows up here as a
+    changed count.
+    """
+
+    ROWS = 25
+
+    # model name -> queries for one changelist page
+    EXPECTED_QUERIES = {
+        "user": 3,
+        "college": 3,
+        "program": 4,
+        "faculty": 5,
+        "studentinfo": 6,
+        "academicterm": 4,
+        "subject": 6,
+        "subjectprerequisite": 3,
+        "classschedule": 6,
+        "enrollment": 4,
+        "enrollmentsubject": 2,
+        "fee": 3,
+        "assessment": 3,
+        "payment": 3,
+        "reportlog": 3,
+        "job": 4,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(cls.ROWS)
+        cls.superuser = User.objects.create_superuser("root", "root@example.com", "password", role="admin")
+
+    def setUp(self):
+        # Changelist counts are cached; start every test from a cold cache.
+        cache.clear()
+        self.client.force_login(self.superuser)
+        # The session's user normally comes from the auth cache; counts
+        # cover what the page itself costs.
+        CachedModelBackend().get_user(self.superuser.pk)
+
+    def test_changelist_query_counts(self):
+        for model_name, expected in self.EXPECTED_QUERIES.items():
+            with self.subTest(model=model_name):
+                url = reverse(f"admin:tandikan_website_{model_name}_changelist")
+                with self.assertNumQueries(expected):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    # model name -> queries for the change form of one object
+    EXPECTED_CHANGE_FORM_QUERIES = {
+        "enrollment": 15,
+        "enrollmentsubject": 9,
+        "assessment": 6,
+        "payment": 8,
+    }
+
+    def test_change_form_query_counts(self):
+        for model_name, expected in self.EXPECTED_CHANGE_FORM_QUERIES.items():
+            with self.subTest(model=model_name):
+                model = self.superuser._meta.apps.get_model("tandikan_website", model_name)
+                url = reverse(
+                    f"admin:tandikan_website_{model_name}_change",
+                    args=[model.objects.order_by("pk").first().pk],
+                )
+                with self.assertNumQueries(expected):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+
+class KeysetChangelistTests(TestCase):
+    ROWS = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(cls.ROWS)
+        cls.superuser = User.objects.create_superuser("root", "root@example.com", "password", role="admin")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.superuser)
+
+    @mock.patch.object(PaymentAdmin, "list_per_page", 10)
+    def test_cursor_walks_every_row_once(self):
+        changelist_url = reverse("admin:tandikan_website_payment_changelist")
+        url, seen = changelist_url, []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            changelist = response.context["cl"]
+            seen.extend(payment.pk for payment in changelist.result_list)
+            url = changelist.next_cursor and changelist_url + changelist.next_page_url
+
+        expected = list(
+            Payment.objects.order_by("-date_paid", "-payment_id").values_list("pk", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_count_is_cached_between_pages(self):
+        url = reverse("admin:tandikan_website_enrollment_changelist")
+        self.client.get(url)
+        with self.assertNumQueries(AdminQueryCountTests.EXPECTED_QUERIES["enrollment"] - 1):
+            response = self.client.get(url)
+        self.assertEqual(response.context["cl"].result_count, self.ROWS)
+
+    def test_invalid_cursor_is_rejected(self):
+        url = reverse("admin:tandikan_website_payment_changelist")
+        response = self.client.get(url, {"cursor": "not-a-date|x"})
+        self.assertEqual(response.status_code, 302)
+
+
+# --------------------------------------------------------
+# SCHEDULE CONFLICTS
+# --------------------------------------------------------
+
+class ScheduleConflictTests(TestCase):
+    DAY_CODES = [
+        ("MWF", MON | WED | FRI),
+        ("TTh", TUE | THU),
+        ("TuTh", TUE | THU),
+        ("Tues/Thurs", TUE | THU),
+        ("Thur", THU),
+        ("TR", TUE | THU),
+        ("MTWThF", MON | TUE | WED | THU | FRI),
+        ("M, W, F", MON | WED | FRI),
+        ("Sat", SAT),
+        ("SaSu", SAT | SUN),
+        ("", 0),
+    ]
+    NOT_DAY_CODES = ["TuX", "Mo-We", "Funday", "M W 7am"]
+
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(2)
+        cls.schedule = ClassSchedule.objects.get(subject__subject_code="CE000")
+        cls.second_semester = Subject.objects.create(
+            subject_code="CE100", subject_name="Second semester", units=3, semester="2",
+        )
+
+    def test_day_codes(self):
+        for value, expected in self.DAY_CODES:
+            with self.subTest(value=value):
+                self.assertEqual(parse_days(value), expected)
+
+    def test_unknown_day_codes_are_rejected(self):
+        for value in self.NOT_DAY_CODES:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_days(value)
+
+    def overlapping(self, subject, day="MWF"):
+        return ClassSchedule(
+            subject=subject,
+            instructor_id=self.schedule.instructor_id,
+            day=day,
+            start_time=datetime.time(7, 30),
+            end_time=datetime.time(8, 30),
+            room=self.schedule.room,
+        )
+
+    def test_clean_reports_overlaps_in_the_same_semester_only(self):
+        schedule = self.overlapping(self.schedule.subject)
+        with self.assertNumQueries(1):
+            conflicts = find_schedule_conflicts(schedule)
+        self.assertEqual([conflict.kind for conflict in conflicts], ["room", "instructor"])
+        with self.assertRaises(ValidationError):
+            self.overlapping(self.schedule.subject).clean()
+
+        self.assertEqual(find_schedule_conflicts(self.overlapping(self.schedule.subject, day="TuTh")), [])
+        self.overlapping(self.second_semester).clean()
+
+
+# --------------------------------------------------------
+# PREREQUISITES
+# --------------------------------------------------------
+
+class PrerequisiteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(2)
+        cls.term = AcademicTerm.objects.get()
+        cls.next_term = AcademicTerm.objects.create(academic_year="2024-2025", semester="2")
+        cls.last_year = AcademicTerm.objects.create(academic_year="2023-2024", semester="2")
+        cls.student = StudentInfo.objects.get(student_id="2024-00000")
+        cls.foundation, cls.advanced = Subject.objects.order_by("subject_code")
+        cls.taken = EnrollmentSubject.objects.get(enrollment__student=cls.student)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_prerequisite_must_be_passed_in_an_earlier_term(self):
+        self.assertEqual(can_enroll(self.student, [self.advanced], self.next_term).missing, {
+            self.advanced.pk: [self.foundation.pk],
+        })
+        EnrollmentSubject.objects.filter(pk=self.taken.pk).update(status="passed")
+        self.assertTrue(can_enroll(self.student, [self.advanced], self.next_term))
+        self.assertFalse(can_enroll(self.student, [self.advanced], self.term))
+        self.assertFalse(can_enroll(self.student, [self.advanced], self.last_year))
+
+    def test_failed_and_unknown_subjects_are_rejected(self):
+        EnrollmentSubject.objects.filter(pk=self.taken.pk).update(status="failed")
+        self.assertFalse(can_enroll(self.student, [self.advanced], self.next_term))
+
+        eligibility = can_enroll(self.student, [self.foundation.pk, 999999], self.next_term)
+        self.assertEqual((eligibility.missing, eligibility.unknown), ({}, [999999]))
+        self.assertFalse(eligibility)
+
+
+# --------------------------------------------------------
+# BULK ENROLLMENT
+# --------------------------------------------------------
+
+class BulkEnrollmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(3)
+        cls.term = AcademicTerm.objects.get()
+        cls.first, cls.second, cls.third = ClassSchedule.objects.order_by("subject__subject_code")
+        # Overlaps the first student's 7:00 class.
+        cls.clash = ClassSchedule.objects.create(
+            subject=cls.second.subject,
+            instructor=cls.third.instructor,
+            day="MWF",
+            start_time=datetime.time(7, 30),
+            end_time=datetime.time(8, 30),
+            room="Room 9",
+        )
+        cls.registrar = User.objects.create_user("registrar", role="registrar")
+
+    def test_enrolls_and_reports_each_rejected_selection(self):
+        result = bulk_enroll(self.term, [
+            EnrollmentSelection("2024-00000", [self.third.pk, self.clash.pk, 999999]),
+            EnrollmentSelection("2024-00001", [self.second.pk]),
+            EnrollmentSelection("nobody", [self.first.pk]),
+        ])
+        self.assertEqual((result.enrollments_created, result.subjects_created), (0, 1))
+        self.assertEqual(
+            [(error.get("schedule"), error["error"]) for error in result.errors],
+            [
+                (self.clash.pk, f"Time conflict with schedule {self.first.pk}."),
+                (999999, "Unknown schedule."),
+                (self.second.pk, "Already enrolled in this schedule."),
+                (None, "Unknown student."),
+            ],
+        )
+        self.third.refresh_from_db()
+        self.assertEqual(self.third.seats_taken, 2)
+
+    def test_students_with_nothing_accepted_get_no_enrollment(self):
+        for student_id in ("2024-09998", "2024-09999"):
+            StudentInfo.objects.create(
+                student_id=student_id,
+                first_name="New",
+                last_name="Student",
+                user=User.objects.create(username=student_id, role="student"),
+                emergency_contact_name="Guardian",
+                emergency_contact_number="09170000000",
+            )
+        result = bulk_enroll(self.term, [
+            EnrollmentSelection("2024-09998", [999999]),
+            EnrollmentSelection("2024-09999", [self.first.pk]),
+        ])
+        self.assertEqual((result.enrollments_created, result.subjects_created), (1, 1))
+        new_enrollments = Enrollment.objects.filter(student__student_id__startswith="2024-0999")
+        self.assertEqual(list(new_enrollments.values_list("student", flat=True)), ["2024-09999"])
+
+    def test_view_rejects_schedules_that_are_not_a_list(self):
+        self.client.force_login(self.registrar)
+        response = self.client.post(
+            reverse("bulk_enroll"),
+            {"term": self.term.pk, "selections": [{"student": "2024-00000", "schedules": "12"}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("must be a list", response.json()["error"])
+
+    def test_command_rejects_a_schedule_id_that_is_not_a_number(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write("student_id,schedule_id\n2024-00000,abc\n")
+        self.addCleanup(os.remove, handle.name)
+        with self.assertRaisesMessage(CommandError, "Line 2: schedule_id 'abc' is not a number."):
+            call_command("bulk_enroll", handle.name, term=self.term.pk)
+
+    def test_command_rejects_missing_columns_and_short_rows(self):
+        for text, message in (
+            ("student,schedule_id\n2024-00000,1\n", "Missing columns: student_id."),
+            ("student_id,schedule_id\n2024-00000\n", "Line 2: schedule_id '' is not a number."),
+            ("student_id,schedule_id\n,1\n", "Line 2: student_id is empty."),
+        ):
+            with self.subTest(text=text):
+                with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+                    handle.write(text)
+                self.addCleanup(os.remove, handle.name)
+                with self.assertRaisesMessage(CommandError, message):
+                    call_command("bulk_enroll", handle.name, term=self.term.pk)
+
+
+# --------------------------------------------------------
+# ASSESSMENTS
+# --------------------------------------------------------
+
+class AssessmentGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(2)
+        cls.term = AcademicTerm.objects.get()
+        # Not per unit despite the name: only the flag decides.
+        Fee.objects.create(name="Tuition deposit", amount="100.00")
+
+    def assessed(self):
+        return list(
+            Assessment.objects.order_by("enrollment__student_id")
+            .values_list("total_units", "tuition_fee", "other_fees", "total_amount")
+        )
+
+    def test_per_unit_fees_are_charged_per_unit(self):
+        self.assertEqual(generate_assessments(self.term).assessed, 2)
+        self.assertEqual(self.assessed(), [(3, 1500, 100, 1600)] * 2)
+
+    def test_incremental_run_follows_fee_and_unit_changes(self):
+        generate_assessments(self.term)
+        self.assertEqual(generate_assessments(self.term, incremental=True).assessed, 0)
+
+        Fee.objects.filter(per_unit=True).update(amount="600.00")
+        self.assertEqual(generate_assessments(self.term, incremental=True).assessed, 2)
+        self.assertEqual(self.assessed(), [(3, 1800, 100, 1900)] * 2)
+
+        Subject.objects.filter(subject_code="CE001").update(units=4)
+        self.assertEqual(generate_assessments(self.term, incremental=True).assessed, 1)
+        self.assertEqual(self.assessed(), [(3, 1800, 100, 1900), (4, 2400, 100, 2500)])
+
+
+# --------------------------------------------------------
+# LEDGER
+# --------------------------------------------------------
+
+class LedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(2)
+        cls.first, cls.second = Assessment.objects.order_by("pk")
+
+    def balances(self):
+        return list(Assessment.objects.order_by("pk").values_list("amount_paid", "balance_due"))
+
+    def test_saving_editing_and_deleting_payments_keep_the_balance(self):
+        self.assertEqual(self.balances(), [(500, 1000), (500, 1000)])
+        payment = Payment.objects.create(assessment=self.first, amount_paid="250.00")
+        self.assertEqual(self.balances(), [(750, 750), (500, 1000)])
+
+        payment.amount_paid = Decimal("300.00")
+        payment.save()
+        self.assertEqual(self.balances(), [(800, 700), (500, 1000)])
+
+        payment.assessment = self.second
+        payment.save()
+        self.assertEqual(self.balances(), [(500, 1000), (800, 700)])
+
+        payment.delete()
+        self.assertEqual(self.balances(), [(500, 1000), (500, 1000)])
+
+    def test_bulk_writes_keep_the_balance(self):
+        Payment.objects.bulk_create([
+            Payment(assessment=self.first, amount_paid="100.00"),
+            Payment(assessment=self.second, amount_paid="200.00"),
+        ])
+        self.assertEqual(self.balances(), [(600, 900), (700, 800)])
+
+        Payment.objects.filter(amount_paid="100.00").update(assessment=self.second)
+        self.assertEqual(self.balances(), [(500, 1000), (800, 700)])
+
+        Payment.objects.filter(assessment=self.second).delete()
+        self.assertEqual(self.balances(), [(500, 1000), (0, 1500)])
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        Assessment.objects.filter(pk=self.first.pk).update(amount_paid="999.00")
+        out = StringIO()
+        call_command("reconcile_balances", stdout=out)
+        self.assertIn(f"Assessment {self.first.pk}: stored paid 999.00, payments total 500", out.getvalue())
+
+        call_command("reconcile_balances", fix=True, stdout=StringIO())
+        self.assertEqual(self.balances(), [(500, 1000), (500, 1000)])
+
+
+# --------------------------------------------------------
+# SEAT CAPACITY
+# --------------------------------------------------------
+
+class SeatCapacityTests(TestCase):
+    ROWS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(cls.ROWS)
+        cls.schedule = ClassSchedule.objects.get(subject__subject_code="CE000")
+        cls.schedule.capacity = 2
+        cls.schedule.save()
+        cls.term = AcademicTerm.objects.get()
+        cls.enrollments = list(Enrollment.objects.order_by("student_id"))
+
+    def test_sample_data_counts_seats(self):
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.seats_taken, 1)
+
+    def test_full_section_raises_or_waitlists(self):
+        second, third, fourth = self.enrollments[1:4]
+        enroll_in_schedule(second, self.schedule.pk)
+        with self.assertRaises(SectionFull):
+            enroll_in_schedule(third, self.schedule.pk)
+        entry = enroll_in_schedule(third, self.schedule.pk, waitlist=True)
+        self.assertIsInstance(entry, WaitlistEntry)
+        enroll_in_schedule(fourth, self.schedule.pk, waitlist=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EnrollmentSubject.objects.get(enrollment=second, schedule=self.schedule).delete()
+
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.seats_taken, 2)
+        self.assertTrue(EnrollmentSubject.objects.filter(enrollment=third, schedule=self.schedule).exists())
+        self.assertEqual(list(WaitlistEntry.objects.values_list("enrollment", flat=True)), [fourth.pk])
+
+    def test_graded_subjects_free_their_seat_but_stay_billed(self):
+        first, second, third = self.enrollments[:3]
+        enroll_in_schedule(second, self.schedule.pk)
+        enroll_in_schedule(third, self.schedule.pk, waitlist=True)
+
+        graded = EnrollmentSubject.objects.get(enrollment=first, schedule=self.schedule)
+        with self.captureOnCommitCallbacks(execute=True):
+            graded.status = "passed"
+            graded.save()
+
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.seats_taken, 2)
+        recount_seats([self.schedule.pk])
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.seats_taken, 2)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertEqual(
+            [student["student_id"] for student in ClassRoster.objects.get(schedule=self.schedule).students],
+            [second.student_id, third.student_id],
+        )
+        # The subject was taken in its term and is still billed there.
+        generate_assessments(self.term)
+        self.assertEqual(Assessment.objects.get(enrollment=first).total_units, 3)
+
+        with self.assertRaises(ValidationError):
+            graded.status = "dropped"
+            graded.full_clean()
+
+    def test_overlapping_section_is_refused(self):
+        # Student 1 already attends CE001, MWF 8:00-9:00.
+        second = self.enrollments[1]
+        clash = ClassSchedule.objects.create(
+            subject=Subject.objects.get(subject_code="CE002"),
+            instructor_id=Faculty.objects.order_by("pk").values_list("pk", flat=True)[2],
+            day="MW",
+            start_time=datetime.time(8, 30),
+            end_time=datetime.time(9, 30),
+            room="Room X",
+            capacity=1,
+            seats_taken=1,
+        )
+        for waitlist in (False, True):
+            with self.assertRaises(StudentConflict) as raised:
+                enroll_in_schedule(second, clash.pk, waitlist=waitlist)
+            self.assertEqual([conflict.kind for conflict in raised.exception.conflicts], ["student"])
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_bulk_enroll_stops_at_capacity(self):
+        result = bulk_enroll(self.term, [
+            EnrollmentSelection(enrollment.student_id, [self.schedule.pk])
+            for enrollment in self.enrollments[1:]
+        ])
+        self.assertEqual(result.subjects_created, 1)
+        self.assertEqual(
+            [error["error"] for error in result.errors],
+            ["Section is full."] * (self.ROWS - 2),
+        )
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.seats_taken, self.schedule.capacity)
+
+
+class SeatReservationStressTests(TransactionTestCase):
+    """Many students race for the last seats of one popular section."""
+
+    STUDENTS = 60
+    CAPACITY = 25
+    WORKERS = 12
+
+    def setUp(self):
+        create_sample_data(1)
+        self.schedule = ClassSchedule.objects.get()
+        self.schedule.capacity = self.CAPACITY
+        self.schedule.save()
+        term = AcademicTerm.objects.get()
+        college, program = College.objects.get(), Program.objects.get()
+        for n in range(self.STUDENTS):
+            student = StudentInfo.objects.create(
+                student_id=f"2025-{n:05}",
+                first_name="Rush",
+                last_name=f"Student {n}",
+                user=User.objects.create(username=f"rush{n}", role="student"),
+                college=college,
+                program=program,
+                emergency_contact_name="Guardian",
+                emergency_contact_number="09170000000",
+            )
+            Enrollment.objects.create(student=student, term=term)
+        self.enrollments = list(Enrollment.objects.filter(student__first_name="Rush"))
+
+    def test_parallel_enrollments_never_exceed_capacity(self):
+        start = threading.Barrier(self.WORKERS)
+        outcomes = []
+
+        def reserve(enrollments):
+            start.wait()
+            try:
+                for enrollment in enrollments:
+                    try:
+                        enroll_in_schedule(enrollment, self.schedule.pk, waitlist=True)
+                        outcomes.append(True)
+                    except SectionFull:
+                        outcomes.append(False)
+            finally:
+                connection.close()
+
+        chunks = [self.enrollments[n::self.WORKERS] for n in range(self.WORKERS)]
+        with ThreadPoolExecutor(self.WORKERS) as pool:
+            list(pool.map(reserve, chunks))
+
+        self.schedule.refresh_from_db()
+        enrolled = EnrollmentSubject.objects.filter(schedule=self.schedule).count()
+        self.assertEqual(len(outcomes), self.STUDENTS)
+        self.assertEqual(self.schedule.seats_taken, self.CAPACITY)
+        self.assertEqual(enrolled, self.CAPACITY)
+        self.assertEqual(
+            WaitlistEntry.objects.filter(schedule=self.schedule).count(),
+            self.STUDENTS - self.CAPACITY + 1,  # one seat went to the sample student
+        )
+        # Every student got exactly one seat or one place in the queue.
+        seated = set(EnrollmentSubject.objects.filter(schedule=self.schedule).values_list("enrollment", flat=True))
+        queue = list(
+            WaitlistEntry.objects.filter(schedule=self.schedule)
+            .order_by("requested_at", "id")
+            .values_list("enrollment", flat=True)
+        )
+        self.assertFalse(seated & set(queue))
+        self.assertLessEqual({enrollment.pk for enrollment in self.enrollments}, seated | set(queue))
+
+        # A freed seat goes to the head of the queue, and the rest keep their order.
+        EnrollmentSubject.objects.filter(schedule=self.schedule, enrollment__student__first_name="Student").delete()
+        self.assertTrue(EnrollmentSubject.objects.filter(schedule=self.schedule, enrollment=queue[0]).exists())
+        self.assertEqual(
+            list(
+                WaitlistEntry.objects.filter(schedule=self.schedule)
+                .order_by("requested_at", "id")
+                .values_list("enrollment", flat=True)
+            ),
+            queue[1:],
+        )
+
+
+# --------------------------------------------------------
+# QUERY PATTERN INDEXES
+# --------------------------------------------------------
+
+class QueryIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(3)
+
+    def test_cashier_screens_use_their_indexes(self):
+        cashier = User.objects.get(username="cashier")
+        since = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        plans = {
+            "payment_cashier_date_idx": Payment.objects.filter(cashier=cashier, date_paid__gte=since)
+            .order_by("-date_paid"),
+            "payment_assessment_cover_idx": Payment.objects.filter(assessment_id=1)
+            .values("assessment")
+            .annotate(total=Sum("amount_paid"), last=Max("date_paid")),
+            "enrollment_term_date_idx": Enrollment.objects.filter(term_id=1).order_by("-date_enrolled"),
+        }
+        for index, queryset in plans.items():
+            with self.subTest(index=index):
+                self.assertIn(index, queryset.explain())
+
+
+# --------------------------------------------------------
+# DATABASE ROUTING
+# --------------------------------------------------------
+
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_only_reads_inside_replica_reads_go_to_the_replica(self):
+        with mock.patch("tandikan_website.routers.settings", DATABASES={"default": {}, "replica": {}}):
+            self.assertEqual(self.router.db_for_read(Payment), "default")
+            with replica_reads():
+                self.assertEqual(self.router.db_for_read(Payment), "replica")
+                self.assertEqual(self.router.db_for_write(Payment), "default")
+            self.assertEqual(self.router.db_for_read(Payment), "default")
+
+            @use_replica
+            def view():
+                raise RuntimeError(self.router.db_for_read(Payment))
+
+            with self.assertRaisesMessage(RuntimeError, "replica"):
+                view()
+            self.assertEqual(self.router.db_for_read(Payment), "default")
+
+    def test_without_a_replica_everything_stays_on_default(self):
+        with mock.patch("tandikan_website.routers.settings", DATABASES={"default": {}}), replica_reads():
+            self.assertEqual(self.router.db_for_read(Payment), "default")
+
+    def test_only_default_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate("default", "tandikan_website"))
+        self.assertFalse(self.router.allow_migrate("replica", "tandikan_website"))
+
+
+# --------------------------------------------------------
+# PASSWORD HASHING
+# --------------------------------------------------------
+
+SCRYPT_HASHER = "tandikan_website.hashers.TunedScryptPasswordHasher"
+PBKDF2_HASHER = "django.contrib.auth.hashers.PBKDF2PasswordHasher"
+
+
+def scrypt_settings(**params):
+    return override_settings(
+        PASSWORD_HASHERS=[SCRYPT_HASHER, PBKDF2_HASHER],
+        PASSWORD_HASHER_PARAMS={"scrypt": {"work_factor": 2 ** 12, "block_size": 8, "parallelism": 1, **params}},
+    )
+
+
+class PasswordHasherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def decode(self, encoded):
+        return identify_hasher(encoded).decode(encoded)
+
+    def test_scrypt_takes_its_cost_from_settings(self):
+        with scrypt_settings(work_factor=2 ** 11, block_size=4):
+            decoded = self.decode(make_password("secret"))
+        self.assertEqual(
+            (decoded["algorithm"], decoded["work_factor"], decoded["block_size"]),
+            ("scrypt", 2 ** 11, 4),
+        )
+
+    def test_older_hashes_are_redone_at_login(self):
+        user = User.objects.create(
+            username="old", role="student", password=make_password("secret", hasher="pbkdf2_sha256")
+        )
+        with scrypt_settings():
+            self.assertTrue(self.client.login(username="old", password="secret"))
+        user.refresh_from_db()
+        self.assertEqual(self.decode(user.password)["work_factor"], 2 ** 12)
+
+        with scrypt_settings(work_factor=2 ** 13):
+            self.assertTrue(self.client.login(username="old", password="secret"))
+        user.refresh_from_db()
+        self.assertEqual(self.decode(user.password)["work_factor"], 2 ** 13)
+
+    def test_hash_passwords_leaves_blank_ones_unusable(self):
+        with scrypt_settings():
+            blank, hashed = hash_passwords(["", "secret"], processes=1)
+            self.assertFalse(is_password_usable(blank))
+            self.assertTrue(check_password("secret", hashed))
+
+
+# --------------------------------------------------------
+# AUTH CACHE
+# --------------------------------------------------------
+
+class AuthCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("registrar", password="password", role="registrar", is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_session_and_user_are_not_queried_again(self):
+        # The typeahead checks request.user.role before anything else.
+        url = reverse("search_typeahead")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_role_change_reaches_the_next_request(self):
+        self.assertEqual(self.client.get(reverse("search_typeahead")).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.role = "cashier"
+            user.save()
+        # Cashiers may use the typeahead too; the role is what changed.
+        response = self.client.get(reverse("search_typeahead"))
+        self.assertEqual(response.wsgi_request.user.role, "cashier")
+
+    def test_group_permission_change_reaches_cached_users(self):
+        from django.contrib.auth.models import Group, Permission
+
+        backend = CachedModelBackend()
+        group = Group.objects.create(name="Registrars")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(group)
+        self.assertEqual(backend.get_group_permissions(backend.get_user(self.user.pk)), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            group.permissions.add(Permission.objects.get(codename="view_payment"))
+        self.assertEqual(
+            backend.get_group_permissions(backend.get_user(self.user.pk)),
+            {"tandikan_website.view_payment"},
+        )
+
+    def test_deactivation_reaches_another_process_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            file_cache = {
+                "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+            }
+            with override_settings(CACHES=file_cache):
+                # Another server process opens its own connection to the same cache.
+                other_process = caches.create_connection("default")
+                backend = CachedModelBackend()
+                with mock.patch("tandikan_website.backends.cache", other_process):
+                    self.assertIsNotNone(backend.get_user(self.user.pk))
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    user = User.objects.get(pk=self.user.pk)
+                    user.is_active = False
+                    user.save()
+                with mock.patch("tandikan_website.backends.cache", other_process):
+                    self.assertIsNone(backend.get_user(self.user.pk))
+
+    def test_locmem_with_several_workers_keeps_sessions_in_the_database(self):
+        from tandikan_python import settings as project_settings
+
+        self.addCleanup(importlib.reload, project_settings)
+        with mock.patch.dict(os.environ, {"TANDIKAN_CACHE": "locmem", "TANDIKAN_WORKERS": "4"}):
+            importlib.reload(project_settings)
+        self.assertEqual(project_settings.SESSION_ENGINE, "django.contrib.sessions.backends.db")
+        self.assertEqual(project_settings.AUTHENTICATION_BACKENDS, ["django.contrib.auth.backends.ModelBackend"])
+
+        with mock.patch.dict(os.environ, {"TANDIKAN_CACHE": "file", "TANDIKAN_WORKERS": "4"}):
+            importlib.reload(project_settings)
+        self.assertEqual(project_settings.SESSION_ENGINE, "django.contrib.sessions.backends.cached_db")
+        self.assertEqual(project_settings.AUTHENTICATION_BACKENDS, ["tandikan_website.backends.CachedModelBackend"])
+
+
+# --------------------------------------------------------
+# SEARCH
+# --------------------------------------------------------
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(1)
+        cls.subject = Subject.objects.create(
+            subject_code="CE210",
+            subject_name="Structural Analysis",
+            units=3,
+            semester="2",
+            college=College.objects.get(),
+        )
+        cls.registrar = User.objects.create_user("registrar", role="registrar")
+
+    def setUp(self):
+        cache.clear()
+
+    def labels(self, term, kind=None):
+        return [row["label"] for row in typeahead(term, kind)]
+
+    def test_every_word_must_match_in_any_order(self):
+        self.assertEqual(self.labels("analysis structural"), ["CE210 - Structural Analysis"])
+        self.assertEqual(self.labels("number student"), ["2024-00000 - Number 0, Student"])
+        self.assertEqual(self.labels("analysis student"), [])
+        # "CE" is too short for the trigram index and is matched with LIKE.
+        self.assertEqual(self.labels("ce analysis"), ["CE210 - Structural Analysis"])
+        self.assertEqual(self.labels('"structural" analysis'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.subject.subject_name = "Hydraulics"
+        self.subject.save()
+        self.assertEqual(self.labels("structural"), [])
+        self.assertEqual(self.labels("hydraulics ce210"), ["CE210 - Hydraulics"])
+
+        self.subject.delete()
+        self.assertEqual(self.labels("hydraulics"), [])
+        self.assertEqual(
+            search_queryset(StudentInfo.objects.all(), "student", "2024-00000").get().first_name,
+            "Student",
+        )
+
+    def test_typeahead_view(self):
+        url = reverse("search_typeahead")
+        self.assertEqual(self.client.get(url, {"q": "analysis"}).status_code, 403)
+
+        self.client.force_login(self.registrar)
+        self.assertEqual(self.client.get(url, {"q": "analysis", "kind": "room"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"q": "  "}).json(), {"results": []})
+        response = self.client.get(url, {"q": "Analysis Structural", "kind": "subject"})
+        self.assertEqual(
+            response.json(),
+            {"results": [{"kind": "subject", "id": str(self.subject.pk), "label": "CE210 - Structural Analysis"}]},
+        )
+        self.assertEqual(self.client.get(url, {"q": "structural", "kind": "faculty"}).json(), {"results": []})
+
+
+# --------------------------------------------------------
+# DASHBOARD COUNTERS
+# --------------------------------------------------------
+
+class DashboardCounterTests(TestCase):
+    NAMES = ["pending_enrollments", "total_collection"]
+
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(2)
+        cls.first, cls.second = Assessment.objects.order_by("pk")
+
+    def setUp(self):
+        cache.clear()
+        get_dashboard_stats(self.NAMES)
+
+    def assertCounters(self, pending, collection):
+        # Adjusted in the cache, not recomputed, and equal to a recount.
+        with self.assertNumQueries(0):
+            stats = get_dashboard_stats(self.NAMES)
+        self.assertEqual(stats, {"pending_enrollments": pending, "total_collection": Decimal(collection)})
+        cache.clear()
+        self.assertEqual(get_dashboard_stats(self.NAMES), stats)
+
+    def test_payments_adjust_the_cached_counters(self):
+        self.assertCounters(0, "1000.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.get(assessment=self.first).delete()
+        self.assertCounters(1, "500.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            payment = Payment.objects.create(assessment=self.first, amount_paid="250.50")
+        self.assertCounters(0, "750.50")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.assessment = self.second
+            payment.amount_paid = Decimal("100.00")
+            payment.save()
+        self.assertCounters(1, "600.00")
+
+    def test_several_payments_in_one_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.get(assessment=self.first).delete()
+            Payment.objects.create(assessment=self.first, amount_paid="100.00")
+            Payment.objects.create(assessment=self.first, amount_paid="100.00")
+            Payment.objects.get(assessment=self.second).delete()
+        self.assertCounters(1, "200.00")
+
+    def test_bulk_writes_recount(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.filter(assessment=self.first).delete()
+        self.assertEqual(get_dashboard_stats(self.NAMES)["pending_enrollments"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.bulk_create([Payment(assessment=self.first, amount_paid="5.00")])
+        self.assertEqual(
+            get_dashboard_stats(self.NAMES),
+            {"pending_enrollments": 0, "total_collection": Decimal("505.00")},
+        )
+
+
+class DashboardAccessTests(TestCase):
+    DASHBOARDS = {
+        "admin_dashboard": {"admin"},
+        "cashier_dashboard": {"admin", "cashier"},
+        "registrar_dashboard": {"admin", "registrar"},
+        "college_dashboard": {"admin", "registrar"},
+        "faculty_dashboard": {"admin", "instructor"},
+        "student_dashboard": {"student"},
+    }
+    ROLES = ("admin", "registrar", "cashier", "instructor", "student")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {role: User.objects.create_user(role, password="password", role=role) for role in cls.ROLES}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_dashboards_check_the_role(self):
+        for name in self.DASHBOARDS:
+            with self.subTest(dashboard=name):
+                url = reverse(name)
+                self.assertRedirects(
+                    self.client.get(url), f"{reverse('login')}?next={url}", fetch_redirect_response=False
+                )
+        for role, user in self.users.items():
+            self.client.force_login(user)
+            for name, roles in self.DASHBOARDS.items():
+                with self.subTest(role=role, dashboard=name):
+                    response = self.client.get(reverse(name))
+                    self.assertEqual(response.status_code, 200 if role in roles else 403)
+                    self.assertTrue(response["Content-Type"].startswith("text/html"))
+
+    def test_login_goes_to_the_role_dashboard(self):
+        expected = {
+            "admin": "admin_dashboard",
+            "registrar": "registrar_dashboard",
+            "cashier": "cashier_dashboard",
+            "instructor": "faculty_dashboard",
+            "student": "student_dashboard",
+        }
+        for role, name in expected.items():
+            response = self.client.post(reverse("login"), {"username": role, "password": "password"})
+            self.assertRedirects(response, reverse(name), fetch_redirect_response=False)
+
+
+# --------------------------------------------------------
+# DASHBOARD LAYOUT
+# --------------------------------------------------------
+
+class DashboardLayoutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("jdoe", role="registrar", first_name="Jane", last_name="Doe")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_each_role_gets_its_own_cached_navigation(self):
+        registrar = self.client.get(reverse("registrar_dashboard")).content.decode()
+        self.client.force_login(User.objects.create_user("jroe", role="student"))
+        student = self.client.get(reverse("student_dashboard")).content.decode()
+        self.assertIn("Add student", registrar)
+        self.assertNotIn("Add student", student)
+        self.assertIn("Your subjects", student)
+
+    def test_renamed_user_sees_the_new_name_in_the_header(self):
+        self.assertContains(self.client.get(reverse("registrar_dashboard")), "Jane Doe")
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.first_name = "Janet"
+            user.save()
+        self.assertContains(self.client.get(reverse("registrar_dashboard")), "Janet Doe")
+
+
+# --------------------------------------------------------
+# STATIC ASSETS
+# --------------------------------------------------------
+
+class AssetPipelineTests(TestCase):
+    FILES = {
+        "css/main.css": (
+            '@charset "utf-8";\n'
+            '@import url("parts/base.css");\n'
+            '@import "https://fonts.example.com/x.css";\n'
+            "/* Logo */\n"
+            ".logo {\n  background: url('../img/logo.png?v=1');\n}\n"
+            '.dot { background: url("data:image/png;base64,AAAA") }\n'
+        ),
+        "css/parts/base.css": "body  {\n  color : red;\n}\n.icon { src: url(fonts/icons.woff) }\n",
+        "css/parts/fonts/icons.woff": "woff",
+        "css/unused.css": "p { margin: 0 }",
+        "img/logo.png": "png",
+        "img/unused.png": "png",
+        "js/one.js": "var one = 1\n//# sourceMappingURL=one.js.map\n",
+        "js/two.js": "var two = 2;\n",
+    }
+    TEMPLATE = (
+        '{% load static assets %}<link rel="stylesheet" href="{% static "css/main.css" %}">'
+        '<img src="{% static "img/not-there.png" %}">{% bundle "app.js" %}'
+    )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        self.static = root / "static"
+        for name, text in self.FILES.items():
+            (self.static / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.static / name).write_text(text)
+        (root / "templates").mkdir()
+        (root / "templates" / "page.html").write_text(self.TEMPLATE)
+        override = override_settings(
+            STATIC_URL="/static/",
+            STATICFILES_DIRS=[str(self.static)],
+            STATICFILES_FINDERS=[
+                "tandikan_website.assets.ReferencedFilesFinder",
+                "tandikan_website.assets.BundleFinder",
+            ],
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+            TEMPLATES=[{
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "DIRS": [str(root / "templates")],
+            }],
+            ASSET_BUNDLES={"app.css": ["css/main.css"], "app.js": ["js/one.js", "js/two.js"]},
+            ASSET_BUILD_DIR=str(root / "build"),
+            ASSET_EXTRA_FILES=(),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_collects_only_what_the_templates_reference(self):
+        expected = {
+            "css/main.css",
+            "css/parts/base.css",
+            "css/parts/fonts/icons.woff",
+            "img/logo.png",
+            "js/one.js",
+            "js/two.js",
+        }
+        self.assertEqual(referenced_assets(), expected)
+        listed = {path.replace("\\", "/") for path, _ in ReferencedFilesFinder().list([])}
+        self.assertEqual(listed, expected)
+
+    def test_css_bundle_inlines_imports_and_rebases_urls(self):
+        self.assertEqual(
+            build_bundle("app.css"),
+            '@import "https://fonts.example.com/x.css";'
+            "body{color : red;}.icon{src: url(\"../css/parts/fonts/icons.woff\")} "
+            ".logo{background: url(\"../img/logo.png?v=1\");}"
+            '.dot{background: url("data:image/png;base64,AAAA")}',
+        )
+
+    def test_js_bundle_keeps_files_apart_and_drops_source_maps(self):
+        bundle = build_bundle("app.js")
+        self.assertNotIn("sourceMappingURL", bundle)
+        # one.js has no trailing semicolon; the joint supplies it.
+        self.assertRegex(bundle, r"var one = 1\s*;\s*var two = 2;")
+
+    def test_minify_css_keeps_strings(self):
+        self.assertEqual(
+            minify_css('a  {\n  color : red ;\n}\n/* note */\nb > i, p { content: "a  /* b */" }\n'),
+            'a{color : red;} b > i,p{content: "a  /* b */"}',
+        )
+
+    def test_bundle_finder_rebuilds_when_a_source_is_newer(self):
+        finder = BundleFinder()
+        location = Path(finder.find("bundles/app.js"))
+        self.assertIn("var two = 2", location.read_text())
+        built = location.stat().st_mtime
+        self.assertEqual(Path(finder.find("bundles/app.js")).stat().st_mtime, built)
+
+        source = self.static / "js" / "two.js"
+        source.write_text("var two = 22;\n")
+        os.utime(source, (built + 10, built + 10))
+        self.assertIn("var two = 22", Path(finder.find("bundles/app.js")).read_text())
+
+        self.assertEqual(finder.find("bundles/other.js"), [])
+        self.assertEqual(finder.find("js/one.js"), [])
+        self.assertIsNone(finders.find("js/three.js"))
+        self.assertEqual(sorted(path for path, _ in finder.list([])), ["bundles/app.css", "bundles/app.js"])
+
+    def test_bundle_tag_links_the_bundle_or_its_sources(self):
+        template = Template('{% load assets %}{% bundle "app.js" %}{% bundle "app.css" %}')
+        with override_settings(ASSET_BUNDLING=True):
+            self.assertEqual(
+                template.render(Context()),
+                '<script src="/static/bundles/app.js"></script>'
+                '<link rel="stylesheet" href="/static/bundles/app.css">',
+            )
+        with override_settings(ASSET_BUNDLING=False):
+            self.assertEqual(
+                template.render(Context()),
+                '<script src="/static/js/one.js"></script>\n<script src="/static/js/two.js"></script>'
+                '<link rel="stylesheet" href="/static/css/main.css">',
+            )
+        with self.assertRaises(TemplateSyntaxError):
+            Template('{% load assets %}{% bundle "missing.js" %}').render(Context())
+
+
+@override_settings(DEBUG=False, STATIC_MAX_AGE=3600, STATIC_IMMUTABLE_MAX_AGE=31536000)
+class StaticAssetMiddlewareTests(TestCase):
+    FILES = {
+        "css/site.0123abcd.css": b"body{color:red}",
+        "css/site.0123abcd.css.gz": b"gzip copy",
+        "css/site.0123abcd.css.br": b"brotli copy",
+        "robots.txt": b"User-agent: *",
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        for name, body in self.FILES.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_bytes(body)
+        storage = SimpleNamespace(hashed_files={"css/site.css": "css/site.0123abcd.css"}, base_url="/static/")
+        patcher = mock.patch("tandikan_website.middleware.staticfiles_storage", storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with override_settings(STATIC_ROOT=str(root)):
+            self.middleware = StaticAssetMiddleware(lambda request: HttpResponse("view"))
+
+    def get(self, path, accept_encoding=""):
+        response = self.middleware(RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding))
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def test_sends_the_copy_the_client_accepts(self):
+        for accept_encoding, encoding in (
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("*", "br"),
+            ("br;q=0, gzip", "gzip"),
+            ("gzip;q=0, br;q=0", None),
+            ("br;q=0.5, gzip;q=0.8", "gzip"),
+            ("*;q=0, identity", None),
+            ("", None),
+        ):
+            with self.subTest(accept_encoding=accept_encoding):
+                response, body = self.get("/static/css/site.0123abcd.css", accept_encoding)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                expected = {"br": b"brotli copy", "gzip": b"gzip copy", None: b"body{color:red}"}[encoding]
+                self.assertEqual(body, expected)
+                self.assertEqual(response["Content-Type"], "text/css")
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_fingerprinted_files_are_cached_for_good(self):
+        response, _ = self.get("/static/css/site.0123abcd.css")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        response, body = self.get("/static/robots.txt", "gzip")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(body, b"User-agent: *")
+
+    def test_other_requests_reach_the_view(self):
+        for path in ("/static/missing.css", "/static/../etc/passwd", "/student-dashboard/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[1], b"view")
+        response = self.middleware(RequestFactory().post("/static/robots.txt"))
+        self.assertEqual(response.content, b"view")
+# --------------------------------------------------------
+# STUDENT PORTAL
+# --------------------------------------------------------
+
+class StudentPortalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(3)
+        cls.user = User.objects.get(username="student1")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_dashboard_shows_the_current_enrollment(self):
+        response = self.client.get(reverse("student_dashboard"))
+        self.assertEqual(response.context["total_enrolled_subjects"], 1)
+        self.assertEqual(response.context["total_units"], 3)
+        self.assertContains(response, "Payment of 500.00 received")
+
+    async def test_async_views_answer_like_the_sync_views(self):
+        await self.async_client.aforce_login(self.user)
+        for name, (sync_name, async_name) in STUDENT_ENDPOINTS.items():
+            with self.subTest(name):
+                expected = await sync_to_async(self.client.get)(reverse(sync_name))
+                response = await self.async_client.get(reverse(async_name))
+                self.assertEqual(response.status_code, 200)
+                if name == "dashboard":
+                    self.assertEqual(response.context["total_units"], expected.context["total_units"])
+                    self.assertContains(response, "Payment of 500.00 received")
+                else:
+                    self.assertEqual(response.json(), expected.json())
+
+    async def test_async_views_are_for_students_only(self):
+        registrar = await User.objects.acreate(username="registrar", role="registrar")
+        await self.async_client.aforce_login(registrar)
+        response = await self.async_client.get(reverse("student_schedule_async"))
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(reverse("student_dashboard_async"))
+        self.assertEqual(response.status_code, 403)
+
+
+# --------------------------------------------------------
+# BENCHMARK SUITE
+# --------------------------------------------------------
+
+class BenchmarkSuiteTests(TestCase):
+    # benchmark_client() talks to "localhost".
+    @override_settings(ALLOWED_HOSTS=["localhost"])
+    def test_login_and_payment_cases_do_their_work(self):
+        create_sample_data(1)
+        cases = dict(hot_paths())
+        self.assertEqual(cases["login"]().status_code, 302)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(cases["post payment"]().status_code, 302)
+        self.assertEqual(Payment.objects.count(), 2)
+
+
+# --------------------------------------------------------
+# ADMISSION CONTROL
+# --------------------------------------------------------
+
+class AdmissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(1)
+        AcademicTerm.objects.update(enrollment_open=True)
+        cls.student = StudentInfo.objects.get()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_gate_lets_in_only_freed_slots(self):
+        gate = AdmissionGate(AcademicTerm(term_id=99, admission_limit=2, admission_batch_size=5))
+        tickets = [gate.issue_ticket() for _ in range(6)]
+        for _ in range(3):
+            gate.advance()
+        self.assertEqual([gate.position(ticket) for ticket in tickets], [0, 0, 1, 2, 3, 4])
+
+        self.assertTrue(gate.acquire())
+        self.assertTrue(gate.acquire())
+        self.assertFalse(gate.acquire())
+        gate.release()
+        for _ in range(3):
+            gate.advance()
+        self.assertEqual([gate.position(ticket) for ticket in tickets], [0, 0, 0, 1, 2, 3])
+        self.assertEqual(gate.stats(), {"issued": 6, "served": 3, "active": 1, "released": 1})
+
+    def test_session_keeps_its_ticket_and_admission(self):
+        gate = AdmissionGate(AcademicTerm(term_id=99, admission_limit=1, admission_batch_size=1))
+        first, second = {}, {}
+        self.assertEqual(check_admission(first, gate), 0)
+        self.assertEqual(check_admission(second, gate), 1)
+        self.assertEqual(check_admission(second, gate), 1)
+        self.assertTrue(gate.acquire())
+        gate.release()
+        self.assertEqual(check_admission(second, gate), 0)
+        self.assertEqual(check_admission(first, gate), 0)
+        self.assertEqual(gate.stats()["issued"], 2)
+
+    def test_batcher_writes_one_batch_and_joins_retries(self):
+        batcher = EnrollmentBatcher()
+        batcher.max_delay = 0.2
+        term = AcademicTerm(term_id=99, admission_batch_size=50)
+        full = {"student": "B", "schedule": 2, "error": "Section is full."}
+        with mock.patch(
+            "tandikan_website.services.enrollment.bulk_enroll",
+            return_value=BulkEnrollmentResult(errors=[full]),
+        ) as write:
+            futures = [
+                batcher.submit(term, EnrollmentSelection("A", [1])),
+                batcher.submit(term, EnrollmentSelection("B", [2])),
+                batcher.submit(term, EnrollmentSelection("A", [1])),
+            ]
+            results = [future.result(timeout=5) for future in futures]
+        self.assertIs(futures[0], futures[2])
+        write.assert_called_once()
+        self.assertEqual(results[0], {"student": "A", "errors": [], "batch_size": 2})
+        self.assertEqual(results[1], {"student": "B", "errors": [full], "batch_size": 2})
+
+        with mock.patch("tandikan_website.services.enrollment.bulk_enroll", side_effect=RuntimeError("locked")):
+            future = batcher.submit(term, EnrollmentSelection("A", [1]))
+            self.assertIsNot(future, futures[0])
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+
+    def test_enroll_view_answers_503_while_the_write_is_pending_or_failed(self):
+        self.client.force_login(self.student.user)
+        url = reverse("student_enroll")
+        body = {"schedules": [ClassSchedule.objects.get().pk]}
+
+        pending, failed, done = Future(), Future(), Future()
+        failed.set_exception(RuntimeError("locked"))
+        done.set_result({"student": self.student.pk, "errors": [], "batch_size": 1})
+        with mock.patch.object(enrollment_batcher, "result_timeout", 0.01):
+            for future, status in ((pending, 503), (failed, 503), (done, 200)):
+                with mock.patch.object(enrollment_batcher, "submit", return_value=future):
+                    response = self.client.post(url, body, content_type="application/json")
+                self.assertEqual(response.status_code, status)
+        self.assertEqual(response.json()["errors"], [])
+
+
+# --------------------------------------------------------
+# REQUEST PROFILING
+# --------------------------------------------------------
+
+class RequestProfilingTests(TestCase):
+    def test_one_request_at_a_time_runs_under_cprofile(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(REQUEST_PROFILING={
+            "ENABLED": True,
+            "CPROFILE_SAMPLE_RATE": 1.0,
+            "CPROFILE_THRESHOLD_MS": 0,
+            "CPROFILE_DIR": directory,
+        }):
+            # Another thread's profile is running: this request goes without.
+            with _cprofile_lock:
+                response = self.client.get(reverse("landing"))
+            self.assertIn("Server-Timing", response)
+            self.assertEqual(os.listdir(directory), [])
+
+            self.client.get(reverse("landing"))
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.assertFalse(_cprofile_lock.locked())
+
+
+# --------------------------------------------------------
+# REPORTS
+# --------------------------------------------------------
+
+class ReportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(2)
+        cls.admin = User.objects.create_user("admin", role="admin")
+        cls.first, cls.second = ClassSchedule.objects.order_by("pk")
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, name, **params):
+        response = self.client.get(reverse("report", args=[name]), params)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, body.decode()
+
+    def test_bad_filters_are_refused_before_streaming(self):
+        self.client.force_login(self.admin)
+        logged = ReportLog.objects.count()
+        for name, params in (
+            ("class-list", {}),
+            ("class-list", {"schedule": "abc"}),
+            ("enrollment-summary", {"term": "abc"}),
+            ("payment-collection", {"start": "notadate"}),
+            ("payment-collection", {"end": "2024-02-30"}),
+        ):
+            with self.subTest(name=name, params=params):
+                self.assertEqual(self.get(name, **params)[0], 400)
+        self.assertEqual(ReportLog.objects.count(), logged)
+
+        status, body = self.get("payment-collection", start="2000-01-01", term=AcademicTerm.objects.get().pk)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body.splitlines()), 3)
+        self.assertEqual(ReportLog.objects.count(), logged + 1)
+
+    def test_instructors_get_their_own_class_lists_only(self):
+        self.client.force_login(self.first.instructor.user)
+        self.assertEqual(self.get("class-list", schedule=self.second.pk)[0], 403)
+        status, body = self.get("class-list", schedule=self.first.pk)
+        self.assertEqual(status, 200)
+        self.assertIn("2024-00000", body)
+        self.assertNotIn("2024-00001", body)
+
+    def test_failed_runs_are_not_logged(self):
+        def broken(headers, rows):
+            yield "Payment\r\n"
+            raise RuntimeError("connection lost")
+
+        logged = ReportLog.objects.count()
+        report = REPORTS["payment-collection"]
+        with mock.patch.dict(FORMATS, {"csv": (broken, "text/csv")}):
+            with self.assertRaises(RuntimeError):
+                list(stream_report(report, report_params(report, {}), "csv", self.admin))
+        self.assertEqual(ReportLog.objects.count(), logged)
+
+
+# --------------------------------------------------------
+# BACKGROUND JOBS
+# --------------------------------------------------------
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_TIMEOUT=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.jobs = [enqueue("recompute_balances") for _ in range(3)]
+
+    def test_each_job_is_claimed_by_one_worker(self):
+        first = claim_jobs("a", 2)
+        second = claim_jobs("b", 2)
+        self.assertEqual(first, [job.pk for job in self.jobs[:2]])
+        self.assertEqual(second, [self.jobs[2].pk])
+        self.assertEqual(claim_jobs("a", 2), [])
+        self.assertEqual(
+            dict(Job.objects.values_list("pk", "worker")),
+            {self.jobs[0].pk: "a", self.jobs[1].pk: "a", self.jobs[2].pk: "b"},
+        )
+
+    def test_failures_back_off_then_give_up(self):
+        job = self.jobs[0]
+        Job.objects.exclude(pk=job.pk).delete()
+        delays = []
+        for _ in range(job.max_attempts):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            self.assertEqual(claim_jobs("a", 1), [job.pk])
+            before = timezone.now()
+            status = fail_job(job.pk, "boom")
+            job.refresh_from_db()
+            delays.append(round((job.run_after - before).total_seconds()))
+        self.assertEqual(status, "failed")
+        self.assertEqual(delays[:2], [10, 20])
+        self.assertEqual((job.attempts, job.error), (3, "boom"))
+
+    def test_released_jobs_are_not_charged_an_attempt(self):
+        claimed = claim_jobs("a", 3)
+        Job.objects.filter(pk=claimed[0]).update(status="succeeded")
+        self.assertEqual(release_jobs(claimed), 2)
+        self.assertEqual(
+            list(Job.objects.order_by("pk").values_list("status", "attempts", "worker")),
+            [("succeeded", 1, "a"), ("queued", 0, ""), ("queued", 0, "")],
+        )
+
+    def test_stale_running_jobs_are_failed(self):
+        claimed = claim_jobs("a", 2)
+        Job.objects.filter(pk=claimed[0]).update(started_at=timezone.now() - datetime.timedelta(minutes=5))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(
+            list(Job.objects.order_by("pk").values_list("status", "attempts")),
+            [("queued", 1), ("running", 1), ("queued", 0)],
+        )
+        self.assertIn("worker presumed lost", Job.objects.get(pk=claimed[0]).error)
+
+    def test_worker_fails_a_job_whose_future_raises(self):
+        Job.objects.exclude(pk=self.jobs[0].pk).delete()
+        broken = Future()
+        broken.set_exception(OSError("result lost"))
+        pool = mock.Mock(submit=mock.Mock(return_value=broken))
+        command = RunJobsCommand(stdout=StringIO())
+        self.assertTrue(command.work(pool, {}, "a", 1, {"burst": True, "poll": 0.01}))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ("queued", 1))
+        self.assertIn("OSError: result lost", job.error)
+        self.assertIn(f"Job {job.pk}: queued", command.stdout.getvalue())
+
+
+# --------------------------------------------------------
+# CSV IMPORT
+# --------------------------------------------------------
+
+class CsvImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(1)
+        cls.registrar = User.objects.create_user("registrar", role="registrar")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bad_rows_are_reported_by_line(self):
+        result = run_import("students", StringIO(
+            "Student_ID ,first_name,last_name,program,emergency_contact_name,emergency_contact_number\n"
+            "2024-10000,Ana,Reyes,bsce,Guardian,0917\n"
+            "2024-10001,Ben,Cruz,BSXX,Guardian,0917\n"
+            "2024-00000,Old,Student,BSCE,Guardian,0917\n"
+            "2024-10000,Ana,Again,BSCE,Guardian,0917\n"
+        ), processes=1)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(StudentInfo.objects.get(student_id="2024-10000").user.username, "2024-10000")
+
+        report = StringIO()
+        write_error_report(result.errors, report)
+        self.assertEqual(report.getvalue().splitlines(), [
+            "line,field,message",
+            "3,program,Unknown program 'BSXX'.",
+            "4,student_id,2024-00000 already exists.",
+            "5,student_id,2024-10000 appears earlier in the file.",
+        ])
+
+        with self.assertRaisesMessage(ValueError, "Missing columns: program."):
+            run_import("students", StringIO("student_id,first_name,last_name\n"), processes=1)
+
+    def test_chunk_refused_by_the_database_is_saved_row_by_row(self):
+        # As if another writer added CE000 after the duplicate check.
+        with mock.patch.object(SubjectImporter, "drop_duplicates", lambda self, items, errors: items):
+            result = run_import("subjects", StringIO(
+                "subject_code,subject_name,units,semester\n"
+                "CE100,Statics,3,1\n"
+                "CE000,Clash,3,1\n"
+                "CE101,Dynamics,3,2\n"
+            ), processes=1)
+        self.assertEqual(result.created, 2)
+        self.assertEqual([(error.line, error.field) for error in result.errors], [(3, "")])
+        self.assertEqual(
+            sorted(Subject.objects.filter(subject_code__startswith="CE1").values_list("subject_code", flat=True)),
+            ["CE100", "CE101"],
+        )
+
+    def test_import_job_reads_only_uploads_and_removes_them(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(JOB_OUTPUT_DIR=directory):
+            name = "import-subjects-test.csv"
+            with open(os.path.join(directory, name), "w") as upload:
+                upload.write("subject_code,subject_name,units,semester\nCE100,Statics,3,1\nCE100,Again,3,1\n")
+            job = enqueue("import", {"kind": "subjects", "file": name}, self.registrar)
+            outcome = import_job(JobContext(job), "subjects", name)
+            self.assertEqual((outcome["created"], outcome["errors"]), (1, 1))
+            self.assertEqual(os.listdir(directory), ["import-subjects-test-errors.csv"])
+
+            for file in ("../import-x.csv", "/etc/passwd", "settings.py", "import-x/../../etc/passwd"):
+                with self.subTest(file=file), self.assertRaises(ValueError):
+                    import_job(JobContext(job), "subjects", file)
+
+    def test_jobs_are_queued_with_the_handler_params_only(self):
+        with self.assertRaises(ValueError):
+            enqueue("generate_assessments", {"term_id": 1, "path": "/etc"})
+        with self.assertRaises(ValueError):
+            enqueue("generate_assessments", {})
+        enqueue("generate_assessments", {"term_id": 1, "incremental": True})
+
+        self.client.force_login(self.registrar)
+        response = self.client.post(
+            reverse("jobs"),
+            {"kind": "import", "params": {"kind": "subjects", "file": "import-x.csv"}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.filter(kind="import").exists())
+
+
+# --------------------------------------------------------
+# TIMETABLES
+# --------------------------------------------------------
+
+class TimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(3)
+        rebuild_all(processes=1)
+        cls.user = User.objects.get(username="student0")
+        cls.enrollment = Enrollment.objects.get(student__user=cls.user)
+        cls.schedule = ClassSchedule.objects.get(subject__subject_code="CE001")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_enrolling_and_dropping_rebuild_the_timetable_and_roster(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            subject = enroll_in_schedule(self.enrollment, self.schedule.pk)
+        timetable = StudentTimetable.objects.get(enrollment=self.enrollment)
+        self.assertEqual([row["subject_code"] for row in timetable.classes], ["CE000", "CE001"])
+        self.assertEqual(timetable.total_units, 6)
+        self.assertEqual(self.schedule.roster.student_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subject.delete()
+        timetable.refresh_from_db()
+        self.schedule.roster.refresh_from_db()
+        self.assertEqual(timetable.total_units, 3)
+        self.assertEqual(self.schedule.roster.student_count, 1)
+
+    def test_materialized_schedule_matches_the_live_join(self):
+        url = reverse("student_schedule")
+        # The first request caches the session's user.
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            materialized = self.client.get(url).json()
+        StudentTimetable.objects.all().delete()
+        self.assertEqual(self.client.get(url).json(), materialized)
+
+    def test_instructor_sees_the_students_of_each_class(self):
+        self.client.force_login(self.schedule.instructor.user)
+        rosters = self.client.get(reverse("instructor_rosters")).json()["rosters"]
+        self.assertEqual([roster["details"]["subject_code"] for roster in rosters], ["CE001"])
+        self.assertEqual([student["student_id"] for student in rosters[0]["students"]], ["2024-00001"])
+
+    def test_program_changes_reach_the_rosters(self):
+        program = Program.objects.get(program_code="BSCE")
+        with self.captureOnCommitCallbacks(execute=True):
+            program.program_code = "BSCE-2"
+            program.save()
+        roster = ClassRoster.objects.get(schedule=self.schedule)
+        self.assertEqual([student["program_code"] for student in roster.students], ["BSCE-2"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            program.delete()
+        roster.refresh_from_db()
+        self.assertEqual([student["program_code"] for student in roster.students], [None])
+
+
+# --------------------------------------------------------
+# TIMETABLE GENERATOR
+# --------------------------------------------------------
+
+class TimetableGeneratorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(3)
+        cls.term = AcademicTerm.objects.get()
+        college = College.objects.get()
+        program = Program.objects.get()
+        for n in range(3, 12):
+            Subject.objects.create(
+                subject_code=f"CE{n:03}", subject_name=f"Subject {n}", units=3, semester="1",
+                college=college, program=program,
+            )
+
+    def test_generated_sections_avoid_every_overlap(self):
+        result = generate_timetable(self.term, rooms=["Room 0", "Room 1"], max_load=5)
+        self.assertEqual((result.sections, len(result.placed), result.unplaced), (9, 9, []))
+        self.assertEqual(result.created, 9)
+        self.assertEqual(audit_term(self.term), [])
+        # One block of students takes all twelve subjects.
+        block = [
+            Slot.from_values(*values)
+            for values in ClassSchedule.objects.values_list(
+                "schedule_id", "room", "instructor_id", "day", "start_time", "end_time"
+            )
+        ]
+        self.assertEqual(len(block), 12)
+        self.assertEqual(sweep_conflicts("student", "block", block), [])
+        self.assertFalse(ClassSchedule.objects.filter(roster__isnull=True).exists())
+        # Scheduled subjects are left alone on the next run.
+        self.assertEqual(generate_timetable(self.term).sections, 0)
+        # Unless the schedules on file are from an earlier year. Their exact
+        # room and instructor slots stay taken.
+        result = generate_timetable(self.term, rooms=["Room 0", "Room 1"], max_load=6, ignore_existing=True)
+        self.assertEqual((result.sections, result.created, result.unplaced), (12, 12, []))
+        self.assertEqual(ClassSchedule.objects.count(), 24)
+
+    def test_sections_without_a_place_are_reported(self):
+        other = College.objects.create(college_name="College of Nursing")
+        Subject.objects.create(
+            subject_code="NU001", subject_name="Nursing", units=3, semester="1", college=other,
+        )
+        result = generate_timetable(self.term, rooms=["Room 0"], max_load=3, dry_run=True)
+        self.assertEqual(result.created, 0)
+        self.assertEqual(len(result.placed), 6)
+        self.assertEqual(result.unplaced[-1], {
+            "subject_code": "NU001", "section": 1, "reason": "no instructor belongs to the subject's college",
+        })
+        self.assertEqual(
+            {row["reason"] for row in result.unplaced[:-1]},
+            {"every eligible instructor already teaches 3 sections"},
+        )
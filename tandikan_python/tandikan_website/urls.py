@@ -19,6 +19,48 @@ urlpatterns = [
     path("admin-dashboard/", views.admin_dashboard, name="admin_dashboard"),
     path("student-dashboard/", views.student_dashboard, name="student_dashboard"),
     
+    # Enrollment
+    path("enrollment/bulk/", views.bulk_enroll_view, name="bulk_enroll"),
+    path("enrollment/enroll/", views.student_enroll_view, name="student_enroll"),
+    path("enrollment/queue/", views.admission_status_view, name="admission_status"),
+
+    # Cashier
+    path(
+        "cashier/balance/<str:student_id>/<int:term_id>/",
+        views.student_balance_view,
+        name="student_balance",
+    ),
+
+    # Student portal; the async variants are for ASGI servers
+    path("student/schedule/", views.student_schedule_view, name="student_schedule"),
+    path("student/assessment/", views.student_assessment_view, name="student_assessment"),
+    path("student/enrollment/", views.student_enrollment_status_view, name="student_enrollment_status"),
+    path("async/student-dashboard/", views.student_dashboard_async, name="student_dashboard_async"),
+    path("async/student/schedule/", views.student_schedule_async_view, name="student_schedule_async"),
+    path("async/student/assessment/", views.student_assessment_async_view, name="student_assessment_async"),
+    path(
+        "async/student/enrollment/",
+        views.student_enrollment_status_async_view,
+        name="student_enrollment_status_async",
+    ),
+
+    # Faculty
+    path("faculty/rosters/", views.instructor_rosters_view, name="instructor_rosters"),
+
+    # Search
+    path("search/", views.search_typeahead_view, name="search_typeahead"),
+
+    # Reports
+    path("reports/<slug:name>/", views.report_view, name="report"),
+
+    # Background jobs
+    path("jobs/", views.jobs_view, name="jobs"),
+    path("jobs/<int:job_id>/", views.job_status_view, name="job_status"),
+    path("jobs/<int:job_id>/download/", views.job_download_view, name="job_download"),
+
+    # Profiling
+    path("profiling/", views.profiling_stats_view, name="profiling_stats"),
+
     # Authentication URLs
     path("login/", views.login_view, name="login"),
     path("register/", views.register_view, name="register"),
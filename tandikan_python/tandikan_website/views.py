@@ -1,31 +1,75 @@
+import json
+from functools import wraps
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+
+from .models import AcademicTerm, ClassSchedule, Job, StudentInfo
+from .services.admission import AdmissionGate, check_admission, enrollment_batcher, get_admission_term
+from .services.dashboard import get_dashboard_stats
+from .services.enrollment import EnrollmentSelection, bulk_enroll
+from .services.jobs import JOBS, enqueue, job_as_dict, output_dir
+from .services.ledger import get_balance
+from .services.profiling import profile_store
+from .services.reports import FORMATS, REPORTS, report_filename, report_params, stream_report
+from .services.search import INDEXED, typeahead
+from .services import student_portal
+from .services.timetables import instructor_rosters
+
+
+def role_required(*roles):
+    """
+    For the HTML pages: anonymous visitors go to the login page and other
+    roles get the 403 page. The JSON endpoints answer 403 themselves.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return redirect_to_login(request.get_full_path())
+            if request.user.role not in roles:
+                raise PermissionDenied
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 def landing_page(request):
     return render(request, "tandikan_website/landing.html")
 
+@role_required("admin")
 def admin_dashboard(request):
-    return render(request, "tandikan_website/admin/dashboard.html")
+    return render(request, "tandikan_website/admin/dashboard.html", get_dashboard_stats())
 
+@role_required("student")
 def student_dashboard(request):
-    return render(request, "tandikan_website/student/dashboard.html")
+    context = student_portal.student_dashboard(request.user)
+    return render(request, "tandikan_website/student/dashboard.html", context)
 
 def register_view(request):
     return render(request, "tandikan_website/registration/register.html")
 
+@role_required("admin", "cashier")
 def cashier_dashboard(request):
-    return render(request, "tandikan_website/cashier/dashboard.html")
+    return render(request, "tandikan_website/cashier/dashboard.html", get_dashboard_stats())
 
+@role_required("admin", "registrar")
 def registrar_dashboard(request):
-    return render(request, "tandikan_website/registrar/dashboard.html")
+    return render(request, "tandikan_website/registrar/dashboard.html", get_dashboard_stats())
 
+@role_required("admin", "registrar")
 def college_dashboard(request):
-    return render(request, "tandikan_website/college/dashboard.html")
+    return render(request, "tandikan_website/college/dashboard.html", get_dashboard_stats())
 
+@role_required("admin", "instructor")
 def faculty_dashboard(request):
-    return render(request, "tandikan_website/faculty/dashboard.html")
+    return render(request, "tandikan_website/faculty/dashboard.html", get_dashboard_stats())
 
 def login_view(request):
     if request.method == "POST":
@@ -38,10 +82,14 @@ def login_view(request):
             login(request, user)
 
             # Redirect based on role
-            if user.role == "admin":
-                return redirect("admin_dashboard")
-            elif user.role == "student":
+            if user.role == "student":
                 return redirect("student_dashboard")
+            elif user.role == "cashier":
+                return redirect("cashier_dashboard")
+            elif user.role == "registrar":
+                return redirect("registrar_dashboard")
+            elif user.role == "instructor":
+                return redirect("faculty_dashboard")
             else:
                 return redirect("admin_dashboard")
 
@@ -50,4 +98,233 @@ def login_view(request):
 
     return render(request, "tandikan_website/login/login.html")
 
+
+@require_POST
+def bulk_enroll_view(request):
+    if not request.user.is_authenticated or request.user.role not in ("admin", "registrar"):
+        return JsonResponse({"error": "Not allowed."}, status=403)
+
+    try:
+        payload = json.loads(request.body)
+        selections = [
+            EnrollmentSelection(item["student"], item["schedules"])
+            for item in payload["selections"]
+        ]
+        result = bulk_enroll(payload["term"], selections)
+    except AcademicTerm.DoesNotExist:
+        return JsonResponse({"error": "Unknown academic term."}, status=404)
+    except (ValueError, KeyError, TypeError) as exc:
+        return JsonResponse({"error": f"Invalid request: {exc}"}, status=400)
+
+    return JsonResponse(result.as_dict())
+
+def student_balance_view(request, student_id, term_id):
+    if not request.user.is_authenticated or request.user.role not in ("admin", "cashier"):
+        return JsonResponse({"error": "Not allowed."}, status=403)
+
+    balance = get_balance(student_id, term_id)
+    if balance is None:
+        return JsonResponse({"error": "No assessment for this student and term."}, status=404)
+    return JsonResponse(balance)
+
+def admission_status_view(request):
+    term = get_admission_term()
+    if term is None:
+        return JsonResponse({"admitted": True, "position": 0})
+    position = check_admission(request.session, AdmissionGate(term))
+    return JsonResponse({"admitted": position == 0, "position": position})
+
+@require_POST
+def student_enroll_view(request):
+    # Gated by AdmissionControlMiddleware; the write itself joins the
+    # current batch of the enrollment batcher.
+    if not request.user.is_authenticated or request.user.role != "student":
+        return JsonResponse({"error": "Not allowed."}, status=403)
+
+    term = get_admission_term() or AcademicTerm.objects.filter(enrollment_open=True).order_by("-term_id").first()
+    if term is None:
+        return JsonResponse({"error": "Enrollment is closed."}, status=404)
+    student_id = StudentInfo.objects.filter(user=request.user).values_list("student_id", flat=True).first()
+    if student_id is None:
+        return JsonResponse({"error": "No student record for this account."}, status=404)
+
+    try:
+        schedule_ids = [int(schedule_id) for schedule_id in json.loads(request.body)["schedules"]]
+    except (ValueError, KeyError, TypeError) as exc:
+        return JsonResponse({"error": f"Invalid request: {exc}"}, status=400)
+
+    future = enrollment_batcher.submit(term, EnrollmentSelection(student_id, schedule_ids))
+    try:
+        return JsonResponse(future.result(timeout=enrollment_batcher.result_timeout))
+    except TimeoutError:
+        # Still queued or being written. Sending the same schedules again
+        # waits on the same write instead of queueing another.
+        response = JsonResponse({"error": "Enrollment is still processing; try again shortly."}, status=503)
+    except Exception:
+        # The batch failed. Retrying is safe: sections already saved are
+        # reported as such rather than taken twice.
+        response = JsonResponse({"error": "Enrollment could not be saved; try again shortly."}, status=503)
+    response["Retry-After"] = 5
+    return response
+
+def search_typeahead_view(request):
+    if not request.user.is_authenticated or request.user.role not in ("admin", "registrar", "cashier"):
+        return JsonResponse({"error": "Not allowed."}, status=403)
+
+    term = request.GET.get("q", "").strip()
+    kind = request.GET.get("kind") or None
+    if kind is not None and kind not in INDEXED:
+        return JsonResponse({"error": f"Unknown kind {kind!r}."}, status=400)
+    if not term:
+        return JsonResponse({"results": []})
+    return JsonResponse({"results": typeahead(term, kind)})
+
+def profiling_stats_view(request):
+    # Filled by RequestProfilingMiddleware when REQUEST_PROFILING is enabled.
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    if request.GET.get("reset"):
+        profile_store.clear()
+    return JsonResponse({"views": profile_store.summary()})
+
+def report_view(request, name):
+    report = REPORTS.get(name)
+    if report is None:
+        return JsonResponse({"error": f"Unknown report {name!r}."}, status=404)
+    if not request.user.is_authenticated or request.user.role not in report.roles:
+        return JsonResponse({"error": "Not allowed."}, status=403)
+
+    export_format = request.GET.get("format", "csv")
+    if export_format not in FORMATS:
+        return JsonResponse({"error": f"Unknown format {export_format!r}."}, status=400)
+    # Parsed up front: a bad value found while streaming would cut the
+    # download short after a 200.
+    try:
+        params = report_params(report, request.GET)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    if name == "class-list" and request.user.role == "instructor":
+        # Instructors get the class lists of their own sections only.
+        if not ClassSchedule.objects.filter(pk=params["schedule"], instructor__user=request.user).exists():
+            return JsonResponse({"error": "Not allowed."}, status=403)
+
+    response = StreamingHttpResponse(
+        stream_report(report, params, export_format, request.user),
+        content_type=FORMATS[export_format][1],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{report_filename(report, params, export_format)}"'
+    )
+    return response
+
+def jobs_view(request):
+    # GET lists recent jobs (as JSON with ?format=json); POST queues one for
+    # the run_jobs worker and answers at once.
+    if not request.user.is_authenticated or request.user.role not in ("admin", "registrar"):
+        return JsonResponse({"error": "Not allowed."}, status=403)
+
+    if request.method == "POST":
+        try:
+            payload = json.loads(request.body)
+            if payload["kind"] in JOBS and JOBS[payload["kind"]].internal:
+                raise ValueError(f"{payload['kind']!r} jobs cannot be queued here.")
+            job = enqueue(payload["kind"], payload.get("params"), request.user)
+        except (ValueError, KeyError, TypeError) as exc:
+            return JsonResponse({"error": f"Invalid request: {exc}"}, status=400)
+        response = JsonResponse(job_as_dict(job), status=202)
+        response["Location"] = reverse("job_status", args=[job.pk])
+        return response
+
+    jobs = [job_as_dict(job) for job in Job.objects.order_by("-pk")[:100]]
+    if request.GET.get("format") == "json":
+        return JsonResponse({"jobs": jobs})
+    return render(request, "tandikan_website/registrar/jobs.html", {"jobs": jobs})
+
+def job_status_view(request, job_id):
+    if not request.user.is_authenticated or request.user.role not in ("admin", "registrar"):
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    job = Job.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({"error": "No such job."}, status=404)
+    return JsonResponse(job_as_dict(job))
+
+def job_download_view(request, job_id):
+    if not request.user.is_authenticated or request.user.role not in ("admin", "registrar"):
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    job = Job.objects.filter(pk=job_id, status="succeeded").first()
+    filename = (job.result or {}).get("file") if job is not None else None
+    if not filename or not (output_dir() / filename).exists():
+        return JsonResponse({"error": "This job has no file to download."}, status=404)
+    return FileResponse(open(output_dir() / filename, "rb"), as_attachment=True)
+
+def student_schedule_view(request):
+    if not request.user.is_authenticated or request.user.role != "student":
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    return JsonResponse(student_portal.student_schedule(request.user))
+
+def student_assessment_view(request):
+    if not request.user.is_authenticated or request.user.role != "student":
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    balance = student_portal.student_balance(request.user)
+    if balance is None:
+        return JsonResponse({"error": "No assessment for your latest enrollment."}, status=404)
+    return JsonResponse(balance)
+
+def student_enrollment_status_view(request):
+    if not request.user.is_authenticated or request.user.role != "student":
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    return JsonResponse(student_portal.student_enrollment_status(request.user))
+
+def instructor_rosters_view(request):
+    if not request.user.is_authenticated or request.user.role != "instructor":
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    return JsonResponse({"rosters": instructor_rosters(request.user)})
+
+
+# --------------------------------------------------------
+# ASYNC STUDENT VIEWS
+# --------------------------------------------------------
+# The same student reads through the async ORM, for ASGI servers (see
+# tandikan_python/asgi.py). Under WSGI Django runs them in an event loop
+# per request, so the sync views above stay the ones to use there.
+
+async def _student(request):
+    """The request's user if it is a student, else None. Loaded without blocking."""
+    user = await request.auser()
+    # Templates and context processors read request.user synchronously.
+    request.user = user
+    if not user.is_authenticated or user.role != "student":
+        return None
+    return user
+
+async def student_dashboard_async(request):
+    user = await _student(request)
+    if user is None:
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        raise PermissionDenied
+    context = await student_portal.astudent_dashboard(user)
+    return render(request, "tandikan_website/student/dashboard.html", context)
+
+async def student_schedule_async_view(request):
+    user = await _student(request)
+    if user is None:
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    return JsonResponse(await student_portal.astudent_schedule(user))
+
+async def student_assessment_async_view(request):
+    user = await _student(request)
+    if user is None:
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    balance = await student_portal.astudent_balance(user)
+    if balance is None:
+        return JsonResponse({"error": "No assessment for your latest enrollment."}, status=404)
+    return JsonResponse(balance)
+
+async def student_enrollment_status_async_view(request):
+    user = await _student(request)
+    if user is None:
+        return JsonResponse({"error": "Not allowed."}, status=403)
+    return JsonResponse(await student_portal.astudent_enrollment_status(user))
+
 # Create your views here.